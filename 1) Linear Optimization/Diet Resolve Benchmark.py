@@ -0,0 +1,75 @@
+# Benchmark: warm re-solves of a persistent diet model vs cold rebuilds
+
+# Draws price scenarios around the base prices (independent lognormal changes of about
+# 10% per food) and solves each one twice: cold, by rebuilding the model from the tables
+# as "Stigler Diet.py" does, and warm, with DietModel.solve_scenarios, which updates the
+# prices of one model in place.
+# Runs on the Stigler data and on generated diet instances; cold rebuilds of the large
+# instances are timed on a subset of the scenarios. Reports scenarios per second, the mean
+# simplex iterations and the largest cost difference between the two.
+# Usage: python "Diet Resolve Benchmark.py" [scenarios] [seed]
+
+import os
+import sys
+import time
+
+import numpy as np
+
+from diet_model import DietModel
+from diet_model import load_example_tables
+
+# The shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instances import diet  # noqa: E402
+from instances import diet_tables  # noqa: E402
+
+num_scenarios = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+# Largest number of nonzeros rebuilt cold, to keep the run short
+COLD_NONZEROS = 2000000
+
+
+def solve_cold(tables, prices):
+    costs, iterations = [], []
+    for scenario_prices in prices:
+        model = DietModel(*tables, warm_start=False)
+        model.set_prices(scenario_prices)
+        solution = model.solve()
+        costs.append(solution.cost)
+        iterations.append(solution.iterations)
+    return np.array(costs), np.mean(iterations)
+
+
+def solve_warm(tables, prices):
+    model = DietModel(*tables)
+    model.solve()
+    _, costs, _, iterations = model.solve_scenarios(prices)
+    return costs, np.mean(iterations)
+
+
+cases = [('Stigler Diet', load_example_tables())]
+for num_foods in [1000, 10000]:
+    cases.append(('diet {} foods'.format(num_foods), diet_tables(diet(num_foods, seed=seed))))
+
+rng = np.random.default_rng(seed)
+print('{} price scenarios\n'.format(num_scenarios))
+print('{:18} {:>9} {:>11} {:>11} {:>8} {:>7} {:>7} {:>9}'.format(
+    'instance', 'cold runs', 'cold /s', 'warm /s', 'speedup', 'cold it', 'warm it',
+    'max diff'))
+for name, tables in cases:
+    base_prices = np.array([item[2] for item in tables[1]], dtype=np.float64)
+    prices = base_prices * rng.lognormal(0.0, 0.1, size=(num_scenarios, len(base_prices)))
+    num_cold = min(num_scenarios, max(1, COLD_NONZEROS // (len(base_prices) * 9)))
+
+    start_time = time.perf_counter()
+    cold_costs, cold_iterations = solve_cold(tables, prices[:num_cold])
+    cold_rate = num_cold / (time.perf_counter() - start_time)
+    start_time = time.perf_counter()
+    warm_costs, warm_iterations = solve_warm(tables, prices)
+    warm_rate = num_scenarios / (time.perf_counter() - start_time)
+
+    difference = np.abs(cold_costs - warm_costs[:num_cold]).max()
+    print('{:18} {:9} {:11.1f} {:11.1f} {:7.1f}x {:7.1f} {:7.1f} {:9.2g}'.format(
+        name, num_cold, cold_rate, warm_rate, warm_rate / cold_rate, cold_iterations,
+        warm_iterations, difference))
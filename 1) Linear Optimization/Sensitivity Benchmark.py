@@ -0,0 +1,113 @@
+# Benchmark: what-if scenarios answered from the optimal basis vs warm-started re-solves
+
+# Perturbs the objective coefficients and the finite constraint bounds of the LP examples
+# with independent lognormal noise and solves every scenario twice: once with GLOP
+# re-solves from the previous basis, once with LpSensitivity.solve_scenarios, which answers
+# the scenarios where the optimal basis does not change without solving and re-solves the
+# rest. The second clock includes the sensitivity analysis itself. Reports scenarios per
+# second, the share answered analytically and the largest objective difference.
+# "3x+4y Problem.py" and "3x+y Example.py" build their model at module level, so the
+# same models are built here.
+# Usage: python "Sensitivity Benchmark.py" [scenarios] [noise] [seed]
+
+import sys
+import time
+
+import numpy as np
+from ortools.linear_solver import pywraplp
+
+from diet_model import DietModel
+from diet_model import load_example_tables
+from sensitivity import LpSensitivity
+
+num_scenarios = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+noise = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+
+
+def create_3x_4y_model():
+    # Maximize 3x + 4y subject to x + 2y <= 14, 3x - y >= 0, x - y <= 2
+    solver = pywraplp.Solver.CreateSolver('GLOP')
+    x = solver.NumVar(0, solver.infinity(), 'x')
+    y = solver.NumVar(0, solver.infinity(), 'y')
+    solver.Add(x + 2 * y <= 14.0)
+    solver.Add(3 * x - y >= 0.0)
+    solver.Add(x - y <= 2.0)
+    objective = solver.Objective()
+    objective.SetCoefficient(x, 3)
+    objective.SetCoefficient(y, 4)
+    objective.SetMaximization()
+    return solver
+
+
+def create_3x_y_model():
+    # Maximize 3x + y subject to 0 <= x <= 1, 0 <= y <= 2, 0 <= x + y <= 2
+    solver = pywraplp.Solver.CreateSolver('GLOP')
+    x = solver.NumVar(0, 1, 'x')
+    y = solver.NumVar(0, 2, 'y')
+    ct = solver.Constraint(0, 2, 'ct')
+    ct.SetCoefficient(x, 1)
+    ct.SetCoefficient(y, 1)
+    objective = solver.Objective()
+    objective.SetCoefficient(x, 3)
+    objective.SetCoefficient(y, 1)
+    objective.SetMaximization()
+    return solver
+
+
+def create_diet_model():
+    return DietModel(*load_example_tables()).solver
+
+
+def solve_warm(create_model, costs, lower_bounds, upper_bounds):
+    solver = create_model()
+    solver.SetSolverSpecificParametersAsString('use_preprocessing:false')
+    variables, constraints = solver.variables(), solver.constraints()
+    objective = solver.Objective()
+    objective_values = np.full(len(costs), np.nan)
+    for scenario in range(len(costs)):
+        for variable, cost in zip(variables, costs[scenario].tolist()):
+            objective.SetCoefficient(variable, cost)
+        for constraint, lower, upper in zip(constraints, lower_bounds[scenario].tolist(),
+                                            upper_bounds[scenario].tolist()):
+            constraint.SetBounds(lower, upper)
+        if solver.Solve() == pywraplp.Solver.OPTIMAL:
+            objective_values[scenario] = objective.Value()
+    return objective_values
+
+
+def solve_from_basis(create_model, costs, lower_bounds, upper_bounds):
+    solver = create_model()
+    solver.Solve()
+    analysis = LpSensitivity(solver)
+    _, objective_values, _, analytic = analysis.solve_scenarios(costs, lower_bounds,
+                                                                upper_bounds)
+    return objective_values, analytic
+
+
+rng = np.random.default_rng(seed)
+print('{} scenarios, {:.0%} noise on every objective coefficient and bound\n'.format(
+    num_scenarios, noise))
+print('{:18} {:>12} {:>12} {:>8} {:>9} {:>9}'.format(
+    'model', 'warm /s', 'basis /s', 'speedup', 'analytic', 'max diff'))
+for name, create_model in [('3x+4y Problem', create_3x_4y_model),
+                           ('3x+y Example', create_3x_y_model),
+                           ('Stigler Diet', create_diet_model)]:
+    solver = create_model()
+    solver.Solve()
+    analysis = LpSensitivity(solver)
+    costs = analysis.objective_coefficients * rng.lognormal(
+        0.0, noise, size=(num_scenarios, analysis.num_vars))
+    factors = rng.lognormal(0.0, noise, size=(num_scenarios, analysis.num_constraints))
+    lower_bounds = analysis.constraint_lower_bounds * factors
+    upper_bounds = analysis.constraint_upper_bounds * factors
+
+    start_time = time.perf_counter()
+    warm = solve_warm(create_model, costs, lower_bounds, upper_bounds)
+    warm_rate = num_scenarios / (time.perf_counter() - start_time)
+    start_time = time.perf_counter()
+    from_basis, analytic = solve_from_basis(create_model, costs, lower_bounds, upper_bounds)
+    basis_rate = num_scenarios / (time.perf_counter() - start_time)
+    print('{:18} {:12.0f} {:12.0f} {:7.1f}x {:9.1%} {:9.2g}'.format(
+        name, warm_rate, basis_rate, basis_rate / warm_rate, analytic.mean(),
+        np.nanmax(np.abs(warm - from_basis))))
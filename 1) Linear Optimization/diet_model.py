@@ -0,0 +1,114 @@
+# Persistent Stigler diet model for repeated re-solves with changing prices
+
+# "Stigler Diet.py" builds the solver, 77 variables and 9 constraints from scratch for one
+# set of prices. DietModel builds them once and keeps the GLOP solver alive: set_prices and
+# set_minimums change objective coefficients and constraint bounds in place, and solve
+# restarts GLOP from the basis of the previous solve. GLOP presolve is turned off, since
+# it rewrites the LP and so discards the basis.
+# The data columns are nutrients per dollar at the 1939 prices (item[2], in cents), so in
+# the script's formulation a price change would change every coefficient of its column.
+# Here the variables are quantities of each food in its unit (item[1]) and the
+# coefficients are nutrients per unit: prices only appear in the objective and the
+# matrix never changes. At the original prices the optimum is the same as the script's.
+
+import ast
+import collections
+import os
+
+import numpy as np
+from ortools.linear_solver import pywraplp
+
+EXAMPLES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DietSolution = collections.namedtuple('DietSolution',
+                                      ['status', 'cost', 'quantities', 'iterations'])
+
+
+def load_example_tables(filename='Stigler Diet.py'):
+    """Returns (nutrients, data) of the example script without running it."""
+    path = os.path.join(EXAMPLES_DIR, filename)
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    tables = {}
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1 and
+                isinstance(node.targets[0], ast.Name) and
+                node.targets[0].id in ('nutrients', 'data')):
+            tables[node.targets[0].id] = ast.literal_eval(node.value)
+    return tables['nutrients'], tables['data']
+
+
+class DietModel:
+    """A GLOP diet model that is updated in place and re-solved from its last basis."""
+
+    def __init__(self, nutrients, data, warm_start=True):
+        self.solver = pywraplp.Solver('StiglerDietExample',
+                                      pywraplp.Solver.GLOP_LINEAR_PROGRAMMING)
+        if warm_start:
+            self.solver.SetSolverSpecificParametersAsString('use_preprocessing:false')
+        infinity = self.solver.infinity()
+        self.food_names = [item[0] for item in data]
+        self.prices = np.array([item[2] for item in data], dtype=np.float64)
+        self.minimums = np.array([nutrient[1] for nutrient in nutrients], dtype=np.float64)
+        self.quantities = [self.solver.NumVar(0.0, infinity, name)
+                           for name in self.food_names]
+        self.constraints = []
+        for i, nutrient in enumerate(nutrients):
+            constraint = self.solver.Constraint(nutrient[1], infinity, nutrient[0])
+            for j, item in enumerate(data):
+                # Nutrients per dollar times dollars per unit
+                if item[i + 3]:
+                    constraint.SetCoefficient(self.quantities[j], item[i + 3] * item[2] / 100)
+            self.constraints.append(constraint)
+        self.objective = self.solver.Objective()
+        for quantity, price in zip(self.quantities, self.prices.tolist()):
+            self.objective.SetCoefficient(quantity, price / 100)
+        self.objective.SetMinimization()
+
+    def set_prices(self, prices):
+        """Sets the prices (cents per unit); only the coefficients that change are updated."""
+        prices = np.asarray(prices, dtype=np.float64)
+        for j in np.flatnonzero(prices != self.prices).tolist():
+            self.objective.SetCoefficient(self.quantities[j], prices[j] / 100)
+        self.prices = prices.copy()
+
+    def set_minimums(self, minimums):
+        """Sets the nutrient minimums; only the bounds that change are updated."""
+        minimums = np.asarray(minimums, dtype=np.float64)
+        for i in np.flatnonzero(minimums != self.minimums).tolist():
+            self.constraints[i].SetLb(minimums[i])
+        self.minimums = minimums.copy()
+
+    def solve(self):
+        """Returns a DietSolution: the cost is in dollars per day, quantities in units."""
+        status = self.solver.Solve()
+        if status not in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+            return DietSolution(status, None, None, self.solver.iterations())
+        quantities = np.array([quantity.solution_value() for quantity in self.quantities])
+        return DietSolution(status, self.objective.Value(), quantities,
+                            self.solver.iterations())
+
+    def solve_scenarios(self, prices=None, minimums=None):
+        """Solves one scenario per row of prices and/or minimums, in order.
+
+        prices is a (scenarios, foods) and minimums a (scenarios, nutrients) array; a
+        missing one keeps its current values. Returns (statuses, costs, quantities,
+        iterations) arrays, with NaN costs and quantities where no solution was found.
+        """
+        num_scenarios = len(prices if prices is not None else minimums)
+        statuses = np.empty(num_scenarios, dtype=np.int64)
+        iterations = np.empty(num_scenarios, dtype=np.int64)
+        costs = np.full(num_scenarios, np.nan)
+        quantities = np.full((num_scenarios, len(self.quantities)), np.nan)
+        for scenario in range(num_scenarios):
+            if prices is not None:
+                self.set_prices(prices[scenario])
+            if minimums is not None:
+                self.set_minimums(minimums[scenario])
+            solution = self.solve()
+            statuses[scenario] = solution.status
+            iterations[scenario] = solution.iterations
+            if solution.cost is not None:
+                costs[scenario] = solution.cost
+                quantities[scenario] = solution.quantities
+        return statuses, costs, quantities, iterations
@@ -0,0 +1,323 @@
+# Sensitivity analysis and batched what-if scenarios for the LP examples
+
+# LpSensitivity takes a pywraplp LP solved to optimality and rebuilds its optimal basis
+# from the basis statuses GLOP reports. With the inverse basis matrix it gives the dual
+# values and reduced costs, and the ranging intervals of the objective coefficients and
+# of the constraint bounds over which that basis stays optimal.
+# solve_scenarios answers many variants of objective coefficients and constraint bounds
+# at once. For each scenario the basis is checked with a few matrix products: if it is
+# still primal and dual feasible it is still optimal, and the solution and objective
+# follow without calling Solve. This is exact, not a first-order estimate, and it also
+# accepts scenarios that move several parameters at once, where the single-parameter
+# ranges say nothing. The other scenarios are solved with a GLOP copy of the model that
+# keeps its previous basis, as DietModel does.
+# The model is stored densely, so this is meant for LPs up to a few thousand rows.
+# Internally the model is  min c x  s.t.  A x - r = 0,  lx <= x <= ux,  lr <= r <= ur,
+# where r are the row activities; a maximization is solved as min -c x.
+
+import numpy as np
+from ortools.linear_solver import linear_solver_pb2
+from ortools.linear_solver import pywraplp
+
+FREE = pywraplp.Solver.FREE
+AT_LOWER_BOUND = pywraplp.Solver.AT_LOWER_BOUND
+AT_UPPER_BOUND = pywraplp.Solver.AT_UPPER_BOUND
+FIXED_VALUE = pywraplp.Solver.FIXED_VALUE
+BASIC = pywraplp.Solver.BASIC
+
+# Feasibility tolerance, relative to the magnitude of the values compared
+TOLERANCE = 1e-9
+
+
+def _interval(values, directions, lower, upper):
+    """Returns the (low, high) step t for which lower <= values + t directions <= upper.
+
+    values and directions are (rows, columns): one column per direction.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        to_upper = (upper - values) / directions
+        to_lower = (lower - values) / directions
+    positive, negative = directions > TOLERANCE, directions < -TOLERANCE
+    high = np.where(positive, to_upper, np.where(negative, to_lower, np.inf)).min(axis=0)
+    low = np.where(positive, to_lower, np.where(negative, to_upper, -np.inf)).max(axis=0)
+    return np.minimum(low, 0.0), np.maximum(high, 0.0)
+
+
+class LpSensitivity:
+    """Sensitivity analysis of a pywraplp LP at its optimal basis."""
+
+    def __init__(self, solver):
+        proto = linear_solver_pb2.MPModelProto()
+        solver.ExportModelToProto(proto)
+        if any(variable.is_integer for variable in proto.variable):
+            raise ValueError('sensitivity analysis needs a linear model')
+        self.num_vars = num_vars = len(proto.variable)
+        self.num_constraints = num_constraints = len(proto.constraint)
+        self.maximize = proto.maximize
+        self.objective_offset = proto.objective_offset
+        self.objective_coefficients = np.array(
+            [variable.objective_coefficient for variable in proto.variable])
+        self.variable_lower_bounds = np.array([variable.lower_bound
+                                               for variable in proto.variable])
+        self.variable_upper_bounds = np.array([variable.upper_bound
+                                               for variable in proto.variable])
+        self.constraint_lower_bounds = np.array([constraint.lower_bound
+                                                 for constraint in proto.constraint])
+        self.constraint_upper_bounds = np.array([constraint.upper_bound
+                                                 for constraint in proto.constraint])
+        self.matrix = np.zeros((num_constraints, num_vars))
+        for i, constraint in enumerate(proto.constraint):
+            self.matrix[i, list(constraint.var_index)] = list(constraint.coefficient)
+
+        # Columns of x and r in A x - r = 0, and their basis statuses
+        self.columns = np.hstack([self.matrix, -np.eye(num_constraints)])
+        self.statuses = np.array([variable.basis_status() for variable in solver.variables()] +
+                                 [constraint.basis_status()
+                                  for constraint in solver.constraints()])
+        self.basic = np.flatnonzero(self.statuses == BASIC)
+        self.nonbasic = np.flatnonzero(self.statuses != BASIC)
+        if len(self.basic) != num_constraints:
+            raise ValueError('the solver has no optimal basis; solve the model with GLOP first')
+        try:
+            self.basis_inverse = np.linalg.inv(self.columns[:, self.basic])
+        except np.linalg.LinAlgError:
+            raise ValueError('the basis reported by the solver is singular') from None
+        # Basic values as a linear function of the nonbasic ones
+        self.tableau = self.basis_inverse @ self.columns[:, self.nonbasic]
+
+        lower = np.concatenate([self.variable_lower_bounds, self.constraint_lower_bounds])
+        upper = np.concatenate([self.variable_upper_bounds, self.constraint_upper_bounds])
+        self.values = self._nonbasic_values(lower[np.newaxis, :], upper[np.newaxis, :])[0]
+        self.values[self.basic] = -self.tableau @ self.values[self.nonbasic]
+
+        costs = np.concatenate([self._minimized(self.objective_coefficients),
+                                np.zeros(num_constraints)])
+        self._duals = costs[self.basic] @ self.basis_inverse
+        self._reduced_costs = costs - self._duals @ self.columns
+        self._fallback = None
+
+    def _minimized(self, objective_coefficients):
+        return -objective_coefficients if self.maximize else objective_coefficients
+
+    def _nonbasic_values(self, lower, upper):
+        """Returns the values of all of x and r (basic ones 0) for bounds of shape (k, n+m)."""
+        values = np.zeros(lower.shape)
+        values = np.where(self.statuses == AT_UPPER_BOUND, upper, values)
+        values = np.where((self.statuses == AT_LOWER_BOUND) | (self.statuses == FIXED_VALUE),
+                          lower, values)
+        return values
+
+    @property
+    def objective_value(self):
+        return float(self.objective_coefficients @ self.values[:self.num_vars] +
+                     self.objective_offset)
+
+    @property
+    def variable_values(self):
+        return self.values[:self.num_vars]
+
+    @property
+    def activities(self):
+        """Returns the values of the constraint rows A x."""
+        return self.values[self.num_vars:]
+
+    @property
+    def dual_values(self):
+        """Returns the change of the objective per unit increase of each active bound."""
+        return -self._duals if self.maximize else self._duals
+
+    @property
+    def reduced_costs(self):
+        reduced_costs = self._reduced_costs[:self.num_vars]
+        return -reduced_costs if self.maximize else reduced_costs
+
+    def objective_ranges(self):
+        """Returns (low, high) arrays: the objective coefficient ranges of the variables.
+
+        Each range keeps the basis optimal when only that coefficient changes.
+        """
+        reduced_costs = self._reduced_costs[self.nonbasic]
+        statuses = self.statuses[self.nonbasic]
+        low = np.zeros(self.num_vars)
+        high = np.zeros(self.num_vars)
+        for j in range(self.num_vars):
+            if self.statuses[j] == BASIC:
+                # A cost change t on basic variable k changes the reduced costs by -t tableau[k]
+                row = self.tableau[np.searchsorted(self.basic, j)]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    ratios = reduced_costs / row
+                at_lower = (statuses == AT_LOWER_BOUND) | (statuses == FREE)
+                at_upper = (statuses == AT_UPPER_BOUND) | (statuses == FREE)
+                high_limit = ((at_lower & (row > TOLERANCE)) |
+                              (at_upper & (row < -TOLERANCE)))
+                low_limit = ((at_lower & (row < -TOLERANCE)) |
+                             (at_upper & (row > TOLERANCE)))
+                low[j] = ratios[low_limit].max(initial=-np.inf)
+                high[j] = ratios[high_limit].min(initial=np.inf)
+            elif self.statuses[j] == AT_LOWER_BOUND:
+                low[j], high[j] = -self._reduced_costs[j], np.inf
+            elif self.statuses[j] == AT_UPPER_BOUND:
+                low[j], high[j] = -np.inf, -self._reduced_costs[j]
+            elif self.statuses[j] == FIXED_VALUE:
+                low[j], high[j] = -np.inf, np.inf
+        low, high = np.minimum(low, 0.0), np.maximum(high, 0.0)
+        costs = self._minimized(self.objective_coefficients)
+        if self.maximize:
+            return -(costs + high), -(costs + low)
+        return costs + low, costs + high
+
+    def rhs_ranges(self):
+        """Returns (low, high) arrays: the right-hand side ranges of the constraints.
+
+        Each range keeps the basis feasible, and so optimal, when only that right-hand side
+        changes. The right-hand side is the active bound, both bounds of an equality, or the finite
+        bound of an inactive one-sided constraint; the range is NaN for an inactive
+        constraint with two finite bounds.
+        """
+        low = np.full(self.num_constraints, np.nan)
+        high = np.full(self.num_constraints, np.nan)
+        lower = np.concatenate([self.variable_lower_bounds, self.constraint_lower_bounds])
+        upper = np.concatenate([self.variable_upper_bounds, self.constraint_upper_bounds])
+        basic_values = self.values[self.basic][:, np.newaxis]
+        # Moving the bound of nonbasic row i by t moves the basic values by t B^-1 e_i
+        steps = _interval(basic_values, self.basis_inverse, lower[self.basic][:, np.newaxis],
+                          upper[self.basic][:, np.newaxis])
+        for i in range(self.num_constraints):
+            status = self.statuses[self.num_vars + i]
+            activity = self.values[self.num_vars + i]
+            step_low, step_high = steps[0][i], steps[1][i]
+            if status == AT_LOWER_BOUND:
+                step_high = min(step_high, self.constraint_upper_bounds[i] - activity)
+            elif status == AT_UPPER_BOUND:
+                step_low = max(step_low, self.constraint_lower_bounds[i] - activity)
+            elif status == BASIC:
+                finite_lower = np.isfinite(self.constraint_lower_bounds[i])
+                finite_upper = np.isfinite(self.constraint_upper_bounds[i])
+                if finite_lower and not finite_upper:
+                    low[i], high[i] = -np.inf, activity
+                elif finite_upper and not finite_lower:
+                    low[i], high[i] = activity, np.inf
+                continue
+            low[i], high[i] = activity + step_low, activity + step_high
+        return low, high
+
+    def evaluate(self, objective_coefficients=None, constraint_lower_bounds=None,
+                 constraint_upper_bounds=None):
+        """Evaluates scenarios at the current basis.
+
+        Each argument is a (scenarios, n) array, or None to keep the base values. Returns
+        (optimal, objective_values, variable_values): optimal tells where the basis is
+        still optimal; the other two are only meaningful there.
+        """
+        arrays = [array for array in (objective_coefficients, constraint_lower_bounds,
+                                      constraint_upper_bounds) if array is not None]
+        num_scenarios = len(arrays[0]) if arrays else 1
+        if objective_coefficients is None:
+            objective_coefficients = np.tile(self.objective_coefficients, (num_scenarios, 1))
+        if constraint_lower_bounds is None:
+            constraint_lower_bounds = np.tile(self.constraint_lower_bounds,
+                                              (num_scenarios, 1))
+        if constraint_upper_bounds is None:
+            constraint_upper_bounds = np.tile(self.constraint_upper_bounds,
+                                              (num_scenarios, 1))
+        objective_coefficients = np.asarray(objective_coefficients, dtype=np.float64)
+        lower = np.hstack([np.tile(self.variable_lower_bounds, (num_scenarios, 1)),
+                           np.asarray(constraint_lower_bounds, dtype=np.float64)])
+        upper = np.hstack([np.tile(self.variable_upper_bounds, (num_scenarios, 1)),
+                           np.asarray(constraint_upper_bounds, dtype=np.float64)])
+
+        # Primal feasibility: nonbasic values at their (new) bounds, basic ones in theirs
+        values = self._nonbasic_values(lower, upper)
+        nonbasic_values = values[:, self.nonbasic]
+        values[:, self.basic] = -nonbasic_values @ self.tableau.T
+        scale = TOLERANCE * (1.0 + np.abs(values))
+        fixed = self.statuses[self.nonbasic] == FIXED_VALUE
+        optimal = (np.all(np.isfinite(nonbasic_values), axis=1) &
+                   np.all(values >= lower - scale, axis=1) &
+                   np.all(values <= upper + scale, axis=1) &
+                   np.all(lower[:, self.nonbasic[fixed]] == upper[:, self.nonbasic[fixed]],
+                          axis=1))
+
+        # Dual feasibility: reduced costs of the right sign at the nonbasic bounds
+        costs = np.zeros((num_scenarios, self.num_vars + self.num_constraints))
+        costs[:, :self.num_vars] = self._minimized(objective_coefficients)
+        reduced_costs = (costs[:, self.nonbasic] -
+                         (costs[:, self.basic] @ self.basis_inverse) @
+                         self.columns[:, self.nonbasic])
+        statuses = self.statuses[self.nonbasic]
+        scale = TOLERANCE * (1.0 + np.abs(costs).max(axis=1, keepdims=True))
+        signs = np.where(statuses == AT_LOWER_BOUND, reduced_costs >= -scale,
+                         np.where(statuses == AT_UPPER_BOUND, reduced_costs <= scale,
+                                  np.where(statuses == FREE, np.abs(reduced_costs) <= scale,
+                                           True)))
+        optimal &= np.all(signs, axis=1)
+
+        variable_values = values[:, :self.num_vars]
+        objective_values = (np.einsum('ij,ij->i', objective_coefficients, variable_values) +
+                            self.objective_offset)
+        return optimal, objective_values, variable_values
+
+    def _fallback_solver(self):
+        """Returns a GLOP copy of the model that keeps its basis between solves."""
+        if self._fallback is None:
+            proto = linear_solver_pb2.MPModelProto()
+            proto.maximize = self.maximize
+            proto.objective_offset = self.objective_offset
+            for j in range(self.num_vars):
+                proto.variable.add(lower_bound=self.variable_lower_bounds[j],
+                                   upper_bound=self.variable_upper_bounds[j],
+                                   objective_coefficient=self.objective_coefficients[j])
+            for i in range(self.num_constraints):
+                indices = np.flatnonzero(self.matrix[i])
+                proto.constraint.add(lower_bound=self.constraint_lower_bounds[i],
+                                     upper_bound=self.constraint_upper_bounds[i],
+                                     var_index=indices.tolist(),
+                                     coefficient=self.matrix[i, indices].tolist())
+            solver = pywraplp.Solver('sensitivity', pywraplp.Solver.GLOP_LINEAR_PROGRAMMING)
+            solver.LoadModelFromProto(proto)
+            solver.SetSolverSpecificParametersAsString('use_preprocessing:false')
+            self._fallback = (solver, self.objective_coefficients.copy(),
+                              self.constraint_lower_bounds.copy(),
+                              self.constraint_upper_bounds.copy())
+        return self._fallback
+
+    def _solve(self, objective_coefficients, constraint_lower_bounds, constraint_upper_bounds):
+        """Solves one scenario with the fallback solver; returns (status, objective, x)."""
+        solver, current_costs, current_lower, current_upper = self._fallback_solver()
+        variables, constraints = solver.variables(), solver.constraints()
+        objective = solver.Objective()
+        for j in np.flatnonzero(objective_coefficients != current_costs).tolist():
+            objective.SetCoefficient(variables[j], objective_coefficients[j])
+        changed = ((constraint_lower_bounds != current_lower) |
+                   (constraint_upper_bounds != current_upper))
+        for i in np.flatnonzero(changed).tolist():
+            constraints[i].SetBounds(constraint_lower_bounds[i], constraint_upper_bounds[i])
+        current_costs[:] = objective_coefficients
+        current_lower[:] = constraint_lower_bounds
+        current_upper[:] = constraint_upper_bounds
+        status = solver.Solve()
+        if status not in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+            return status, np.nan, np.full(self.num_vars, np.nan)
+        return (status, objective.Value(),
+                np.array([variable.solution_value() for variable in variables]))
+
+    def solve_scenarios(self, objective_coefficients=None, constraint_lower_bounds=None,
+                        constraint_upper_bounds=None):
+        """Solves scenarios, analytically where the basis stays optimal.
+
+        Takes the arguments of evaluate. Returns (statuses, objective_values,
+        variable_values, analytic) arrays; analytic tells which scenarios needed no solve.
+        """
+        analytic, objective_values, variable_values = self.evaluate(
+            objective_coefficients, constraint_lower_bounds, constraint_upper_bounds)
+        statuses = np.full(len(analytic), pywraplp.Solver.OPTIMAL)
+        for scenario in np.flatnonzero(~analytic).tolist():
+            (statuses[scenario], objective_values[scenario],
+             variable_values[scenario]) = self._solve(
+                self.objective_coefficients if objective_coefficients is None
+                else np.asarray(objective_coefficients[scenario], dtype=np.float64),
+                self.constraint_lower_bounds if constraint_lower_bounds is None
+                else np.asarray(constraint_lower_bounds[scenario], dtype=np.float64),
+                self.constraint_upper_bounds if constraint_upper_bounds is None
+                else np.asarray(constraint_upper_bounds[scenario], dtype=np.float64))
+        return statuses, objective_values, variable_values, analytic
@@ -0,0 +1,103 @@
+# Benchmark: serial rebuild-and-solve loops vs a warm solver vs the batch_solve pool
+
+# Draws scenarios of "MIP with Array.py" (new `bounds` and `obj_coeffs`) and of
+# "x + 10y Example.py" (new right-hand sides and objective) and solves them three ways:
+# cold, rebuilding the model with the scripts' loops for every scenario; warm, with one
+# ScenarioSolver in this process; and with batch_solve.solve_batch over a pool of workers.
+# Reports scenarios per second and checks that all three find the same objectives.
+# Usage: python "Batch Solve Benchmark.py" [scenarios] [workers] [solver] [seed]
+
+import os
+import sys
+import time
+
+import numpy as np
+from ortools.linear_solver import pywraplp
+
+from batch_solve import ScenarioSolver
+from batch_solve import mip_with_array_model
+from batch_solve import solve_batch
+
+num_scenarios = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+solver_id = sys.argv[3] if len(sys.argv) > 3 else 'SCIP'
+seed = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+
+MIP_WITH_ARRAY_DATA = {
+    'constraint_coeffs': [[5, 7, 9, 2, 1], [18, 4, -9, 10, 12], [4, 7, 3, 8, 5],
+                          [5, 13, 16, 3, -7]],
+    'bounds': [250, 285, 211, 315],
+    'obj_coeffs': [7, 8, 2, 9, 6],
+    'num_vars': 5,
+    'num_constraints': 4,
+}
+
+# Maximize x + 10y subject to x + 7y <= 17.5, x <= 3.5, x, y >= 0 integers
+X_PLUS_10Y_MODEL = {
+    'constraint_matrix': np.array([[1.0, 7.0], [1.0, 0.0]]),
+    'constraint_lower_bounds': -np.inf,
+    'constraint_upper_bounds': np.array([17.5, 3.5]),
+    'objective_coefficients': np.array([1.0, 10.0]),
+    'integer': True, 'maximize': True, 'variable_names': ['x', 'y'],
+}
+
+
+def solve_cold(model, scenarios, index):
+    """Builds the model with per-coefficient loops, as the scripts do, and solves it."""
+    solver = pywraplp.Solver.CreateSolver(solver_id)
+    matrix = model['constraint_matrix']
+    upper = scenarios['constraint_upper_bounds'][index]
+    lower = np.broadcast_to(model['constraint_lower_bounds'], upper.shape)
+    x = [solver.IntVar(0, solver.infinity(), name) for name in model['variable_names']]
+    for i in range(len(matrix)):
+        constraint = solver.RowConstraint(lower[i], upper[i], '')
+        for j in range(len(x)):
+            constraint.SetCoefficient(x[j], matrix[i][j])
+    objective = solver.Objective()
+    for j, coefficient in enumerate(scenarios['objective_coefficients'][index]):
+        objective.SetCoefficient(x[j], coefficient)
+    objective.SetMaximization()
+    solver.Solve()
+    return objective.Value()
+
+
+def timed(function):
+    start_time = time.perf_counter()
+    objectives = function()
+    return np.array(objectives, dtype=np.float64), time.perf_counter() - start_time
+
+
+def solve_in_pool(model, scenarios):
+    objectives = np.full(num_scenarios, np.nan)
+    for result in solve_batch(model, scenarios, solver_id, max_workers):
+        objectives[result.index] = result.objective
+    return objectives
+
+
+rng = np.random.default_rng(seed)
+cases = [
+    ('MIP with Array', mip_with_array_model(MIP_WITH_ARRAY_DATA), {
+        'constraint_upper_bounds': rng.integers(150, 400, (num_scenarios, 4)).astype(float),
+        'objective_coefficients': rng.integers(1, 10, (num_scenarios, 5)).astype(float)}),
+    ('x + 10y Example', X_PLUS_10Y_MODEL, {
+        'constraint_upper_bounds': np.round(rng.uniform(2, 40, (num_scenarios, 2)), 1),
+        'objective_coefficients': rng.integers(1, 20, (num_scenarios, 2)).astype(float)}),
+]
+
+print('{} scenarios, {}, {} workers on {} CPUs\n'.format(num_scenarios, solver_id, max_workers,
+                                                         os.cpu_count()))
+print('{:18} {:>9} {:>9} {:>9} {:>8}  {}'.format('model', 'cold /s', 'warm /s', 'pool /s',
+                                                  'speedup', 'same objectives'))
+for name, model, scenarios in cases:
+    cold, cold_time = timed(lambda: [solve_cold(model, scenarios, index)
+                                     for index in range(num_scenarios)])
+    scenario_solver = ScenarioSolver(model, solver_id)
+    warm, warm_time = timed(lambda: [
+        scenario_solver.solve(index, {field: values[index]
+                                      for field, values in scenarios.items()}).objective
+        for index in range(num_scenarios)])
+    pool, pool_time = timed(lambda: solve_in_pool(model, scenarios))
+    same = np.allclose(cold, warm) and np.allclose(cold, pool)
+    print('{:18} {:9.0f} {:9.0f} {:9.0f} {:7.1f}x  {}'.format(
+        name, num_scenarios / cold_time, num_scenarios / warm_time,
+        num_scenarios / pool_time, cold_time / pool_time, same))
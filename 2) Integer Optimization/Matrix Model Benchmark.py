@@ -0,0 +1,143 @@
+# Benchmark: per-coefficient loops vs bulk matrix-form model construction
+
+# Builds the same models twice, once with the RowConstraint / SetCoefficient loops of
+# "MIP with Array.py" and "Stigler Diet.py" and once with matrix_model.load_matrix_model,
+# checks that the two models are identical and reports the build times. A CSR matrix with
+# explicit zeros and empty rows checks that the zeros are dropped as the loops drop them.
+# Usage: python "Matrix Model Benchmark.py" [nonzeros] [seed]
+# e.g. python "Matrix Model Benchmark.py" 1000000
+
+import os
+import sys
+import time
+
+import numpy as np
+from ortools.linear_solver import pywraplp
+
+# The shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instances import diet  # noqa: E402
+from instances import diet_tables  # noqa: E402
+from matrix_model import CsrMatrix  # noqa: E402
+from matrix_model import load_matrix_model  # noqa: E402
+from matrix_model import model_terms  # noqa: E402
+
+max_nonzeros = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+
+def mip_with_array_data(num_constraints, num_vars, rng):
+    """Returns data in the layout of "MIP with Array.py", about 70% nonzero."""
+    coeffs = rng.integers(-5, 20, size=(num_constraints, num_vars))
+    coeffs[rng.random(coeffs.shape) < 0.3] = 0
+    return {'constraint_coeffs': coeffs.tolist(),
+            'bounds': rng.integers(200, 400, size=num_constraints).tolist(),
+            'obj_coeffs': rng.integers(1, 10, size=num_vars).tolist(),
+            'num_vars': num_vars, 'num_constraints': num_constraints}
+
+
+def build_mip_with_loops(data):
+    solver = pywraplp.Solver.CreateSolver('SCIP')
+    infinity = solver.infinity()
+    x = {}
+    for j in range(data['num_vars']):
+        x[j] = solver.IntVar(0, infinity, 'x[%i]' % j)
+    for i in range(data['num_constraints']):
+        constraint = solver.RowConstraint(0, data['bounds'][i], '')
+        for j in range(data['num_vars']):
+            constraint.SetCoefficient(x[j], data['constraint_coeffs'][i][j])
+    objective = solver.Objective()
+    for j in range(data['num_vars']):
+        objective.SetCoefficient(x[j], data['obj_coeffs'][j])
+    objective.SetMaximization()
+    return solver
+
+
+def build_mip_in_bulk(data):
+    solver = pywraplp.Solver.CreateSolver('SCIP')
+    load_matrix_model(solver, np.array(data['constraint_coeffs']), 0, data['bounds'],
+                      data['obj_coeffs'], integer=True, maximize=True,
+                      variable_names=['x[%i]' % j for j in range(data['num_vars'])])
+    return solver
+
+
+def with_explicit_zeros(data, rng):
+    """Adds a CSR copy of the constraint matrix with explicit zeros and empty rows."""
+    coeffs = np.array(data['constraint_coeffs'])
+    # Empty rows in the middle and at the end, and a row of one explicit zero before it
+    coeffs[[len(coeffs) // 2, -2, -1]] = 0
+    stored = (coeffs != 0) | (rng.random(coeffs.shape) < 0.1)
+    stored[[len(coeffs) // 2, -2, -1]] = False
+    stored[-2, 0] = True
+    rows, columns = np.nonzero(stored)
+    indptr = np.concatenate([[0], np.cumsum(stored.sum(axis=1))])
+    data = dict(data, constraint_coeffs=coeffs.tolist())
+    data['csr'] = CsrMatrix(coeffs.shape, indptr, columns, coeffs[rows, columns])
+    return data
+
+
+def build_csr_in_bulk(data):
+    solver = pywraplp.Solver.CreateSolver('SCIP')
+    load_matrix_model(solver, data['csr'], 0, data['bounds'], data['obj_coeffs'],
+                      integer=True, maximize=True,
+                      variable_names=['x[%i]' % j for j in range(data['num_vars'])])
+    return solver
+
+
+def build_diet_with_loops(tables):
+    nutrients, data = tables
+    solver = pywraplp.Solver('StiglerDietExample', pywraplp.Solver.GLOP_LINEAR_PROGRAMMING)
+    foods = [solver.NumVar(0.0, solver.infinity(), item[0]) for item in data]
+    constraints = []
+    for i, nutrient in enumerate(nutrients):
+        constraints.append(solver.Constraint(nutrient[1], solver.infinity()))
+        for j, item in enumerate(data):
+            constraints[i].SetCoefficient(foods[j], item[i+3])
+    objective = solver.Objective()
+    for food in foods:
+        objective.SetCoefficient(food, 1)
+    objective.SetMinimization()
+    return solver
+
+
+def build_diet_in_bulk(tables):
+    nutrients, data = tables
+    solver = pywraplp.Solver('StiglerDietExample', pywraplp.Solver.GLOP_LINEAR_PROGRAMMING)
+    # Foods are columns, nutrients are rows
+    values = np.array([item[3:] for item in data], dtype=np.float64).T
+    load_matrix_model(solver, values, [nutrient[1] for nutrient in nutrients], np.inf, 1.0,
+                      variable_names=[item[0] for item in data])
+    return solver
+
+
+def timed(function, argument):
+    start_time = time.perf_counter()
+    solver = function(argument)
+    return solver, time.perf_counter() - start_time
+
+
+rng = np.random.default_rng(seed)
+cases = []
+for num_constraints, num_vars in [(4, 5), (100, 100), (100, 1000), (1000, 1000)]:
+    if num_constraints * num_vars <= max_nonzeros * 1.5:
+        cases.append(('MIP with Array {}x{}'.format(num_constraints, num_vars),
+                      build_mip_with_loops, build_mip_in_bulk,
+                      mip_with_array_data(num_constraints, num_vars, rng)))
+# Explicit zeros are dropped like SetCoefficient drops zeros, around empty rows too
+cases.append(('CSR with explicit zeros 6x5', build_mip_with_loops, build_csr_in_bulk,
+              with_explicit_zeros(mip_with_array_data(6, 5, rng), rng)))
+for num_foods in [77, 10000, 100000]:
+    if num_foods * 9 <= max_nonzeros * 1.5:
+        cases.append(('Stigler Diet 9x{}'.format(num_foods), build_diet_with_loops,
+                      build_diet_in_bulk, diet_tables(diet(num_foods, seed=seed))))
+
+print('{:26} {:>10} {:>10} {:>10} {:>8}  {}'.format(
+    'model', 'nonzeros', 'loops s', 'bulk s', 'speedup', 'identical'))
+for name, with_loops, in_bulk, data in cases:
+    loop_solver, loop_time = timed(with_loops, data)
+    bulk_solver, bulk_time = timed(in_bulk, data)
+    loop_model = model_terms(loop_solver)
+    identical = loop_model == model_terms(bulk_solver)
+    nonzeros = sum(len(constraint.var_index) for constraint in loop_model.constraint)
+    print('{:26} {:10} {:10.4f} {:10.4f} {:7.1f}x  {}'.format(
+        name, nonzeros, loop_time, bulk_time, loop_time / bulk_time, identical))
@@ -0,0 +1,252 @@
+# Batch solve of many variants of one LP/MIP model in a pool of worker processes
+
+# The overnight jobs solve tens of thousands of small models that share their constraint
+# matrix and differ in bounds and objective coefficients ("MIP with Array.py" with other
+# `bounds` and `obj_coeffs`). Building a pywraplp model per variant costs more than
+# solving it, so each worker process builds the model once, with
+# matrix_model.load_matrix_model, and ScenarioSolver only updates the coefficients and
+# bounds that change from one scenario to the next before calling Solve again.
+# solve_batch shards the scenarios into chunks, sends them to the workers and yields the
+# results as they arrive, in completion order. Each scenario gets the solver time limit
+# time_limit; a worker that sends nothing for timeout seconds (stuck in native code) is
+# killed and its scenario reported as TIMEOUT, and a worker that dies (a crash in the
+# solver) has its scenario reported as CRASHED. Either way the worker is replaced and the
+# rest of its chunk is solved again, so one bad instance never stops the batch.
+# The workers are plain processes connected by pipes rather than a ProcessPoolExecutor:
+# an executor cannot kill a single stuck task, and one dead worker breaks the whole pool.
+
+import collections
+import multiprocessing
+import multiprocessing.connection
+import os
+import sys
+import time
+
+import numpy as np
+from ortools.linear_solver import pywraplp
+
+# The shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from matrix_model import load_matrix_model  # noqa: E402
+
+# Scenario arrays, one row per scenario; each replaces the model argument of the same name
+SCENARIO_FIELDS = ('objective_coefficients', 'constraint_lower_bounds',
+                   'constraint_upper_bounds', 'variable_lower_bounds', 'variable_upper_bounds')
+
+STATUSES = {pywraplp.Solver.OPTIMAL: 'OPTIMAL', pywraplp.Solver.FEASIBLE: 'FEASIBLE',
+            pywraplp.Solver.INFEASIBLE: 'INFEASIBLE', pywraplp.Solver.UNBOUNDED: 'UNBOUNDED',
+            pywraplp.Solver.ABNORMAL: 'ABNORMAL', pywraplp.Solver.MODEL_INVALID: 'MODEL_INVALID',
+            pywraplp.Solver.NOT_SOLVED: 'NOT_SOLVED'}
+
+ScenarioResult = collections.namedtuple(
+    'ScenarioResult', ['index', 'status', 'objective', 'values', 'seconds', 'worker', 'error'])
+
+
+def mip_with_array_model(data):
+    """Returns the model of "MIP with Array.py" data in the form of load_matrix_model."""
+    return {'constraint_matrix': np.array(data['constraint_coeffs'], dtype=np.float64),
+            'constraint_lower_bounds': 0.0,
+            'constraint_upper_bounds': np.array(data['bounds'], dtype=np.float64),
+            'objective_coefficients': np.array(data['obj_coeffs'], dtype=np.float64),
+            'integer': True, 'maximize': True,
+            'variable_names': ['x[%i]' % j for j in range(data['num_vars'])]}
+
+
+class ScenarioSolver:
+    """A model built once and re-solved for scenarios that change bounds and objective."""
+
+    def __init__(self, model, solver_id='SCIP', time_limit=None, return_values=False):
+        self.solver = pywraplp.Solver.CreateSolver(solver_id)
+        if self.solver is None:
+            raise ValueError('solver {} is not available'.format(solver_id))
+        self.variables = load_matrix_model(self.solver, **model)
+        self.constraints = self.solver.constraints()
+        self.objective = self.solver.Objective()
+        self.return_values = return_values
+        if time_limit:
+            self.solver.SetTimeLimit(int(time_limit * 1000))
+        # Current value of every scenario field, to only update what changes
+        self.current = {
+            'objective_coefficients': np.array([self.objective.GetCoefficient(variable)
+                                                for variable in self.variables]),
+            'constraint_lower_bounds': np.array([c.lb() for c in self.constraints]),
+            'constraint_upper_bounds': np.array([c.ub() for c in self.constraints]),
+            'variable_lower_bounds': np.array([v.lb() for v in self.variables]),
+            'variable_upper_bounds': np.array([v.ub() for v in self.variables]),
+        }
+        self.setters = {
+            'objective_coefficients': lambda j, value: self.objective.SetCoefficient(
+                self.variables[j], value),
+            'constraint_lower_bounds': lambda i, value: self.constraints[i].SetLb(value),
+            'constraint_upper_bounds': lambda i, value: self.constraints[i].SetUb(value),
+            'variable_lower_bounds': lambda j, value: self.variables[j].SetLb(value),
+            'variable_upper_bounds': lambda j, value: self.variables[j].SetUb(value),
+        }
+
+    def solve(self, index, scenario):
+        """Solves one scenario, a dict of SCENARIO_FIELDS rows; returns a ScenarioResult."""
+        start_time = time.perf_counter()
+        for field, values in scenario.items():
+            values = np.asarray(values, dtype=np.float64)
+            current = self.current[field]
+            setter = self.setters[field]
+            for position in np.flatnonzero(values != current).tolist():
+                setter(position, values[position])
+            current[:] = values
+        status = self.solver.Solve()
+        objective, values = None, None
+        if status in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+            objective = self.objective.Value()
+            if self.return_values:
+                values = np.array([variable.solution_value() for variable in self.variables])
+        return ScenarioResult(index, STATUSES.get(status, str(status)), objective, values,
+                              time.perf_counter() - start_time, os.getpid(), None)
+
+
+def scenario_rows(scenarios, indices):
+    """Returns the rows of the scenario arrays for the given scenario indices."""
+    return {field: np.asarray(values)[indices] for field, values in scenarios.items()}
+
+
+def _worker_main(connection, model, solver_id, time_limit, return_values):
+    """Worker process: builds the model, then solves the chunks it receives."""
+    try:
+        scenario_solver = ScenarioSolver(model, solver_id, time_limit, return_values)
+    except Exception as error:
+        connection.send(('failed', repr(error)))
+        return
+    connection.send(('ready',))
+    while True:
+        task = connection.recv()
+        if task is None:
+            return
+        indices, rows = task
+        for position, index in enumerate(indices):
+            scenario = {field: values[position] for field, values in rows.items()}
+            try:
+                result = scenario_solver.solve(index, scenario)
+            except Exception as error:
+                result = ScenarioResult(index, 'ERROR', None, None, 0.0, os.getpid(),
+                                        repr(error))
+            connection.send(('result', result))
+
+
+class _Worker:
+    """A worker process, its pipe and the scenarios it still has to answer."""
+
+    def __init__(self, context, model, solver_id, time_limit, return_values):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, daemon=True,
+            args=(child_connection, model, solver_id, time_limit, return_values))
+        self.process.start()
+        child_connection.close()
+        self.ready = False
+        self.pending = collections.deque()
+        self.last_message = time.monotonic()
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.connection.send(None)
+            except OSError:
+                pass
+        self.process.join(None if kill else 1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+
+
+def solve_batch(model, scenarios, solver_id='SCIP', max_workers=None, chunk_size=None,
+                time_limit=None, timeout=None, return_values=False):
+    """Solves every scenario of a model in worker processes and yields the results.
+
+    model holds the keyword arguments of matrix_model.load_matrix_model; scenarios maps
+    SCENARIO_FIELDS names to arrays with one row per scenario. Results are ScenarioResult
+    tuples, yielded as they arrive; index is the scenario's row. time_limit (seconds) is the
+    solver limit per scenario, and a worker silent for timeout seconds (default: twice the
+    time limit plus 10 s, or none without a time limit) is killed.
+    """
+    unknown = set(scenarios) - set(SCENARIO_FIELDS)
+    if unknown:
+        raise ValueError('unknown scenario fields: {}'.format(', '.join(sorted(unknown))))
+    num_scenarios = len(next(iter(scenarios.values()))) if scenarios else 0
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, num_scenarios))
+    if chunk_size is None:
+        # Several chunks per worker balance the load; at most 256 keep the requeues cheap
+        chunk_size = max(1, min(256, num_scenarios // (8 * max_workers)))
+    if timeout is None and time_limit:
+        timeout = 2 * time_limit + 10
+    chunks = collections.deque(list(range(start, min(start + chunk_size, num_scenarios)))
+                               for start in range(0, num_scenarios, chunk_size))
+
+    context = multiprocessing.get_context()
+
+    def start_worker():
+        return _Worker(context, model, solver_id, time_limit, return_values)
+
+    workers = [start_worker() for _ in range(max_workers)]
+    remaining = num_scenarios
+
+    def replace(worker, status):
+        """Reports the worker's current scenario, requeues the rest and restarts it."""
+        index = worker.pending.popleft()
+        if worker.pending:
+            chunks.appendleft(list(worker.pending))
+        worker.stop(kill=True)
+        workers[workers.index(worker)] = start_worker()
+        return ScenarioResult(index, status, None, None, None, worker.process.pid, None)
+
+    try:
+        while remaining:
+            for worker in workers:
+                if worker.ready and not worker.pending and chunks:
+                    indices = chunks.popleft()
+                    worker.connection.send((indices, scenario_rows(scenarios, indices)))
+                    worker.pending.extend(indices)
+                    worker.last_message = time.monotonic()
+
+            # Messages first, so results sent just before a crash are not lost
+            connections = [worker.connection for worker in workers]
+            sentinels = [worker.process.sentinel for worker in workers]
+            wait_time = None
+            if timeout is not None:
+                wait_time = max(0.0, min(
+                    [worker.last_message + timeout - time.monotonic()
+                     for worker in workers if worker.pending] or [timeout]))
+            ready = multiprocessing.connection.wait(connections + sentinels, wait_time)
+            for worker in list(workers):
+                while worker.connection in ready and worker.connection.poll():
+                    try:
+                        message = worker.connection.recv()
+                    except (EOFError, OSError):
+                        break
+                    worker.last_message = time.monotonic()
+                    if message[0] == 'ready':
+                        worker.ready = True
+                    elif message[0] == 'failed':
+                        raise RuntimeError('worker could not build the model: ' + message[1])
+                    else:
+                        worker.pending.popleft()
+                        remaining -= 1
+                        yield message[1]
+                if not worker.process.is_alive():
+                    if not worker.ready:
+                        raise RuntimeError('worker died while building the model (exit code '
+                                           '{})'.format(worker.process.exitcode))
+                    if worker.pending:
+                        remaining -= 1
+                        yield replace(worker, 'CRASHED')
+                    else:
+                        worker.stop(kill=True)
+                        workers[workers.index(worker)] = start_worker()
+                elif (timeout is not None and worker.pending and
+                      time.monotonic() - worker.last_message > timeout):
+                    remaining -= 1
+                    yield replace(worker, 'TIMEOUT')
+    finally:
+        for worker in workers:
+            worker.stop(kill=remaining > 0)
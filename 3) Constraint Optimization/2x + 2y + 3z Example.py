@@ -7,8 +7,15 @@
 # x, y, z ≥ 0
 # x, y, z are integers
 
+import os
+import sys
+
 from ortools.sat.python import cp_model
 
+# The shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cp_sat_config import create_solver  # noqa: E402
+
 model = cp_model.CpModel()
 
 # Create the variables
@@ -25,7 +32,7 @@ model.Add(5 * x + 2 * y - 6 * z <= 37)
 # Define the objective function
 model.Maximize(2 * x + 2 * y + 3 * z)
 
-solver = cp_model.CpSolver()
+solver = create_solver()
 status = solver.Solve(model)
 
 if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
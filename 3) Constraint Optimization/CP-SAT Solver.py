@@ -2,8 +2,15 @@
 
 # Problem: There are 3 variables, x, y, and z, each of which can take on the values: 0, 1, or 2. x ≠ y
 
+import os
+import sys
+
 from ortools.sat.python import cp_model
 
+# The shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cp_sat_config import create_solver  # noqa: E402
+
 class VarArraySolutionPrinter(cp_model.CpSolverSolutionCallback):
     """Print intermediate solutions."""
 
@@ -32,10 +39,8 @@ z = model.NewIntVar(0, num_vals - 1, 'z')
 # Define constraint
 model.Add(x != y)
 
-solver = cp_model.CpSolver()
+solver = create_solver(enumerate_all=True)
 solution_printer = VarArraySolutionPrinter([x, y, z])
-# Enumerate all solutions.
-solver.parameters.enumerate_all_solutions = True
 # Solve.
 status = solver.Solve(model, solution_printer)
 
@@ -1,7 +1,16 @@
 # https://developers.google.com/optimization/cp/cryptarithmetic
 
+import os
+import sys
+
 from ortools.sat.python import cp_model
 
+from cryptarithm import word_equation_model
+
+# The shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cp_sat_config import create_solver  # noqa: E402
+
 class VarArraySolutionPrinter(cp_model.CpSolverSolutionCallback):
     """Print intermediate solutions."""
 
@@ -19,41 +28,21 @@ class VarArraySolutionPrinter(cp_model.CpSolverSolutionCallback):
     def solution_count(self):
         return self.__solution_count 
 
-model = cp_model.CpModel()
-
 base = 10
 
-c = model.NewIntVar(1, base - 1, 'C')
-p = model.NewIntVar(0, base - 1, 'P')
-i = model.NewIntVar(1, base - 1, 'I')
-s = model.NewIntVar(0, base - 1, 'S')
-f = model.NewIntVar(1, base - 1, 'F')
-u = model.NewIntVar(0, base - 1, 'U')
-n = model.NewIntVar(0, base - 1, 'N')
-t = model.NewIntVar(1, base - 1, 'T')
-r = model.NewIntVar(0, base - 1, 'R')
-e = model.NewIntVar(0, base - 1, 'E')
-
-# We need to group variables in a list to use the constraint AllDifferent.
-letters = [c, p, i, s, f, u, n, t, r, e]
-
-# Verify that we have enough digits.
-assert base >= len(letters)
-
-model.AddAllDifferent(letters)
-
 # CP + IS + FUN = TRUE
-model.Add(c * base + p + i * base + s + f * base * base + u * base +
-          n == t * base * base * base + r * base * base + u * base + e)
+model, variables = word_equation_model(['CP', 'IS', 'FUN'], 'TRUE', base)
+
+# The letters C, P, I, S, F, U, N, T, R, E, in order of appearance.
+letters = list(variables.values())
 
-solver = cp_model.CpSolver()
+solver = create_solver(enumerate_all=True)
 solution_printer = VarArraySolutionPrinter(letters)
-solver.parameters.enumerate_all_solutions = True
 status = solver.Solve(model, solution_printer)
 
 print('\nStatistics')
-    print(f'  status   : {solver.StatusName(status)}')
-    print(f'  conflicts: {solver.NumConflicts()}')
-    print(f'  branches : {solver.NumBranches()}')
-    print(f'  wall time: {solver.WallTime()} s')
-    print(f'  sol found: {solution_printer.solution_count()}')
\ No newline at end of file
+print(f'  status   : {solver.StatusName(status)}')
+print(f'  conflicts: {solver.NumConflicts()}')
+print(f'  branches : {solver.NumBranches()}')
+print(f'  wall time: {solver.WallTime()} s')
+print(f'  sol found: {solution_printer.solution_count()}')
\ No newline at end of file
@@ -0,0 +1,91 @@
+# Benchmark: building cryptarithm and N-Queens models with operators vs in bulk
+
+# Times the model construction alone (no solve) two ways. Cryptarithms: random_puzzle word
+# equations built as "Cryptarithmetic Puzzle.py" writes CP + IS + FUN = TRUE, chaining
+# + and * on the letter variables, and with cryptarithm.word_equation_model, which passes
+# the accumulated place values to LinearExpr.WeightedSum in one call. N-Queens: the
+# diagonals built with the queens[i] + i generators of "N-Queens Problem.py", and with
+# n_queens.n_queens_model, which writes them into the model proto. Both builds of a
+# model are checked to give the same constraints. Reports the best of several builds.
+# Usage: python "Model Build Benchmark.py" [repeats] [seed]
+
+import sys
+import time
+
+from ortools.sat.python import cp_model
+
+from cryptarithm import random_puzzle
+from cryptarithm import word_equation_model
+from n_queens import n_queens_model
+
+repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+
+def chained_word_equation_model(addends, result, base):
+    model = cp_model.CpModel()
+    words = addends + [result]
+    leading = {word[0] for word in words if len(word) > 1}
+    variables = {letter: model.NewIntVar(1 if letter in leading else 0, base - 1, letter)
+                 for letter in dict.fromkeys(''.join(words))}
+    model.AddAllDifferent(variables.values())
+    sides = []
+    for side in (addends, [result]):
+        expression = 0
+        for word in side:
+            for place, letter in enumerate(reversed(word)):
+                expression = expression + variables[letter] * base ** place
+        sides.append(expression)
+    model.Add(sides[0] == sides[1])
+    return model, variables
+
+
+def generator_n_queens_model(board_size):
+    model = cp_model.CpModel()
+    queens = [model.NewIntVar(0, board_size - 1, 'x%i' % i) for i in range(board_size)]
+    model.AddAllDifferent(queens)
+    model.AddAllDifferent(queens[i] + i for i in range(board_size))
+    model.AddAllDifferent(queens[i] - i for i in range(board_size))
+    return model, queens
+
+
+def best_time(build):
+    times = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        model, _ = build()
+        times.append(time.perf_counter() - start_time)
+    return min(times), model
+
+
+def same_word_equation(first, second):
+    """Compares two word equation models up to the order, merging and sign of the terms."""
+    def weights(model):
+        linear = model.Proto().constraints[-1].linear
+        totals = {}
+        for variable, coefficient in zip(linear.vars, linear.coeffs):
+            totals[variable] = totals.get(variable, 0) + coefficient
+        return {variable: total for variable, total in totals.items() if total}
+
+    first_weights, second_weights = weights(first), weights(second)
+    negated = {variable: -total for variable, total in second_weights.items()}
+    return (first_weights in (second_weights, negated) and
+            first.Proto().variables == second.Proto().variables)
+
+
+print('{:32} {:>12} {:>12} {:>8}  {}'.format('model', 'operators ms', 'bulk ms', 'speedup',
+                                             'same model'))
+for num_words, base in [(10, 10), (100, 10), (100, 36), (1000, 10), (1000, 52)]:
+    addends, result, _ = random_puzzle(num_words, base, seed)
+    chained_time, chained = best_time(
+        lambda: chained_word_equation_model(addends, result, base))
+    bulk_time, bulk = best_time(lambda: word_equation_model(addends, result, base))
+    print('{:32} {:12.2f} {:12.2f} {:7.1f}x  {}'.format(
+        'cryptarithm {} words, base {}'.format(num_words, base), 1e3 * chained_time,
+        1e3 * bulk_time, chained_time / bulk_time, same_word_equation(chained, bulk)))
+for board_size in [100, 1000, 10000]:
+    generator_time, generated = best_time(lambda: generator_n_queens_model(board_size))
+    bulk_time, bulk = best_time(lambda: n_queens_model(board_size))
+    print('{:32} {:12.2f} {:12.2f} {:7.1f}x  {}'.format(
+        'N-Queens {}'.format(board_size), 1e3 * generator_time, 1e3 * bulk_time,
+        generator_time / bulk_time, generated.Proto() == bulk.Proto()))
@@ -2,10 +2,18 @@
 
 # Problem: How can N queens be placed on an NxN chessboard so that no two of them attack each other?
 
+import os
 import sys
 import time
 from ortools.sat.python import cp_model
 
+from n_queens import expand_solutions
+from n_queens import n_queens_model
+
+# The shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cp_sat_config import create_solver  # noqa: E402
+
 class NQueenSolutionPrinter(cp_model.CpSolverSolutionCallback):
     """Print intermediate solutions."""
 
@@ -14,15 +22,20 @@ class NQueenSolutionPrinter(cp_model.CpSolverSolutionCallback):
         self.__queens = queens
         self.__solution_count = 0
         self.__start_time = time.time()
+        self.__solutions = []
 
     def solution_count(self):
         return self.__solution_count
 
+    def solutions(self):
+        return self.__solutions
+
     def on_solution_callback(self):
         current_time = time.time()
         print('Solution %i, time = %f s' %
               (self.__solution_count, current_time - self.__start_time))
         self.__solution_count += 1
+        self.__solutions.append([self.Value(queen) for queen in self.__queens])
 
         all_queens = range(len(self.__queens))
         for i in all_queens:
@@ -35,26 +48,17 @@ class NQueenSolutionPrinter(cp_model.CpSolverSolutionCallback):
             print()
         print()
 
-model = cp_model.CpModel()
-
 board_size = 8
+# Only find the fundamental solutions, one per class of rotations and reflections
+break_symmetry = False
 
-# The array index is the column, and the value is the row.
-queens = [
-    model.NewIntVar(0, board_size - 1, 'x%i' % i) for i in range(board_size)
-]
-
-# All rows/columns must be different.
-model.AddAllDifferent(queens)
-
-# No two queens can be on the same diagonal.
-model.AddAllDifferent(queens[i] + i for i in range(board_size))
-model.AddAllDifferent(queens[i] - i for i in range(board_size))
+# The array index is the column, and the value is the row. All rows must be different,
+# and no two queens can be on the same diagonal.
+model, queens = n_queens_model(board_size, break_symmetry)
 
 # Solve the model.
-solver = cp_model.CpSolver()
+solver = create_solver(enumerate_all=True)
 solution_printer = NQueenSolutionPrinter(queens)
-solver.parameters.enumerate_all_solutions = True
 solver.Solve(model, solution_printer)
 
 # Statistics
@@ -62,4 +66,6 @@ print('\nStatistics')
 print(f'  conflicts      : {solver.NumConflicts()}')
 print(f'  branches       : {solver.NumBranches()}')
 print(f'  wall time      : {solver.WallTime()} s')
-print(f'  solutions found: {solution_printer.solution_count()}')
\ No newline at end of file
+print(f'  solutions found: {solution_printer.solution_count()}')
+if break_symmetry:
+    print(f'  all solutions  : {len(expand_solutions(solution_printer.solutions()))}')
\ No newline at end of file
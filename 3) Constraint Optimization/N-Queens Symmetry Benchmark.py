@@ -0,0 +1,69 @@
+# Benchmark: enumerating all N-Queens solutions vs the fundamental ones
+
+# Solves N-Queens for N from 8 to the given size in two modes, all solutions (the model of
+# "N-Queens Problem.py") and fundamental solutions only (n_queens.add_symmetry_breaking),
+# collecting the solutions with SolutionCollector. Reports the solve time, the time spent
+# in the callback per solution and, for the fundamental solutions, the time
+# expand_solutions takes to rebuild the full set, checked against the full enumeration
+# where it was run. The full enumeration is skipped above the second size: it takes hours
+# at N = 16 (14772512 solutions).
+# Usage: python "N-Queens Symmetry Benchmark.py" [largest N] [largest N for all solutions]
+
+import sys
+import time
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from n_queens import expand_solutions
+from n_queens import n_queens_model
+from solution_collector import SolutionCollector
+
+largest_board_size = int(sys.argv[1]) if len(sys.argv) > 1 else 11
+largest_full_size = int(sys.argv[2]) if len(sys.argv) > 2 else min(largest_board_size, 11)
+
+
+class TimedCollector(SolutionCollector):
+    """A SolutionCollector that measures the time spent in its callback."""
+
+    def __init__(self, variables):
+        SolutionCollector.__init__(self, variables, dtype=np.int8)
+        self.callback_time = 0.0
+
+    def on_solution_callback(self):
+        start_time = time.perf_counter()
+        SolutionCollector.on_solution_callback(self)
+        self.callback_time += time.perf_counter() - start_time
+
+
+def run_mode(board_size, break_symmetry):
+    model, queens = n_queens_model(board_size, break_symmetry)
+    solver = cp_model.CpSolver()
+    solver.parameters.enumerate_all_solutions = True
+    collector = TimedCollector(queens)
+    start_time = time.perf_counter()
+    solver.Solve(model, collector)
+    solve_time = time.perf_counter() - start_time
+    callback_cost = collector.callback_time / max(collector.solution_count(), 1)
+    return collector.solution_count(), solve_time, callback_cost, collector.solutions()
+
+
+print('{:>3} {:>10} {:>9} {:>8}  {:>10} {:>9} {:>8} {:>10}  {:>8}  {}'.format(
+    'N', 'all', 'solve s', 'cb us', 'fundament.', 'solve s', 'cb us', 'expand ms', 'speedup',
+    'same set'))
+for board_size in range(8, largest_board_size + 1):
+    count, solve_time, callback_cost, fundamental = run_mode(board_size, True)
+    start_time = time.perf_counter()
+    expanded = expand_solutions(fundamental)
+    expand_time = time.perf_counter() - start_time
+    columns = ['{:>10}'.format('-'), '{:>9}'.format('-'), '{:>8}'.format('-')]
+    speedup, same = '{:>8}'.format('-'), '-'
+    if board_size <= largest_full_size:
+        full_count, full_time, full_callback_cost, solutions = run_mode(board_size, False)
+        columns = ['{:10}'.format(full_count), '{:9.2f}'.format(full_time),
+                   '{:8.1f}'.format(1e6 * full_callback_cost)]
+        speedup = '{:7.1f}x'.format(full_time / (solve_time + expand_time))
+        same = np.array_equal(np.unique(solutions, axis=0), expanded)
+    print('{:3} {}  {:10} {:9.2f} {:8.1f} {:10.1f}  {}  {}'.format(
+        board_size, ' '.join(columns), count, solve_time, 1e6 * callback_cost,
+        1e3 * expand_time, speedup, same))
@@ -0,0 +1,116 @@
+# Benchmark: printing every solution vs SolutionCollector vs counting only
+
+# Enumerates all the solutions of N-Queens and of a model without constraints (five
+# variables in 0..9, 100000 solutions, where the search is almost free and the callback is
+# the whole cost) with five callbacks: none; the NQueenSolutionPrinter of
+# "N-Queens Problem.py" (the output goes to os.devnull, a terminal is slower still);
+# SolutionCollector keeping the solutions in memory; SolutionCollector writing an .npy file;
+# and SolutionCollector with count_only. Reports the wall time of each and the callback
+# cost per solution, the difference with the run without a callback.
+# Usage: python "Solution Collector Benchmark.py" [largest N] [seed]
+
+import contextlib
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from solution_collector import SolutionCollector
+from solution_collector import load_solutions
+
+largest_board_size = int(sys.argv[1]) if len(sys.argv) > 1 else 11
+seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+
+class NQueenSolutionPrinter(cp_model.CpSolverSolutionCallback):
+    """The solution printer of "N-Queens Problem.py"."""
+
+    def __init__(self, queens):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self.__queens = queens
+        self.__solution_count = 0
+        self.__start_time = time.time()
+
+    def solution_count(self):
+        return self.__solution_count
+
+    def on_solution_callback(self):
+        current_time = time.time()
+        print('Solution %i, time = %f s' %
+              (self.__solution_count, current_time - self.__start_time))
+        self.__solution_count += 1
+
+        all_queens = range(len(self.__queens))
+        for i in all_queens:
+            for j in all_queens:
+                if self.Value(self.__queens[j]) == i:
+                    print('Q', end=' ')
+                else:
+                    print('_', end=' ')
+            print()
+        print()
+
+
+def n_queens_model(board_size):
+    model = cp_model.CpModel()
+    queens = [model.NewIntVar(0, board_size - 1, 'x%i' % i) for i in range(board_size)]
+    model.AddAllDifferent(queens)
+    model.AddAllDifferent(queens[i] + i for i in range(board_size))
+    model.AddAllDifferent(queens[i] - i for i in range(board_size))
+    return model, queens
+
+
+def free_model():
+    model = cp_model.CpModel()
+    return model, [model.NewIntVar(0, 9, 'x%i' % i) for i in range(5)]
+
+
+def solve(model, callback=None):
+    solver = cp_model.CpSolver()
+    solver.parameters.enumerate_all_solutions = True
+    solver.parameters.random_seed = seed
+    start_time = time.perf_counter()
+    if callback is None:
+        solver.Solve(model)
+    else:
+        solver.Solve(model, callback)
+    return time.perf_counter() - start_time
+
+
+def run_cases(name, model, variables, directory):
+    filename = os.path.join(directory, 'solutions.npy')
+    times = {'none': solve(model)}
+    printer = NQueenSolutionPrinter(variables)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        times['print'] = solve(model, printer)
+    collector = SolutionCollector(variables, dtype=np.int8)
+    times['memory'] = solve(model, collector)
+    collected = collector.solutions()
+    with SolutionCollector(variables, sink=filename, dtype=np.int8) as file_collector:
+        times['file'] = solve(model, file_collector)
+    counter = SolutionCollector(variables, count_only=True)
+    times['count'] = solve(model, counter)
+
+    count = counter.solution_count()
+    consistent = (printer.solution_count() == len(collected) == count and
+                  np.array_equal(np.unique(collected, axis=0),
+                                 np.unique(load_solutions(filename), axis=0)))
+    print('{:14} {:>9}  {}  {}{}'.format(
+        name, count, '  '.join('{:7.2f}'.format(times[mode]) for mode in MODES),
+        '  '.join('{:7.1f}'.format(1e6 * (times[mode] - times['none']) / max(count, 1))
+                  for mode in MODES[1:]), '' if consistent else '  (MISMATCH)'))
+
+
+MODES = ('none', 'print', 'memory', 'file', 'count')
+
+print('{:14} {:>9}  {:^43}  {:^35}'.format('model', 'solutions', 'seconds',
+                                            'callback us per solution'))
+print('{:14} {:>9}  {}  {}'.format('', '', '  '.join('{:>7}'.format(mode) for mode in MODES),
+                                   '  '.join('{:>7}'.format(mode) for mode in MODES[1:])))
+with tempfile.TemporaryDirectory() as directory:
+    for board_size in range(8, largest_board_size + 1):
+        run_cases('N-Queens %i' % board_size, *n_queens_model(board_size), directory)
+    run_cases('5 x 0..9 free', *free_model(), directory)
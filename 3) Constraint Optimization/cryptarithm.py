@@ -0,0 +1,86 @@
+# Builder for cryptarithmetic puzzles: word equations in any base
+
+# "Cryptarithmetic Puzzle.py" writes CP + IS + FUN = TRUE as one hand-expanded expression.
+# word_equation_model builds the model of any sum of words: every letter is a digit of the
+# base, letters are all different, the first letter of a word of several letters is not
+# zero, and the sum holds. The sum is one linear equation whose coefficient for a letter
+# is the sum of the place values (base ** position) of its occurrences, positive in the
+# addends and negative in the result. The coefficients are accumulated with NumPy and
+# passed to LinearExpr.WeightedSum in one call: chaining + and * on the variables builds a
+# nested expression that cp_model flattens again, which costs more than the model itself
+# for long puzzles.
+
+import re
+import string
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+# Symbols of random_puzzle, in order of use
+SYMBOLS = string.ascii_uppercase + string.ascii_lowercase
+
+
+def parse_puzzle(puzzle):
+    """Returns the addends and the result of a puzzle such as 'CP + IS + FUN = TRUE'."""
+    match = re.fullmatch(r'\s*(\w+(?:\s*\+\s*\w+)*)\s*=\s*(\w+)\s*', puzzle)
+    if match is None:
+        raise ValueError('not a sum of words: {!r}'.format(puzzle))
+    return re.findall(r'\w+', match.group(1)), match.group(2)
+
+
+def letter_weights(addends, result, base=10):
+    """Returns the letters (in order of appearance) and their coefficients in the sum."""
+    words = list(addends) + [result]
+    letters = list(dict.fromkeys(''.join(words)))
+    positions = {letter: position for position, letter in enumerate(letters)}
+    weights = np.zeros(len(letters), dtype=np.int64)
+    for number, word in enumerate(words):
+        places = base ** np.arange(len(word) - 1, -1, -1, dtype=np.int64)
+        np.add.at(weights, [positions[letter] for letter in word],
+                  -places if number == len(addends) else places)
+    return letters, weights
+
+
+def word_equation_model(addends, result, base=10):
+    """Returns the model of addends[0] + addends[1] + ... = result and its letters.
+
+    letters maps every letter, in order of appearance, to its digit variable.
+    """
+    letters, weights = letter_weights(addends, result, base)
+    if len(letters) > base:
+        raise ValueError('{} letters do not fit the {} digits of base {}'.format(
+            len(letters), base, base))
+    leading = {word[0] for word in list(addends) + [result] if len(word) > 1}
+    model = cp_model.CpModel()
+    variables = {letter: model.NewIntVar(1 if letter in leading else 0, base - 1, letter)
+                 for letter in letters}
+    model.AddAllDifferent(variables.values())
+    model.Add(cp_model.LinearExpr.WeightedSum(list(variables.values()),
+                                              weights.tolist()) == 0)
+    return model, variables
+
+
+def random_puzzle(num_words, base=10, seed=0, max_length=8):
+    """Returns a solvable puzzle of num_words addends as (addends, result, digits).
+
+    digits maps the letters to the digits of a planted solution; the puzzle uses
+    min(base, 52) letters and may have other solutions.
+    """
+    if base > len(SYMBOLS):
+        raise ValueError('base {} needs more than {} letters'.format(base, len(SYMBOLS)))
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(1, max_length + 1, size=num_words)
+    numbers = [[int(rng.integers(1 if length > 1 else 0, base))] +
+               rng.integers(0, base, size=length - 1).tolist() for length in lengths]
+    total = sum(sum(digit * base ** place for place, digit in enumerate(reversed(number)))
+                for number in numbers)
+    total_digits = []
+    while total or not total_digits:
+        total, digit = divmod(total, base)
+        total_digits.insert(0, digit)
+    symbols = rng.permutation(list(SYMBOLS[:base]))
+    addends = [''.join(symbols[digit] for digit in number) for number in numbers]
+    result = ''.join(symbols[digit] for digit in total_digits)
+    used = set(''.join(addends) + result)
+    return addends, result, {str(symbol): digit for digit, symbol in enumerate(symbols)
+                             if symbol in used}
@@ -0,0 +1,100 @@
+# N-Queens model with optional symmetry breaking, and expansion of fundamental solutions
+
+# The eight symmetries of the board (rotations and reflections) map every solution to
+# another one, so "N-Queens Problem.py" finds each solution up to eight times over. With
+# break_symmetry the model keeps one solution per symmetry class, the fundamental solution
+# that is lexicographically smallest among its images: for every symmetry g, the
+# constraint queens <=lex g(queens). Rotations and diagonal reflections swap rows and
+# columns, so they are written with the inverse permutation (the column of the queen of
+# each row), linked to the queens by AddInverse. expand_solutions computes the images of
+# the fundamental solutions with NumPy and returns the full set without searching again.
+# n_queens_model writes the diagonal constraints straight into the model proto, which
+# builds N = 1000 about 2.6 times faster than the script's queens[i] + i generators
+# ("Model Build Benchmark.py").
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+
+def add_lex_less_or_equal(model, left, right):
+    """Adds left <=lex right for two equally long lists of linear expressions."""
+    # prefix_equal[i]: left[:i] == right[:i]
+    prefix_equal = [model.NewConstant(1)] + [
+        model.NewBoolVar('') for _ in range(len(left) - 1)]
+    for i in range(len(left)):
+        model.Add(left[i] <= right[i]).OnlyEnforceIf(prefix_equal[i])
+        if i + 1 < len(left):
+            model.AddImplication(prefix_equal[i + 1], prefix_equal[i])
+            model.Add(left[i] == right[i]).OnlyEnforceIf(prefix_equal[i + 1])
+            model.Add(left[i] < right[i]).OnlyEnforceIf(
+                [prefix_equal[i], prefix_equal[i + 1].Not()])
+
+
+def board_symmetries(queens, inverse, board_size):
+    """Returns the images of queens under the seven symmetries other than the identity.
+
+    queens[c] is the row of the queen of column c and inverse[r] the column of the queen of
+    row r; both may be variables (giving expressions) or NumPy arrays, one row per solution.
+    """
+    last = board_size - 1
+
+    def reverse(values):
+        return values[..., ::-1] if isinstance(values, np.ndarray) else values[::-1]
+
+    def flip(values):
+        return last - values if isinstance(values, np.ndarray) else [last - v for v in values]
+
+    return [reverse(queens),  # Mirror left-right
+            flip(queens),  # Mirror top-bottom
+            flip(reverse(queens)),  # Rotation by 180 degrees
+            inverse,  # Reflection in the main diagonal
+            flip(reverse(inverse)),  # Reflection in the anti-diagonal
+            flip(inverse),  # Rotation by 90 degrees
+            reverse(inverse)]  # Rotation by 270 degrees
+
+
+def add_symmetry_breaking(model, queens):
+    """Restricts the solutions of an N-Queens model to the fundamental ones."""
+    board_size = len(queens)
+    inverse = [model.NewIntVar(0, board_size - 1, 'row%i' % i) for i in range(board_size)]
+    model.AddInverse(queens, inverse)
+    for image in board_symmetries(queens, inverse, board_size):
+        add_lex_less_or_equal(model, queens, image)
+
+
+def add_all_different_offsets(model, variables, offsets):
+    """Adds AllDifferent(variables[i] + offsets[i]) to model.
+
+    The expressions are written into the constraint directly: building queens[i] + i
+    creates an expression object per queen that AddAllDifferent converts again.
+    """
+    all_different = model.Proto().constraints.add().all_diff
+    for variable, offset in zip(variables, offsets):
+        expression = all_different.exprs.add()
+        expression.vars.append(variable.Index())
+        expression.coeffs.append(1)
+        expression.offset = offset
+
+
+def n_queens_model(board_size, break_symmetry=False):
+    """Returns the model of "N-Queens Problem.py" and its queens."""
+    model = cp_model.CpModel()
+    # The array index is the column, and the value is the row.
+    queens = [model.NewIntVar(0, board_size - 1, 'x%i' % i) for i in range(board_size)]
+    model.AddAllDifferent(queens)
+    # No two queens on the same diagonal
+    add_all_different_offsets(model, queens, range(board_size))
+    add_all_different_offsets(model, queens, range(0, -board_size, -1))
+    if break_symmetry:
+        add_symmetry_breaking(model, queens)
+    return model, queens
+
+
+def expand_solutions(solutions):
+    """Returns every distinct image of the solutions, in lexicographic order."""
+    solutions = np.asarray(solutions)
+    if not len(solutions):
+        return solutions.reshape(0, solutions.shape[-1] if solutions.ndim == 2 else 0)
+    inverse = np.argsort(solutions, axis=1)
+    images = [solutions] + board_symmetries(solutions, inverse, solutions.shape[1])
+    return np.unique(np.concatenate(images).astype(solutions.dtype), axis=0)
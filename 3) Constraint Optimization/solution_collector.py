@@ -0,0 +1,134 @@
+# Solution collector for CP-SAT enumeration with bounded memory
+
+# The printers of the examples (VarArraySolutionPrinter, NQueenSolutionPrinter) call print
+# for every variable of every solution, and for N-Queens at N >= 14 (hundreds of thousands
+# of solutions) the output costs more than the search. SolutionCollector stores each
+# solution as one row of a preallocated NumPy block instead. Values are read by variable
+# index with SolutionIntegerValue, which is the cheapest accessor of the solution
+# callback (Value walks the expression, response_proto copies the whole response).
+# Full blocks go to the sink: kept in memory, appended to an .npy file that load_solutions
+# opens as a memory map, or passed to any callable. Memory stays at one block whatever the
+# number of solutions. With count_only the callback only increments the counter.
+# Use it as a context manager, or call close(), so the last partial block is flushed:
+#     with SolutionCollector(queens, sink='queens.npy', dtype=np.int8) as collector:
+#         solver.Solve(model, collector)
+#     solutions = load_solutions('queens.npy')
+
+import os
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+# Size of the .npy header written by SolutionCollector, so that it can be rewritten in
+# place with the final number of solutions
+NPY_HEADER_SIZE = 128
+
+
+def _npy_header(dtype, shape):
+    """Returns an .npy (version 1.0) header of exactly NPY_HEADER_SIZE bytes."""
+    description = "{{'descr': {!r}, 'fortran_order': False, 'shape': {!r}, }}".format(
+        np.lib.format.dtype_to_descr(np.dtype(dtype)), tuple(shape))
+    length = NPY_HEADER_SIZE - 10
+    if len(description) >= length:
+        raise ValueError('shape {} does not fit in the .npy header'.format(shape))
+    return (b'\x93NUMPY\x01\x00' + length.to_bytes(2, 'little') +
+            description.ljust(length - 1).encode('latin1') + b'\n')
+
+
+def load_solutions(filename):
+    """Returns the solutions written by a SolutionCollector, as a read-only memory map."""
+    return np.load(filename, mmap_mode='r')
+
+
+class SolutionCollector(cp_model.CpSolverSolutionCallback):
+    """Collects the values of variables in every solution into NumPy blocks.
+
+    sink is None (keep the solutions in memory, see solutions()), a file name (an .npy
+    file) or a callable that receives every full block and the last partial one; blocks
+    are reused, so a callable must copy what it keeps. Variables may be integer variables
+    or Boolean literals.
+    """
+
+    def __init__(self, variables, sink=None, block_size=65536, dtype=np.int64,
+                 count_only=False):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self.__solution_count = 0
+        self.__variables = list(variables)
+        self.__count_only = count_only
+        self.__file = None
+        if count_only:
+            self.on_solution_callback = self.__count_solution
+            return
+
+        indices = np.array([variable.Index() for variable in self.__variables],
+                           dtype=np.int64)
+        # A negated literal ~x has index -x - 1 and value 1 - x
+        self.__negated = indices < 0
+        self.__indices = np.where(self.__negated, -indices - 1, indices).tolist()
+        self.__block = np.empty((block_size, len(self.__indices)), dtype=dtype)
+        self.__row = 0
+        self.__blocks = []
+        if sink is None:
+            self.__sink = self.__keep_block
+        elif callable(sink):
+            self.__sink = sink
+        else:
+            self.__file = open(os.fspath(sink), 'wb')
+            self.__file.write(_npy_header(dtype, (0, len(self.__indices))))
+            self.__sink = self.__write_block
+
+    def __count_solution(self):
+        self.__solution_count += 1
+
+    def on_solution_callback(self):
+        self.__solution_count += 1
+        self.__block[self.__row] = list(map(self.SolutionIntegerValue, self.__indices))
+        self.__row += 1
+        if self.__row == len(self.__block):
+            self.flush()
+
+    def __keep_block(self, block):
+        self.__blocks.append(block.copy())
+
+    def __write_block(self, block):
+        self.__file.write(block.tobytes())
+
+    def flush(self):
+        """Passes the solutions collected since the last flush to the sink."""
+        if self.__count_only or not self.__row:
+            return
+        block = self.__block[:self.__row]
+        if self.__negated.any():
+            block[:, self.__negated] = 1 - block[:, self.__negated]
+        self.__sink(block)
+        self.__row = 0
+
+    def close(self):
+        """Flushes the last solutions and completes the file, if any."""
+        self.flush()
+        if self.__file is not None:
+            self.__file.seek(0)
+            self.__file.write(_npy_header(self.__block.dtype,
+                                          (self.__solution_count, len(self.__indices))))
+            self.__file.close()
+            self.__file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def solution_count(self):
+        return self.__solution_count
+
+    def solutions(self):
+        """Returns the solutions kept in memory, one row per solution."""
+        if self.__count_only:
+            raise ValueError('count_only collectors keep no solutions')
+        self.flush()
+        if not self.__blocks:
+            return np.empty((0, len(self.__variables)), dtype=self.__block.dtype)
+        if len(self.__blocks) > 1:
+            self.__blocks = [np.concatenate(self.__blocks)]
+        return self.__blocks[0]
@@ -0,0 +1,111 @@
+# Benchmark: compact allowed-group encodings vs the tuple tables of AddAllowedAssignments
+
+# Builds the model of "Assignment with Allowed Groups CPSAT.py" two ways:
+# - tuples: as the script did, every allowed pattern listed for AddAllowedAssignments and
+#   the work link of every worker added once per task
+# - compact: the work links once, and allowed_groups.GroupConstraintBuilder encoding the
+#   tables as cardinality and exclusion rules, decision diagrams or (if smaller) tables
+# First on 3 groups whose tables list every pattern of half the workers with a few
+# excluded pairs (C(20, 10) = 184756 patterns before the exclusions at 20 workers), then
+# on the random tables of instances.allowed_groups. Reports the number of tuples, the
+# constraints and bytes of the model proto, the seconds to build and solve (with a time
+# limit) and whether the optimal costs agree. '-' marks a solve that was not optimal.
+# Usage: python "Allowed Groups Encoding Benchmark.py" [largest group size] [time limit]
+#        [seed]
+
+import os
+import sys
+import time
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from allowed_groups import GroupConstraintBuilder
+
+# The shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cp_sat_config import create_solver  # noqa: E402
+from instances import allowed_groups  # noqa: E402
+
+largest_group_size = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+time_limit = float(sys.argv[2]) if len(sys.argv) > 2 else 60.0
+seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+
+NUM_GROUPS = 3
+
+
+def rule_table(group_size, rng):
+    """Every pattern of group_size // 2 workers without group_size // 4 random pairs."""
+    patterns = (np.arange(2**group_size)[:, np.newaxis] >> np.arange(group_size)) & 1
+    allowed = patterns.sum(axis=1) == group_size // 2
+    for _ in range(group_size // 4):
+        pair = rng.choice(group_size, size=2, replace=False)
+        allowed &= patterns[:, pair].sum(axis=1) <= 1
+    return patterns[allowed].astype(np.int8)
+
+
+def build(costs, groups, compact):
+    model = cp_model.CpModel()
+    num_workers, num_tasks = costs.shape
+    group_size = groups[0].shape[1]
+    x = [[model.NewBoolVar('') for _ in range(num_tasks)] for _ in range(num_workers)]
+    for worker in range(num_workers):
+        model.AddAtMostOne(x[worker])
+    for task in range(num_tasks):
+        model.AddExactlyOne(x[worker][task] for worker in range(num_workers))
+    work = [model.NewBoolVar('') for _ in range(num_workers)]
+    for worker in range(num_workers):
+        for _ in range(1 if compact else num_tasks):
+            model.Add(work[worker] == sum(x[worker]))
+    builder = GroupConstraintBuilder(model)
+    for g, tuples in enumerate(groups):
+        literals = work[g * group_size:(g + 1) * group_size]
+        if compact:
+            builder.add_allowed_patterns(literals, tuples)
+        else:
+            model.AddAllowedAssignments(literals, tuples.tolist())
+    model.Minimize(cp_model.LinearExpr.WeightedSum(
+        [variable for row in x for variable in row], costs.ravel().tolist()))
+    return model
+
+
+def compare(label, costs, groups):
+    columns, objectives = [], []
+    for compact in (False, True):
+        start_time = time.perf_counter()
+        model = build(costs, groups, compact)
+        build_time = time.perf_counter() - start_time
+        proto = model.Proto()
+        solver = create_solver(time_limit=time_limit, seed=seed)
+        status = solver.Solve(model)
+        solve = '{:.2f}'.format(solver.WallTime()) if status == cp_model.OPTIMAL else '-'
+        if status == cp_model.OPTIMAL:
+            objectives.append(solver.ObjectiveValue())
+        columns.append('{:>7} {:>10} {:>8.2f} {:>8}'.format(
+            len(proto.constraints), proto.ByteSize(), build_time, solve))
+    print('{:>14} {:>8}  {}  {}  {}'.format(
+        label, sum(len(tuples) for tuples in groups), *columns,
+        objectives[0] == objectives[1] if len(objectives) == 2 else '-'))
+
+
+header = '{:>7} {:>10} {:>8} {:>8}'.format('constr', 'bytes', 'build s', 'solve s')
+print('{:>14} {:>8}  {}  {}  {}'.format('', '', 'tuples'.center(len(header)),
+                                         'compact'.center(len(header)), ''))
+print('{:>14} {:>8}  {}  {}  {}'.format('groups x size', 'tuples', header, header,
+                                         'same cost'))
+rng = np.random.default_rng(seed)
+for group_size in (4, 8, 12, 16, 20):
+    if group_size > largest_group_size:
+        break
+    num_workers = NUM_GROUPS * group_size
+    costs = allowed_groups(num_workers, seed=seed, group_size=group_size)['costs']
+    groups = [rule_table(group_size, rng) for _ in range(NUM_GROUPS)]
+    compare('{} x {}'.format(NUM_GROUPS, group_size), np.asarray(costs), groups)
+
+print()
+print('Random tables (instances.allowed_groups, 50 patterns per group)')
+for num_workers, group_size in ((24, 4), (48, 8), (36, 12)):
+    instance = allowed_groups(num_workers, seed=seed, group_size=group_size,
+                              tuples_per_group=50)
+    compare('{} x {}'.format(num_workers // group_size, group_size),
+            np.asarray(instance['costs']), list(instance['groups']))
@@ -0,0 +1,109 @@
+# Benchmark: assignment by linear sum assignment vs CP-SAT and SCIP models
+
+# Solves square instances.assignment cost matrices from 100 x 100 to 5000 x 5000 with:
+# - lsa: linear_sum.solve_cost_matrix (SimpleLinearSumAssignment)
+# - dispatch: the model of "Assignment Problem CPSAT.py" handed to
+#   assignment_dispatch.solve_model, which recognizes it and solves it with the linear sum
+#   solver (the time covers the recognition and the solve, not the model build)
+# - CP-SAT and SCIP: the models of "Assignment Problem CPSAT.py" and
+#   "Assignment Problem MIP.py" solved as the scripts do, up to a smaller size and with a
+#   time limit, as they take minutes on matrices the linear sum solver does in milliseconds
+# Reports the seconds of each and checks that the optimal costs agree. '-' marks sizes
+# above the limits.
+# Usage: python "Assignment Dispatch Benchmark.py" [largest size] [largest model size]
+#        [largest solver size] [time limit] [seed]
+
+import os
+import sys
+import time
+
+import numpy as np
+from ortools.linear_solver import pywraplp
+from ortools.sat.python import cp_model
+
+from assignment_dispatch import solve_model
+from linear_sum import solve_cost_matrix
+
+# The shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cp_sat_config import create_solver  # noqa: E402
+from instances import assignment  # noqa: E402
+
+largest_size = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+largest_model_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+largest_solver_size = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+time_limit = float(sys.argv[4]) if len(sys.argv) > 4 else 60.0
+seed = int(sys.argv[5]) if len(sys.argv) > 5 else 0
+
+
+def cp_sat_model(costs):
+    model = cp_model.CpModel()
+    num_workers, num_tasks = costs.shape
+    x = np.array([[model.NewBoolVar('') for _ in range(num_tasks)]
+                  for _ in range(num_workers)])
+    for i in range(num_workers):
+        model.AddAtMostOne(x[i].tolist())
+    for j in range(num_tasks):
+        model.AddExactlyOne(x[:, j].tolist())
+    model.Minimize(cp_model.LinearExpr.WeightedSum(x.ravel().tolist(),
+                                                   costs.ravel().tolist()))
+    return model
+
+
+def mip_model(costs):
+    solver = pywraplp.Solver.CreateSolver('SCIP')
+    solver.SetTimeLimit(int(time_limit * 1000))
+    num_workers, num_tasks = costs.shape
+    x = [[solver.IntVar(0, 1, '') for _ in range(num_tasks)] for _ in range(num_workers)]
+    for i in range(num_workers):
+        solver.Add(solver.Sum(x[i]) <= 1)
+    for j in range(num_tasks):
+        solver.Add(solver.Sum([x[i][j] for i in range(num_workers)]) == 1)
+    objective = solver.Objective()
+    for i in range(num_workers):
+        for j in range(num_tasks):
+            objective.SetCoefficient(x[i][j], float(costs[i, j]))
+    objective.SetMinimization()
+    return solver
+
+
+def timed(function):
+    start_time = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start_time
+
+
+def solve_cp_sat(costs):
+    solver = create_solver(time_limit=time_limit, seed=seed)
+    status = solver.Solve(cp_sat_model(costs))
+    return solver.StatusName(status), solver.ObjectiveValue()
+
+
+def solve_mip(costs):
+    solver = mip_model(costs)
+    status = solver.Solve()
+    return ('OPTIMAL' if status == pywraplp.Solver.OPTIMAL else str(status),
+            solver.Objective().Value())
+
+
+print('{:>11} {:>9} {:>9} {:>18} {:>18}  {}'.format(
+    'size', 'lsa s', 'dispatch', 'CP-SAT s', 'SCIP s', 'same cost'))
+sizes = [size for size in (100, 200, 500, 1000, 2000, 5000) if size <= largest_size]
+for size in sizes:
+    costs = assignment(size, seed=seed)['costs']
+    lsa, lsa_time = timed(lambda: solve_cost_matrix(costs))
+    objectives = [lsa.objective]
+    columns = ['{:>9}'.format('-'), '{:>18}'.format('-'), '{:>18}'.format('-')]
+    if size <= largest_model_size:
+        model = cp_sat_model(costs)
+        dispatched, dispatch_time = timed(lambda: solve_model(model))
+        objectives.append(dispatched.objective)
+        columns[0] = '{:9.3f}'.format(dispatch_time)
+    if size <= largest_solver_size:
+        for column, solve in ((1, solve_cp_sat), (2, solve_mip)):
+            (status, objective), seconds = timed(lambda: solve(costs))
+            columns[column] = '{:>18}'.format('{:.2f} {}'.format(seconds, status))
+            if status == 'OPTIMAL':
+                objectives.append(objective)
+    print('{:>11} {:9.3f} {}  {}'.format('{0}x{0}'.format(size), lsa_time, ' '.join(columns),
+                                         np.allclose(objectives, objectives[0])))
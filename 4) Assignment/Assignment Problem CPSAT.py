@@ -3,8 +3,15 @@
 # Problem: Assign works at most one task, with no two workers performing the same task,
 # while minimizing the total cost using the CP-SAT solver
 
+import os
+import sys
+
 from ortools.sat.python import cp_model
 
+# The shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cp_sat_config import create_solver  # noqa: E402
+
 model = cp_model.CpModel()
 
 # Rows represent how much it costs for a worker to do each task
@@ -43,7 +50,7 @@ for i in range(num_workers):
 
 model.Minimize(sum(objective_terms))
 
-solver = cp_model.CpSolver()
+solver = create_solver()
 status = solver.Solve(model)
 
 if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
@@ -1,34 +1,28 @@
 # https://developers.google.com/optimization/assignment/linear_assignment
 
-from ortools.graph import pywrapgraph
+import numpy as np
+
+from linear_sum import solve_cost_matrix
 
 # Define data
-costs = [
+costs = np.array([
     [90, 76, 75, 70],
     [35, 85, 55, 65],
     [125, 95, 90, 105],
     [45, 110, 95, 115],
-]
-num_workers = len(costs)
-num_tasks = len(costs[0])
-
-assignment = pywrapgraph.LinearSumAssignment()
+])
 
-# Define constraints
-for worker in range(num_workers):
-    for task in range(num_tasks):
-        if costs[worker][task]:
-            assignment.AddArcWithCost(worker, task, costs[worker][task])
-            
-status = assignment.Solve()
+# Every (worker, task) pair is an arc; pass a numpy.ma array or forbidden= to leave some out
+solution = solve_cost_matrix(costs)
 
-if status == assignment.OPTIMAL:
-    print(f'Total cost = {assignment.OptimalCost()}\n')
-    for i in range(0, assignment.NumNodes()):
-        print(f'Worker {i} assigned to task {assignment.RightMate(i)}.' +
-              f'  Cost = {assignment.AssignmentCost(i)}')
-elif status == assignment.INFEASIBLE:
+if solution.status == 'OPTIMAL':
+    print(f'Total cost = {solution.objective}\n')
+    for worker, task in enumerate(solution.values):
+        if task >= 0:
+            print(f'Worker {worker} assigned to task {task}.' +
+                  f'  Cost = {costs[worker, task]}')
+elif solution.status == 'INFEASIBLE':
     print('No assignment is possible.')
-elif status == assignment.POSSIBLE_OVERFLOW:
+elif solution.status == 'POSSIBLE_OVERFLOW':
     print(
-        'Some input costs are too large and may cause an integer overflow.')
\ No newline at end of file
+        'Some input costs are too large and may cause an integer overflow.')
@@ -2,8 +2,17 @@
 
 # Problem: Find the minimum cost to assign workers to tasks where all workers have to belong to one of 3 assignment groups
 
+import os
+import sys
+
 from ortools.sat.python import cp_model
 
+from allowed_groups import GroupConstraintBuilder
+
+# The shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cp_sat_config import create_solver  # noqa: E402
+
 model = cp_model.CpModel()
 
 # Define data
@@ -73,14 +82,15 @@ for worker in range(num_workers):
     work[worker] = model.NewBoolVar(f'work[{worker}]')
 
 for worker in range(num_workers):
-    for task in range(num_tasks):
-        model.Add(work[worker] == sum(
-            x[worker, task] for task in range(num_tasks)))
+    model.Add(work[worker] == sum(
+        x[worker, task] for task in range(num_tasks)))
     
-# Define the allowed groups of worders
-model.AddAllowedAssignments([work[0], work[1], work[2], work[3]], group1)
-model.AddAllowedAssignments([work[4], work[5], work[6], work[7]], group2)
-model.AddAllowedAssignments([work[8], work[9], work[10], work[11]], group3)
+# Define the allowed groups of workers. The builder encodes each table compactly: every
+# group here allows exactly two of its workers, except one pair.
+groups = GroupConstraintBuilder(model)
+groups.add_allowed_patterns([work[0], work[1], work[2], work[3]], group1)
+groups.add_allowed_patterns([work[4], work[5], work[6], work[7]], group2)
+groups.add_allowed_patterns([work[8], work[9], work[10], work[11]], group3)
     
 # Define objective
 objective_terms = []
@@ -89,7 +99,7 @@ for worker in range(num_workers):
         objective_terms.append(costs[worker][task] * x[worker, task])
 model.Minimize(sum(objective_terms))
 
-solver = cp_model.CpSolver()
+solver = create_solver()
 status = solver.Solve(model)
 
 if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
@@ -3,8 +3,15 @@
 # Problem: Assign tasks to workers such that the overall cost is minimized. In this example, tasks have a "size" value associated with them
 # "Size" can represent any secondary constraint (Such as time, weight, volume, etc). The max task "size" a worker can be assigned is 15
 
+import os
+import sys
+
 from ortools.sat.python import cp_model
 
+# The shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cp_sat_config import create_solver  # noqa: E402
+
 model = cp_model.CpModel()
 
 # Define the data
@@ -51,7 +58,7 @@ for worker in range(num_workers):
         objective_terms.append(costs[worker][task] * x[worker, task])
 model.Minimize(sum(objective_terms))
 
-solver = cp_model.CpSolver()
+solver = create_solver()
 status = solver.Solve(model)
 
 if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
@@ -0,0 +1,73 @@
+# Benchmark: CP-SAT solve time from 1 to N workers on generated assignment instances
+
+# Builds the model of "Assignment Problem CPSAT.py" for square instances.assignment cost
+# matrices and solves it with cp_sat_config.create_solver for every number of workers from
+# 1 to the largest, in the default (nondeterministic) mode and in the deterministic mode.
+# Reports the wall time, the speedup over one worker and, for the deterministic mode,
+# whether the optimal assignment and the search statistics are the same for every number
+# of workers. Worker counts above the available CPUs are marked with '*': the workers then
+# share CPUs, so they measure the benefit of the portfolio of subsolvers, not of the CPUs.
+# Usage: python "CP-SAT Scaling Benchmark.py" [size] [largest workers] [seed] [time limit]
+
+import os
+import sys
+import time
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+# The shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cp_sat_config import available_cpus  # noqa: E402
+from cp_sat_config import create_solver  # noqa: E402
+from instances import assignment  # noqa: E402
+
+size = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+largest_workers = int(sys.argv[2]) if len(sys.argv) > 2 else max(available_cpus(), 8)
+seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+time_limit = float(sys.argv[4]) if len(sys.argv) > 4 else 60.0
+
+
+def assignment_model(costs):
+    model = cp_model.CpModel()
+    num_workers, num_tasks = costs.shape
+    x = np.array([[model.NewBoolVar(f'x[{i},{j}]') for j in range(num_tasks)]
+                  for i in range(num_workers)])
+    for i in range(num_workers):
+        model.AddAtMostOne(x[i].tolist())
+    for j in range(num_tasks):
+        model.AddExactlyOne(x[:, j].tolist())
+    model.Minimize(cp_model.LinearExpr.WeightedSum(x.ravel().tolist(),
+                                                   costs.ravel().tolist()))
+    return model, x
+
+
+def solve(costs, num_workers, deterministic):
+    model, x = assignment_model(costs)
+    solver = create_solver(num_workers=num_workers, deterministic=deterministic,
+                           time_limit=time_limit, seed=seed)
+    start_time = time.perf_counter()
+    status = solver.Solve(model)
+    seconds = time.perf_counter() - start_time
+    assigned = np.array([[solver.BooleanValue(v) for v in row] for row in x])
+    return (solver.StatusName(status), solver.ObjectiveValue(), seconds,
+            (solver.NumBranches(), solver.NumConflicts(), assigned.tobytes()))
+
+
+costs = assignment(size, seed=seed)['costs']
+print('{0} x {0} assignment, seed {1}, {2} available CPUs\n'.format(size, seed,
+                                                                   available_cpus()))
+print('{:>8} {:>9} {:>10} {:>8}   {:>9} {:>10} {:>8}  {}'.format(
+    'workers', 'status', 'seconds', 'speedup', 'status', 'det. s', 'speedup', 'same run'))
+base_time = base_deterministic_time = reference = None
+for num_workers in range(1, largest_workers + 1):
+    status, objective, seconds, _ = solve(costs, num_workers, False)
+    deterministic_status, _, deterministic_seconds, run = solve(costs, num_workers, True)
+    base_time = base_time or seconds
+    base_deterministic_time = base_deterministic_time or deterministic_seconds
+    reference = reference or run
+    label = '{}{}'.format(num_workers, '*' if num_workers > available_cpus() else '')
+    print('{:>8} {:>9} {:10.2f} {:7.1f}x   {:>9} {:10.2f} {:7.1f}x  {}'.format(
+        label, status, seconds, base_time / seconds, deterministic_status,
+        deterministic_seconds, base_deterministic_time / deterministic_seconds,
+        run == reference))
@@ -0,0 +1,78 @@
+# Benchmark: solving float and very large assignment costs with automatic cost scaling
+
+# Costs in currency units are floats, which SimpleLinearSumAssignment does not take. This
+# solves square instances.assignment matrices turned into prices (cost / 100 + 0.005, so
+# the exact optimum is known from the integer matrix) two ways:
+# - loop: scaled by hand to integer cents, one round() per entry in a double loop
+# - scaled: given as floats to linear_sum.solve_cost_matrix, which picks the scale with
+#   scale_costs in a few NumPy operations
+# and reports the seconds to scale and to solve, the error of the scaled optimal cost and
+# its error bound. Then it multiplies the integer matrices by 10^15, which the solver
+# alone reports as POSSIBLE_OVERFLOW, and solves them with scaling.
+# Usage: python "Cost Scaling Benchmark.py" [largest size] [seed]
+
+import os
+import sys
+import time
+
+import numpy as np
+from ortools.graph.python import linear_sum_assignment
+
+from linear_sum import cost_matrix_problem
+from linear_sum import max_safe_cost
+from linear_sum import scale_costs
+from linear_sum import solve_cost_matrix
+
+# The shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instances import assignment  # noqa: E402
+
+largest_size = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+
+def loop_scale(prices):
+    return [[round(price * 100) for price in row] for row in prices]
+
+
+def unscaled_status(costs):
+    problem = cost_matrix_problem(costs)
+    assignment = linear_sum_assignment.SimpleLinearSumAssignment()
+    assignment.add_arcs_with_cost(problem.left.astype(np.int32),
+                                  problem.right.astype(np.int32), problem.cost)
+    return assignment.solve().name
+
+
+print('{:>11} {:>9} {:>9} {:>9} {:>11} {:>11}  {}'.format(
+    'size', 'loop s', 'scaled s', 'solve s', 'error', 'bound', 'within bound'))
+sizes = [size for size in (100, 500, 1000, 2000, 5000) if size <= largest_size]
+for size in sizes:
+    costs = assignment(size, seed=seed)['costs']
+    prices = costs / 100 + 0.005
+    exact = solve_cost_matrix(costs).objective / 100 + 0.005 * size
+    price_lists = prices.tolist()
+    start_time = time.perf_counter()
+    loop_scale(price_lists)
+    loop_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    scale_costs(prices.ravel(), size)
+    scale_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    solution = solve_cost_matrix(prices)
+    solve_time = time.perf_counter() - start_time
+    error = abs(solution.objective - exact)
+    print('{:>11} {:9.3f} {:9.3f} {:9.3f} {:11.2e} {:11.2e}  {}'.format(
+        '{0}x{0}'.format(size), loop_time, scale_time, solve_time, error,
+        solution.error_bound, error <= solution.error_bound))
+
+print()
+print('{:>11} {:>12} {:>20} {:>11} {:>11}  {}'.format(
+    'size', 'max cost', 'unscaled status', 'error', 'bound', 'within bound'))
+for size in sizes:
+    costs = assignment(size, seed=seed)['costs'].astype(np.int64) * 10**15
+    exact = solve_cost_matrix(costs // 10**15).objective * 10**15
+    solution = solve_cost_matrix(costs)
+    error = abs(solution.objective - exact)
+    print('{:>11} {:12.1e} {:>20} {:11.2e} {:11.2e}  {}'.format(
+        '{0}x{0}'.format(size), max_safe_cost(size), unscaled_status(costs), error,
+        solution.error_bound, error <= solution.error_bound))
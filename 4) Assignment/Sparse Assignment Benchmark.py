@@ -0,0 +1,110 @@
+# Benchmark: loading sparse and rectangular assignment problems into the linear sum solver
+
+# Solves instances.sparse_assignment problems where every worker can do 2% of the tasks,
+# square and with a quarter fewer tasks than workers, loaded three ways:
+# - loop: "Assignment Problem Linear Sum.py" before linear_sum, one add_arc_with_cost per
+#   allowed entry of the dense matrix in a double loop (square problems only)
+# - masked: the dense matrix as a numpy.ma array with the forbidden pairs masked, given to
+#   linear_sum.cost_matrix_problem
+# - arcs: the arc arrays of the instance given to linear_sum.arc_problem
+# Build is the time to produce the arcs (the loop adds them to the solver too), solve the
+# time from there to the optimal cost, padding included. MB is the size of the input (the
+# matrix and its mask, or the arc arrays) plus the peak NumPy allocations of the build.
+# Checks that the optimal costs agree. '-' marks sizes above the limits.
+# Usage: python "Sparse Assignment Benchmark.py" [largest size] [largest dense size]
+#        [largest loop size] [seed]
+
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from ortools.graph.python import linear_sum_assignment
+
+from linear_sum import arc_problem
+from linear_sum import cost_matrix_problem
+from linear_sum import solve_linear_sum_problem
+
+# The shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from instances import sparse_assignment  # noqa: E402
+
+largest_size = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+largest_dense_size = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+largest_loop_size = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+seed = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+
+
+def loop_build(costs, allowed):
+    assignment = linear_sum_assignment.SimpleLinearSumAssignment()
+    num_workers, num_tasks = len(costs), len(costs[0])
+    for worker in range(num_workers):
+        for task in range(num_tasks):
+            if allowed[worker][task]:
+                assignment.add_arc_with_cost(worker, task, costs[worker][task])
+    return assignment
+
+
+def loop_solve(assignment):
+    status = assignment.solve()
+    return assignment.optimal_cost() if status == assignment.OPTIMAL else None
+
+
+def loader_solve(problem):
+    return solve_linear_sum_problem(problem)[1]
+
+
+def measure(build, solve, input_bytes, traced):
+    """Returns the build seconds, solve seconds, MB and optimal cost of one loader."""
+    if traced:
+        tracemalloc.start()
+    start_time = time.perf_counter()
+    built = build()
+    build_time = time.perf_counter() - start_time
+    peak = 0
+    if traced:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    start_time = time.perf_counter()
+    cost = solve(built)
+    return build_time, time.perf_counter() - start_time, (input_bytes + peak) / 2**20, cost
+
+
+print('{:>15} {:>9}  {:>22} {:>22} {:>22}  {}'.format(
+    'workers x tasks', 'arcs', 'loop build/solve/MB', 'masked build/solve/MB',
+    'arcs build/solve/MB', 'same cost'))
+sizes = [size for size in (1000, 2000, 5000, 10000, 20000) if size <= largest_size]
+for size in sizes:
+    for num_tasks in (size, size * 3 // 4):
+        instance = sparse_assignment(size, num_tasks, seed=seed, degree=max(size // 50, 1))
+        workers, tasks = instance['arc_worker'], instance['arc_task']
+        arc_costs = instance['arc_cost']
+        columns = ['{:>22}'.format('-')] * 3
+        objectives = []
+        results = [None, None, None]
+        if size <= largest_dense_size:
+            dense = np.zeros((size, num_tasks), dtype=np.int32)
+            dense[workers, tasks] = arc_costs
+            mask = np.ones((size, num_tasks), dtype=bool)
+            mask[workers, tasks] = False
+            if num_tasks == size and size <= largest_loop_size:
+                # Lists of lists, as in the script
+                cost_lists, allowed_lists = dense.tolist(), (~mask).tolist()
+                results[0] = measure(lambda: loop_build(cost_lists, allowed_lists),
+                                     loop_solve, dense.nbytes + mask.nbytes, False)
+            matrix = np.ma.array(dense, mask=mask)
+            results[1] = measure(lambda: cost_matrix_problem(matrix), loader_solve,
+                                 dense.nbytes + mask.nbytes, True)
+            del dense, mask, matrix
+        results[2] = measure(lambda: arc_problem(workers, tasks, arc_costs, size, num_tasks),
+                             loader_solve, workers.nbytes + tasks.nbytes + arc_costs.nbytes,
+                             True)
+        for column, result in enumerate(results):
+            if result is not None:
+                build_time, solve_time, megabytes, cost = result
+                columns[column] = '{:>22}'.format('{:.3f}/{:.3f}/{:.0f}'.format(
+                    build_time, solve_time, megabytes))
+                objectives.append(cost)
+        print('{:>15} {:>9}  {}  {}'.format('{}x{}'.format(size, num_tasks), len(workers),
+                                            ' '.join(columns), len(set(objectives)) == 1))
@@ -0,0 +1,104 @@
+# Benchmark: Teams of Workers by column generation vs the compact CP-SAT and SCIP models
+
+# Solves instances.teams problems from 60 workers in 2 teams to 15000 workers (10000
+# tasks) in 50 teams with:
+# - column generation: team_assignment.solve_teams
+# - CP-SAT and SCIP: the models of "Teams of Workers CPSAT.py" and "Teams of Workers
+#   MIP.py", one Boolean per worker and task, up to a smaller size and with a time limit
+# Reports the seconds (model build included), the status and the number of worker-task
+# variables of each, and checks that the optimal costs agree. '-' marks sizes above the
+# limit.
+# Usage: python "Teams Column Generation Benchmark.py" [largest workers]
+#        [largest compact workers] [time limit] [seed]
+
+import os
+import sys
+import time
+
+import numpy as np
+from ortools.linear_solver import pywraplp
+from ortools.sat.python import cp_model
+
+from team_assignment import solve_teams
+
+# The shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cp_sat_config import create_solver  # noqa: E402
+from instances import teams  # noqa: E402
+
+largest_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 15000
+largest_compact_workers = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+time_limit = float(sys.argv[3]) if len(sys.argv) > 3 else 60.0
+seed = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+
+
+def solve_cp_sat(costs, team, team_max):
+    model = cp_model.CpModel()
+    num_workers, num_tasks = costs.shape
+    x = np.array([[model.NewBoolVar('') for _ in range(num_tasks)]
+                  for _ in range(num_workers)])
+    for worker in range(num_workers):
+        model.AddAtMostOne(x[worker].tolist())
+    for task in range(num_tasks):
+        model.AddExactlyOne(x[:, task].tolist())
+    for g in range(team.max() + 1):
+        model.Add(sum(x[team == g].ravel().tolist()) <= team_max)
+    model.Minimize(cp_model.LinearExpr.WeightedSum(x.ravel().tolist(),
+                                                   costs.ravel().tolist()))
+    solver = create_solver(time_limit=time_limit, seed=seed)
+    status = solver.Solve(model)
+    return solver.StatusName(status), solver.ObjectiveValue()
+
+
+def solve_mip(costs, team, team_max):
+    solver = pywraplp.Solver.CreateSolver('SCIP')
+    solver.SetTimeLimit(int(time_limit * 1000))
+    num_workers, num_tasks = costs.shape
+    x = [[solver.BoolVar('') for _ in range(num_tasks)] for _ in range(num_workers)]
+    for worker in range(num_workers):
+        solver.Add(solver.Sum(x[worker]) <= 1)
+    for task in range(num_tasks):
+        solver.Add(solver.Sum([x[worker][task] for worker in range(num_workers)]) == 1)
+    for g in range(team.max() + 1):
+        solver.Add(solver.Sum([x[worker][task] for worker in np.flatnonzero(team == g)
+                               for task in range(num_tasks)]) <= team_max)
+    objective = solver.Objective()
+    for worker in range(num_workers):
+        for task in range(num_tasks):
+            objective.SetCoefficient(x[worker][task], float(costs[worker, task]))
+    objective.SetMinimization()
+    status = solver.Solve()
+    return ({pywraplp.Solver.OPTIMAL: 'OPTIMAL',
+             pywraplp.Solver.FEASIBLE: 'FEASIBLE'}.get(status, str(status)),
+            solver.Objective().Value())
+
+
+def timed(function):
+    start_time = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start_time
+
+
+print('{:>19} {:>11} {:>22} {:>18} {:>18}  {}'.format(
+    'workers/tasks/teams', 'variables', 'column generation s', 'CP-SAT s', 'SCIP s',
+    'same cost'))
+sizes = [(num_workers, num_teams) for num_workers, num_teams in
+         ((60, 2), (300, 5), (1500, 10), (6000, 25), (15000, 50))
+         if num_workers <= largest_workers]
+for num_workers, num_teams in sizes:
+    instance = teams(num_workers, seed=seed, num_teams=num_teams)
+    costs, team, team_max = instance['costs'], instance['team'], instance['team_max']
+    solution, seconds = timed(lambda: solve_teams(costs, team, team_max,
+                                                  time_limit=time_limit))
+    objectives = [solution.objective] if solution.status == 'OPTIMAL' else []
+    columns = ['{:>22}'.format('{:.2f} {}'.format(seconds, solution.status)),
+               '{:>18}'.format('-'), '{:>18}'.format('-')]
+    if num_workers <= largest_compact_workers:
+        for column, solve in ((1, solve_cp_sat), (2, solve_mip)):
+            (status, objective), seconds = timed(lambda: solve(costs, team, team_max))
+            columns[column] = '{:>18}'.format('{:.2f} {}'.format(seconds, status))
+            if status == 'OPTIMAL':
+                objectives.append(objective)
+    print('{:>19} {:>11} {}  {}'.format(
+        '{}/{}/{}'.format(num_workers, costs.shape[1], num_teams), costs.size,
+        ' '.join(columns), bool(objectives) and np.allclose(objectives, objectives[0])))
@@ -2,8 +2,15 @@
 
 # Problem: 6 workers are divided into two teams and each team can perform at most two tasks
 
+import os
+import sys
+
 from ortools.sat.python import cp_model
 
+# The shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cp_sat_config import create_solver  # noqa: E402
+
 # Rows represent how much it costs for a worker to do each task
 costs = [
     [90, 76, 75, 70],
@@ -60,7 +67,7 @@ for worker in range(num_workers):
         
 model.Minimize(sum(objective_terms))
 
-solver = cp_model.CpSolver()
+solver = create_solver()
 status = solver.Solve(model)
 
 if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
@@ -0,0 +1,229 @@
+# Compact encodings of allowed worker groups for CP-SAT
+
+# "Assignment with Allowed Groups CPSAT.py" lists every allowed 0/1 pattern of the work
+# variables of a group for AddAllowedAssignments. A group of 20 workers of which any 10
+# may work has C(20, 10) = 184756 patterns, while the rule itself is one linear
+# constraint. GroupConstraintBuilder adds group rules in compact form:
+# - Cardinality(workers, lower, upper): between lower and upper of the workers work
+# - Exclusion(workers): at most one of the workers works (pairwise exclusions merge into
+#   cliques)
+# - Automaton(workers, start, finals, transitions): the patterns read by an automaton
+#   (e.g. a decision diagram) over the work values of the workers, in order
+# - Table(workers, tuples): explicit patterns, as in the script
+# workers are positions in the literal list of the group. group_rules turns a pattern
+# table into the smallest of three exact encodings: cardinality with exclusions and fixed
+# workers when they allow exactly the patterns of the table, the reduced decision diagram
+# of the table (its prefixes merged bottom-up into one state per distinct set of
+# suffixes), or the table itself. The builder adds every constraint once; and
+# remove_duplicate_constraints drops the repeated constraints of any model, such as the
+# work links the script adds num_tasks times.
+
+import collections
+import math
+
+import numpy as np
+from ortools.sat import cp_model_pb2
+
+Cardinality = collections.namedtuple('Cardinality', ['workers', 'lower', 'upper'])
+Exclusion = collections.namedtuple('Exclusion', ['workers'])
+Automaton = collections.namedtuple('Automaton',
+                                   ['workers', 'start', 'finals', 'transitions'])
+Table = collections.namedtuple('Table', ['workers', 'tuples'])
+
+# Tables of up to this many workers are checked against cardinality rules by enumerating
+# every pattern
+MAX_ENUMERATED_WORKERS = 20
+
+
+def _exclusion_cliques(excluded):
+    """Covers the edges of a symmetric Boolean adjacency matrix with cliques, greedily."""
+    uncovered = np.triu(excluded, 1)
+    cliques = []
+    while uncovered.any():
+        first, second = (int(i) for i in np.argwhere(uncovered)[0])
+        clique = [first, second]
+        candidates = excluded[first] & excluded[second]
+        candidates[clique] = False
+        while candidates.any():
+            # Prefer the vertex with the most uncovered edges to the clique
+            gains = (uncovered | uncovered.T)[np.ix_(np.flatnonzero(candidates), clique)]
+            vertex = int(np.flatnonzero(candidates)[np.argmax(gains.sum(axis=1))])
+            clique.append(vertex)
+            candidates &= excluded[vertex]
+            candidates[vertex] = False
+        for i in clique:
+            for j in clique:
+                if i < j:
+                    uncovered[i, j] = False
+        cliques.append(sorted(clique))
+    return cliques
+
+
+def _count_patterns(num_workers, rules):
+    """Returns the number of 0/1 patterns satisfying cardinality and exclusion rules, or
+    None if there are too many workers to count them."""
+    cardinality = [rule for rule in rules if isinstance(rule, Cardinality)]
+    cliques = [rule.workers for rule in rules if isinstance(rule, Exclusion)]
+    if not cliques:
+        # The fixed workers are single-worker cardinalities; the rest is binomial
+        fixed = {rule.workers[0]: rule.lower for rule in cardinality[1:]}
+        lower, upper = cardinality[0].lower, cardinality[0].upper
+        free, ones = num_workers - len(fixed), sum(fixed.values())
+        return sum(math.comb(free, count - ones) for count in range(lower, upper + 1)
+                   if 0 <= count - ones <= free)
+    if num_workers > MAX_ENUMERATED_WORKERS:
+        return None
+    patterns = (np.arange(2**num_workers, dtype=np.uint32)[:, np.newaxis] >>
+                np.arange(num_workers, dtype=np.uint32)) & 1
+    allowed = np.ones(len(patterns), dtype=bool)
+    for rule in cardinality:
+        counts = patterns[:, rule.workers].sum(axis=1)
+        allowed &= (counts >= rule.lower) & (counts <= rule.upper)
+    for clique in cliques:
+        allowed &= patterns[:, clique].sum(axis=1) <= 1
+    return int(np.count_nonzero(allowed))
+
+
+def table_automaton(tuples):
+    """Returns the Automaton of the reduced decision diagram of a 0/1 pattern table.
+
+    The states of layer i are the distinct sets of suffixes that follow a prefix of
+    length i; the only final state accepts the empty suffix.
+    """
+    tuples = np.asarray(tuples, dtype=np.int64)
+    num_tuples, num_workers = tuples.shape
+    # Trie node of the prefix of every tuple at every layer
+    nodes = np.zeros((num_tuples, num_workers + 1), dtype=np.int64)
+    for layer in range(num_workers):
+        _, nodes[:, layer + 1] = np.unique(2 * nodes[:, layer] + tuples[:, layer],
+                                           return_inverse=True)
+    # Bottom-up, a node is its (state after 0, state after 1); equal ones merge
+    node_states = np.zeros(nodes[:, num_workers].max(initial=0) + 1, dtype=np.int64)
+    layer_transitions = []
+    for layer in range(num_workers - 1, -1, -1):
+        children = np.full((nodes[:, layer].max(initial=0) + 1, 2), -1, dtype=np.int64)
+        children[nodes[:, layer], tuples[:, layer]] = node_states[nodes[:, layer + 1]]
+        signatures, node_states = np.unique(children, axis=0, return_inverse=True)
+        layer_transitions.append(signatures)
+    layer_transitions.reverse()
+    # Number the states layer by layer
+    offsets = np.cumsum([0] + [len(signatures) for signatures in layer_transitions])
+    transitions = []
+    for layer, signatures in enumerate(layer_transitions):
+        states, values = np.nonzero(signatures >= 0)
+        transitions.extend(zip((offsets[layer] + states).tolist(), values.tolist(),
+                               (offsets[layer + 1] + signatures[states, values]).tolist()))
+    return Automaton(list(range(num_workers)), 0, [int(offsets[-1])], transitions)
+
+
+def group_rules(tuples):
+    """Returns the smallest exact encoding of a 0/1 pattern table as a list of rules."""
+    tuples = np.unique(np.asarray(tuples, dtype=np.int64), axis=0)
+    num_tuples, num_workers = tuples.shape
+    table = [Table(list(range(num_workers)), tuples.tolist())]
+    if not num_tuples or not num_workers:
+        return table
+    counts = tuples.sum(axis=1)
+    rules = [Cardinality(list(range(num_workers)), int(counts.min()), int(counts.max()))]
+    always = tuples.all(axis=0)
+    never = ~tuples.any(axis=0)
+    rules += [Cardinality([worker], int(always[worker]), int(always[worker]))
+              for worker in np.flatnonzero(always | never).tolist()]
+    if counts.max() > 1:
+        # Pairs of workers that never work together, leaving out the workers that never work
+        excluded = (tuples.T @ tuples == 0) & ~never & ~never[:, np.newaxis]
+        np.fill_diagonal(excluded, False)
+        rules += [Exclusion(clique) for clique in _exclusion_cliques(excluded)]
+    # The table satisfies the rules, so they are exact when they allow as many patterns
+    if _count_patterns(num_workers, rules) == num_tuples:
+        return rules
+    automaton = table_automaton(tuples)
+    if 3 * len(automaton.transitions) < num_tuples * num_workers:
+        return [automaton]
+    return table
+
+
+def _literal_indices(literals):
+    return tuple(literal.Index() for literal in literals)
+
+
+class GroupConstraintBuilder:
+    """Adds group rules to a CpModel, each distinct constraint once."""
+
+    def __init__(self, model):
+        self.model = model
+        self.__added = set()
+
+    def __new_constraint(self, key):
+        if key in self.__added:
+            return False
+        self.__added.add(key)
+        return True
+
+    def add_cardinality(self, literals, lower, upper):
+        """Adds lower <= sum(literals) <= upper."""
+        literals = sorted(literals, key=lambda literal: literal.Index())
+        if not self.__new_constraint(('cardinality', _literal_indices(literals), lower,
+                                      upper)):
+            return
+        if lower <= 0 and upper >= len(literals):
+            return
+        if (lower, upper) == (1, 1):
+            self.model.AddExactlyOne(literals)
+        elif lower <= 0 and upper == 1:
+            self.model.AddAtMostOne(literals)
+        elif len(literals) == 1:
+            self.model.Add(literals[0] == lower)
+        else:
+            self.model.AddLinearConstraint(sum(literals), lower, upper)
+
+    def add_exclusion(self, literals):
+        """Adds that at most one of the literals is true."""
+        self.add_cardinality(literals, 0, 1)
+
+    def add_automaton(self, literals, start, finals, transitions):
+        """Adds that the automaton accepts the values of the literals, in order."""
+        transitions = sorted(tuple(transition) for transition in transitions)
+        if self.__new_constraint(('automaton', _literal_indices(literals), start,
+                                  tuple(sorted(finals)), tuple(transitions))):
+            self.model.AddAutomaton(literals, start, finals, transitions)
+
+    def add_table(self, literals, tuples):
+        """Adds AddAllowedAssignments(literals, tuples)."""
+        tuples = sorted(tuple(pattern) for pattern in tuples)
+        if self.__new_constraint(('table', _literal_indices(literals), tuple(tuples))):
+            self.model.AddAllowedAssignments(literals, tuples)
+
+    def add_rules(self, literals, rules):
+        """Adds rules over the literals of a group; rule workers index literals."""
+        for rule in rules:
+            members = [literals[worker] for worker in rule.workers]
+            if isinstance(rule, Cardinality):
+                self.add_cardinality(members, rule.lower, rule.upper)
+            elif isinstance(rule, Exclusion):
+                self.add_exclusion(members)
+            elif isinstance(rule, Automaton):
+                self.add_automaton(members, rule.start, rule.finals, rule.transitions)
+            elif isinstance(rule, Table):
+                self.add_table(members, rule.tuples)
+            else:
+                raise ValueError('unknown group rule {!r}'.format(rule))
+
+    def add_allowed_patterns(self, literals, tuples):
+        """Adds that the literals take one of the 0/1 patterns, encoded by group_rules."""
+        self.add_rules(literals, group_rules(tuples))
+
+
+def remove_duplicate_constraints(model):
+    """Removes the repeated constraints of a CpModel; returns how many were removed."""
+    constraints = model.Proto().constraints
+    if any(constraint.HasField('interval') for constraint in constraints):
+        # Other constraints refer to intervals by their position
+        raise ValueError('models with interval constraints are not supported')
+    distinct = dict.fromkeys(constraint.SerializeToString(deterministic=True)
+                             for constraint in constraints)
+    removed = len(constraints) - len(distinct)
+    if removed:
+        del constraints[:]
+        constraints.extend(cp_model_pb2.ConstraintProto.FromString(key) for key in distinct)
+    return removed
@@ -0,0 +1,253 @@
+# Dispatch of assignment models to the linear sum assignment solver
+
+# "Assignment Problem CPSAT.py" and "Assignment Problem MIP.py" give the plain assignment
+# problem (one task per worker at most, one worker per task) to CP-SAT or SCIP as n x m
+# Boolean variables. SimpleLinearSumAssignment solves that structure directly and much
+# faster. solve_model looks at a CP-SAT model or a pywraplp solver and, when its
+# constraints are exactly that structure, solves it with SimpleLinearSumAssignment;
+# otherwise (side constraints such as task sizes, teams or allowed groups) it calls the
+# model's own solver. The structure is recognized when:
+# - every constraint is an exactly-one or at-most-one over 0-1 variables (AddExactlyOne,
+#   AddAtMostOne, or a linear sum with coefficients 1 and upper bound 1)
+# - every variable is in exactly two of them, or in none with a zero cost, and the
+#   constraints split into two sides (workers and tasks) with every variable joining one
+#   constraint of each side
+# - one side has only exactly-one constraints, and the objective is linear with integer
+#   coefficients
+# The linear sum solver needs a perfect matching, so when the exact side is smaller it is
+# padded as described in linear_sum, where the loaders for cost matrices and arc lists
+# are.
+
+import collections
+import os
+import sys
+
+import numpy as np
+from ortools.linear_solver import linear_solver_pb2
+from ortools.linear_solver import pywraplp
+from ortools.sat.python import cp_model
+
+from linear_sum import LINEAR_SUM
+from linear_sum import AssignmentSolution
+from linear_sum import LinearSumProblem
+from linear_sum import solve_linear_sum_problem
+
+# The shared modules live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cp_sat_config import create_solver  # noqa: E402
+
+MP_STATUSES = {pywraplp.Solver.OPTIMAL: 'OPTIMAL', pywraplp.Solver.FEASIBLE: 'FEASIBLE',
+               pywraplp.Solver.INFEASIBLE: 'INFEASIBLE', pywraplp.Solver.UNBOUNDED: 'UNBOUNDED',
+               pywraplp.Solver.ABNORMAL: 'ABNORMAL',
+               pywraplp.Solver.MODEL_INVALID: 'MODEL_INVALID',
+               pywraplp.Solver.NOT_SOLVED: 'NOT_SOLVED'}
+
+
+def _two_colors(num_constraints, ends):
+    """Colors the constraints 0/1 so that every variable joins both colors, or None.
+
+    ends is a (variables, 2) array of the two constraints of every variable. Returns the
+    colors and the connected component of every constraint.
+    """
+    neighbors = np.concatenate([ends, ends[:, ::-1]])
+    neighbors = neighbors[np.argsort(neighbors[:, 0], kind='stable')]
+    indptr = np.searchsorted(neighbors[:, 0], np.arange(num_constraints + 1))
+    adjacent = neighbors[:, 1]
+    colors = np.full(num_constraints, -1, dtype=np.int64)
+    components = np.full(num_constraints, -1, dtype=np.int64)
+    for start in range(num_constraints):
+        if colors[start] >= 0:
+            continue
+        colors[start], components[start] = 0, start
+        queue = collections.deque([start])
+        while queue:
+            constraint = queue.popleft()
+            others = adjacent[indptr[constraint]:indptr[constraint + 1]]
+            if np.any(colors[others] == colors[constraint]):
+                return None
+            # A constraint reached twice from here is a duplicate arc, rejected later
+            new = others[colors[others] < 0]
+            colors[new] = 1 - colors[constraint]
+            components[new] = start
+            queue.extend(new.tolist())
+    return colors, components
+
+
+def find_linear_sum_problem(constraint_variables, constraint_exact, lower_bounds,
+                            upper_bounds, costs):
+    """Returns the LinearSumProblem of a model with the assignment structure, or None.
+
+    constraint_variables lists the variable indices of every exactly-one (constraint_exact)
+    or at-most-one constraint; costs are the objective coefficients to minimize.
+    """
+    costs = np.asarray(costs, dtype=np.float64)
+    num_variables = len(costs)
+    if not np.all(costs == np.round(costs)):
+        return None
+    sizes = np.array([len(variables) for variables in constraint_variables], dtype=np.int64)
+    exact = np.asarray(constraint_exact, dtype=bool)
+    if np.any(exact & (sizes == 0)):
+        return None
+    members = (np.concatenate(constraint_variables).astype(np.int64) if len(sizes)
+               else np.zeros(0, dtype=np.int64))
+    counts = np.bincount(members, minlength=num_variables)
+    used = counts > 0
+    if (np.any((counts != 0) & (counts != 2)) or np.any(costs[~used] != 0) or
+            np.any(lower_bounds[used] != 0) or np.any(upper_bounds[used] > 1) or
+            np.any(lower_bounds[~used] > 0) or np.any(upper_bounds[~used] < 0)):
+        return None
+
+    # The two constraints of every used variable
+    owners = np.repeat(np.arange(len(sizes)), sizes)
+    order = np.argsort(members, kind='stable')
+    ends = owners[order].reshape(-1, 2)
+    variables = members[order][::2]
+    if np.any(ends[:, 0] == ends[:, 1]):
+        return None
+    colored = _two_colors(len(sizes), ends)
+    if colored is None:
+        return None
+    colors, components = colored
+
+    # In every component, the exactly-one side goes left (color 0)
+    component_ids, component_of = np.unique(components, return_inverse=True)
+    inexact = np.zeros((len(component_ids), 2), dtype=bool)
+    np.logical_or.at(inexact, (component_of, colors), ~exact)
+    if np.any(inexact.all(axis=1)):
+        return None
+    colors = colors ^ inexact[component_of, 0]
+    # Empty at-most-one constraints play no part
+    colors[(sizes == 0) & ~exact] = 2
+
+    rank = np.zeros(len(sizes), dtype=np.int64)
+    for color in (0, 1):
+        rank[colors == color] = np.arange(np.count_nonzero(colors == color))
+    left_ends = colors[ends] == 0
+    left = np.where(left_ends[:, 0], rank[ends[:, 0]], rank[ends[:, 1]])
+    right = np.where(left_ends[:, 0], rank[ends[:, 1]], rank[ends[:, 0]])
+    num_left, num_right = np.count_nonzero(colors == 0), np.count_nonzero(colors == 1)
+    # Variables fixed to 0 are arcs that cannot be used
+    usable = upper_bounds[variables] > 0
+    left, right, variables = left[usable], right[usable], variables[usable]
+    keys = np.sort(left * max(num_right, 1) + right)
+    if np.any(keys[1:] == keys[:-1]):
+        return None
+    return LinearSumProblem(left, right, costs[variables].astype(np.int64), variables,
+                            num_left, num_right, exact[colors == 1])
+
+
+def _solve_problem(problem, num_variables):
+    """Solves a LinearSumProblem and returns (status, cost, values of the variables)."""
+    status, cost, mates, _ = solve_linear_sum_problem(problem, exact=True)
+    if status != 'OPTIMAL':
+        return status, None, None
+    keys = problem.left * max(problem.num_right, 1) + problem.right
+    order = np.argsort(keys)
+    chosen = np.arange(problem.num_left) * max(problem.num_right, 1) + mates
+    values = np.zeros(num_variables, dtype=np.int64)
+    values[problem.variable[order[np.searchsorted(keys, chosen, sorter=order)]]] = 1
+    return status, cost, values
+
+
+def cp_model_problem(model):
+    """Returns the LinearSumProblem of a CpModel, or None if it has another structure."""
+    proto = model.Proto()
+    if proto.HasField('floating_point_objective') or proto.search_strategy:
+        return None
+    constraint_variables, constraint_exact = [], []
+    for constraint in proto.constraints:
+        if constraint.enforcement_literal:
+            return None
+        kind = constraint.WhichOneof('constraint')
+        if kind in ('exactly_one', 'at_most_one'):
+            literals = getattr(constraint, kind).literals
+            exact = kind == 'exactly_one'
+        elif kind == 'linear' and all(c == 1 for c in constraint.linear.coeffs):
+            literals = constraint.linear.vars
+            domain = constraint.linear.domain
+            if len(domain) != 2 or domain[1] != 1 or domain[0] > 1:
+                return None
+            exact = domain[0] == 1
+        else:
+            return None
+        literals = np.array(literals, dtype=np.int64)
+        if len(literals) and literals.min() < 0:
+            return None
+        constraint_variables.append(literals)
+        constraint_exact.append(exact)
+    num_variables = len(proto.variables)
+    bounds = np.array([(domain[0], domain[-1]) for domain in
+                       (variable.domain for variable in proto.variables)],
+                      dtype=np.int64).reshape(-1, 2)
+    lower_bounds, upper_bounds = bounds[:, 0], bounds[:, 1]
+    costs = np.zeros(num_variables, dtype=np.float64)
+    if min(proto.objective.vars, default=0) < 0:
+        return None
+    np.add.at(costs, np.array(proto.objective.vars, dtype=np.int64),
+              np.array(proto.objective.coeffs, dtype=np.float64))
+    return find_linear_sum_problem(constraint_variables, constraint_exact, lower_bounds,
+                                   upper_bounds, costs)
+
+
+def mp_model_problem(solver):
+    """Returns the LinearSumProblem of a pywraplp solver, or None (and its proto)."""
+    proto = linear_solver_pb2.MPModelProto()
+    solver.ExportModelToProto(proto)
+    if proto.general_constraint or proto.HasField('quadratic_objective'):
+        return None, proto
+    constraint_variables, constraint_exact = [], []
+    for constraint in proto.constraint:
+        if (any(c != 1 for c in constraint.coefficient) or constraint.upper_bound != 1 or
+                constraint.lower_bound > 1 or
+                0 < constraint.lower_bound < 1):
+            return None, proto
+        constraint_variables.append(np.array(constraint.var_index, dtype=np.int64))
+        constraint_exact.append(constraint.lower_bound == 1)
+    lower_bounds = np.array([v.lower_bound for v in proto.variable])
+    upper_bounds = np.array([v.upper_bound for v in proto.variable])
+    costs = np.array([v.objective_coefficient for v in proto.variable])
+    if proto.maximize:
+        costs = -costs
+    return find_linear_sum_problem(constraint_variables, constraint_exact, lower_bounds,
+                                   upper_bounds, costs), proto
+
+
+def solve_model(model, **options):
+    """Solves a CpModel or a pywraplp.Solver; returns an AssignmentSolution.
+
+    Plain assignment models go to the linear sum assignment solver. Other CP-SAT models are
+    solved by a cp_sat_config.create_solver(**options) solver, other pywraplp models by
+    their own Solve (options are not used).
+    """
+    if isinstance(model, cp_model.CpModel):
+        problem = cp_model_problem(model)
+        if problem is not None:
+            status, cost, values = _solve_problem(problem, len(model.Proto().variables))
+            if status != 'POSSIBLE_OVERFLOW':
+                objective = model.Proto().objective
+                scale = objective.scaling_factor or 1
+                return AssignmentSolution(
+                    status, None if cost is None else scale * (cost + objective.offset),
+                    values, LINEAR_SUM)
+        solver = create_solver(**options)
+        status = solver.Solve(model)
+        solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        return AssignmentSolution(solver.StatusName(status),
+                                  solver.ObjectiveValue() if solved else None,
+                                  np.array(solver.ResponseProto().solution, dtype=np.int64)
+                                  if solved else None, 'CP-SAT')
+
+    problem, proto = mp_model_problem(model)
+    if problem is not None:
+        status, cost, values = _solve_problem(problem, len(proto.variable))
+        if status != 'POSSIBLE_OVERFLOW':
+            if cost is not None:
+                cost = (-cost if proto.maximize else cost) + proto.objective_offset
+            return AssignmentSolution(status, cost, values, LINEAR_SUM)
+    status = model.Solve()
+    solved = status in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE)
+    return AssignmentSolution(
+        MP_STATUSES.get(status, str(status)), model.Objective().Value() if solved else None,
+        np.array([v.solution_value() for v in model.variables()]) if solved else None,
+        model.SolverVersion())
+
@@ -0,0 +1,216 @@
+# Linear sum assignment from cost matrices, masked matrices and sparse arc lists
+
+# "Assignment Problem Linear Sum.py" adds one arc per worker and task in a double loop,
+# skips the zero costs as if they were forbidden, and needs a square matrix. The loaders
+# here build a LinearSumProblem with NumPy, which solve_linear_sum_problem hands to
+# SimpleLinearSumAssignment in one add_arcs_with_cost call:
+# - cost_matrix_problem: a dense matrix; forbidden pairs are the masked entries of a
+#   numpy.ma array or the entries equal to a forbidden marker (NaN, inf, -1...). Zero is
+#   an ordinary cost.
+# - arc_problem: parallel arrays of workers, tasks and costs, so that a matrix that is a
+#   few percent dense is never stored in full.
+# Every task gets a different worker and every worker at most one task. The solver needs
+# a perfect matching, so with more workers than tasks the problem is padded with one of
+# two constructions, whichever adds fewer arcs:
+# - dummy tasks, one per extra worker, each joined at cost 0 to every worker
+# - a mirrored copy: a dummy task per worker joined to that worker at cost 0 (the worker
+#   stays idle), plus a dummy worker per task and one arc at cost 0 mirroring every real
+#   arc, which absorbs the dummy tasks of the busy workers. It adds arcs + workers arcs
+#   instead of extra workers x workers, far fewer for sparse problems.
+# The solver takes int64 costs and reports POSSIBLE_OVERFLOW when their magnitude is above
+# max_safe_cost. solve_linear_sum_problem maps the costs with scale_costs first: integer
+# costs are shifted to start at 0 and solved exactly; float costs (and integer costs whose
+# range is too wide) are also multiplied by the largest safe power of two and rounded,
+# and the optimal cost comes back in the original units with an error bound.
+
+import collections
+
+import numpy as np
+from ortools.graph.python import linear_sum_assignment
+
+LINEAR_SUM = 'linear sum assignment'
+
+# values holds the task of every worker (-1: none), or for assignment_dispatch.solve_model
+# one value per variable of the model; objective is within error_bound of the optimal cost
+AssignmentSolution = collections.namedtuple(
+    'AssignmentSolution', ['status', 'objective', 'values', 'engine', 'error_bound'],
+    defaults=[0])
+
+# Arcs of a linear sum assignment problem: left nodes (the exactly-one side, the tasks)
+# are matched to right nodes (the workers); right_exact marks the right nodes that must be
+# matched too, and variable is the model variable of each arc (None for the loaders)
+LinearSumProblem = collections.namedtuple(
+    'LinearSumProblem', ['left', 'right', 'cost', 'variable', 'num_left', 'num_right',
+                         'right_exact'])
+
+
+def _arc_costs(costs):
+    """Returns costs as int64 or float64, or raises ValueError if they are not finite."""
+    costs = np.asarray(costs)
+    if np.issubdtype(costs.dtype, np.integer):
+        return costs.astype(np.int64, copy=False)
+    costs = costs.astype(np.float64, copy=False)
+    if not np.all(np.isfinite(costs)):
+        raise ValueError('costs must be finite')
+    return costs
+
+
+def cost_matrix_problem(costs, forbidden=None):
+    """Returns the LinearSumProblem of a workers x tasks cost matrix.
+
+    Masked entries of a numpy.ma array, and entries equal to forbidden (NaN matches NaN),
+    are pairs that cannot be assigned.
+    """
+    allowed = ~np.ma.getmaskarray(costs)
+    costs = np.ma.getdata(costs)
+    if forbidden is not None:
+        allowed &= ~(np.isnan(costs) if np.isnan(forbidden) else costs == forbidden)
+    num_workers, num_tasks = costs.shape
+    # Task-major order keeps the arcs of every task together
+    tasks, workers = np.nonzero(allowed.T)
+    return LinearSumProblem(tasks, workers, _arc_costs(costs.T[allowed.T]), None,
+                            num_tasks, num_workers, np.zeros(num_workers, dtype=bool))
+
+
+def arc_problem(workers, tasks, costs, num_workers=None, num_tasks=None):
+    """Returns the LinearSumProblem of arcs (workers[k], tasks[k]) of cost costs[k].
+
+    num_workers and num_tasks default to one more than the largest index.
+    """
+    workers, tasks = np.asarray(workers, dtype=np.int64), np.asarray(tasks, dtype=np.int64)
+    costs = _arc_costs(costs)
+    if not len(workers) == len(tasks) == len(costs):
+        raise ValueError('workers, tasks and costs must have the same length')
+    num_workers = int(workers.max(initial=-1)) + 1 if num_workers is None else num_workers
+    num_tasks = int(tasks.max(initial=-1)) + 1 if num_tasks is None else num_tasks
+    if (len(workers) and (workers.min() < 0 or workers.max() >= num_workers or
+                          tasks.min() < 0 or tasks.max() >= num_tasks)):
+        raise ValueError('arc outside the {} workers and {} tasks'.format(num_workers,
+                                                                          num_tasks))
+    return LinearSumProblem(tasks, workers, costs, None, num_tasks, num_workers,
+                            np.zeros(num_workers, dtype=bool))
+
+
+def max_safe_cost(num_nodes):
+    """Returns the largest cost magnitude that SimpleLinearSumAssignment solves on num_nodes
+    nodes per side without reporting POSSIBLE_OVERFLOW."""
+    # The solver multiplies the costs by num_nodes + 1 and needs price changes of about
+    # 3 (num_nodes + 1) scaled costs to fit in an int64
+    return np.iinfo(np.int64).max // (3 * (num_nodes + 1) ** 2)
+
+
+def scale_costs(costs, num_nodes):
+    """Returns (solver costs, scale, shift, arc error) with solver costs the int64
+    round((costs - shift) * scale), from 0 to max_safe_cost(num_nodes).
+
+    shift is the smallest cost: the solver can report mixed-sign costs as INFEASIBLE.
+    Equal costs, and integer costs (or integral floats) whose range fits, are only
+    shifted: scale is 1 and the arc error 0. Other costs are also multiplied by the
+    largest power of two that fits, which is exact in floating point, so an arc cost is
+    off by at most the arc error = 0.5 / scale plus the rounding of the shift.
+    """
+    limit = max_safe_cost(num_nodes)
+    if not len(costs):
+        return np.zeros(0, dtype=np.int64), 1, 0, 0
+    low, high = costs.min(), costs.max()
+    if low == high:
+        return np.zeros(len(costs), dtype=np.int64), 1, low.item(), 0
+    integral = np.issubdtype(costs.dtype, np.integer) or (
+        max(-low, high) <= 2**53 and np.all(costs == np.rint(costs)))
+    if integral and int(high) - int(low) <= limit:
+        return (costs - low).astype(np.int64), 1, int(low), 0
+    low, high = float(low), float(high)
+    costs = costs.astype(np.float64, copy=False) - low
+    cost_range = costs.max()
+    exponent = int(np.floor(np.log2(limit / cost_range)))
+    while cost_range * 2.0**exponent + 1 > limit:
+        exponent -= 1
+    scale = 2.0**exponent
+    arc_error = 0.5 / scale + float(np.spacing(max(-low, high)))
+    return np.rint(costs * scale).astype(np.int64), scale, low, arc_error
+
+
+def _padded_arcs(problem):
+    """Returns the arcs (left, right) and the node count per side of the square problem
+    that pads problem; the dummy arcs, after the arcs of problem, cost 0."""
+    left, right = problem.left, problem.right
+    num_left, num_right = problem.num_left, problem.num_right
+    num_dummies = num_right - num_left
+    if not num_dummies:
+        return left, right, num_left
+    optional = np.flatnonzero(~problem.right_exact)
+    if num_dummies * len(optional) <= len(left) + len(optional):
+        dummy_left = np.repeat(np.arange(num_left, num_right), len(optional))
+        dummy_right = np.tile(optional, num_dummies)
+        num_nodes = num_right
+    else:
+        # Left: the tasks, then a dummy task per worker. Right: the workers, then a dummy
+        # worker per task.
+        dummy_left = np.concatenate([num_left + optional, num_left + right])
+        dummy_right = np.concatenate([optional, num_right + left])
+        num_nodes = num_left + num_right
+    return (np.concatenate([left, dummy_left]), np.concatenate([right, dummy_right]),
+            num_nodes)
+
+
+def solve_linear_sum_problem(problem, exact=False):
+    """Solves a LinearSumProblem; returns (status, cost, right node of every left node,
+    error bound).
+
+    The costs go through scale_costs and cost is within the error bound of the optimal
+    cost. With exact, costs that cannot be solved exactly give POSSIBLE_OVERFLOW instead.
+    """
+    if problem.num_right < problem.num_left:
+        return 'INFEASIBLE', None, None, None
+    left, right, num_nodes = _padded_arcs(problem)
+    # The solver sizes its graph from the arcs: a node without arcs would be left out (and
+    # its mate read out of bounds) instead of making the problem infeasible
+    if (np.count_nonzero(np.bincount(left, minlength=num_nodes)) < num_nodes or
+            np.count_nonzero(np.bincount(right, minlength=num_nodes)) < num_nodes):
+        return 'INFEASIBLE', None, None, None
+    # Float costs give a float cost, even when they are integral and solved exactly
+    value_type = float if np.issubdtype(np.asarray(problem.cost).dtype, np.floating) else int
+    if not num_nodes:
+        return 'OPTIMAL', value_type(0), np.zeros(0, dtype=np.int64), 0
+    cost, scale, shift, arc_error = scale_costs(problem.cost, num_nodes)
+    if exact and arc_error:
+        return 'POSSIBLE_OVERFLOW', None, None, None
+    cost = np.concatenate([cost, np.zeros(len(left) - len(cost), dtype=np.int64)])
+    # The solver is several times faster with the arcs of every left node together
+    if np.any(left[1:] < left[:-1]):
+        order = np.argsort(left, kind='stable')
+        left, right, cost = left[order], right[order], cost[order]
+    assignment = linear_sum_assignment.SimpleLinearSumAssignment()
+    assignment.add_arcs_with_cost(left.astype(np.int32, copy=False),
+                                  right.astype(np.int32, copy=False), cost)
+    status = assignment.solve()
+    if status != assignment.OPTIMAL:
+        return status.name, None, None, None
+    mates = np.array([assignment.right_mate(node) for node in range(problem.num_left)],
+                     dtype=np.int64)
+    # Every real left node is matched by one real arc, so the shift adds num_left times
+    if scale == 1:
+        optimal_cost = assignment.optimal_cost() + problem.num_left * shift
+        return 'OPTIMAL', value_type(optimal_cost), mates, 0
+    optimal_cost = assignment.optimal_cost() / scale + problem.num_left * shift
+    error_bound = problem.num_left * arc_error + 2 * float(np.spacing(abs(optimal_cost)))
+    return 'OPTIMAL', optimal_cost, mates, error_bound
+
+
+def solve_assignment(problem):
+    """Solves the LinearSumProblem of a loader; returns an AssignmentSolution."""
+    status, cost, mates, error_bound = solve_linear_sum_problem(problem)
+    values = None
+    if mates is not None:
+        values = np.full(problem.num_right, -1, dtype=np.int64)
+        values[mates] = np.arange(problem.num_left)
+    return AssignmentSolution(status, cost, values, LINEAR_SUM, error_bound)
+
+
+def solve_cost_matrix(costs, forbidden=None):
+    """Assigns every task a different worker at minimum cost; returns an AssignmentSolution.
+
+    costs is a workers x tasks matrix, see cost_matrix_problem; float costs are scaled,
+    see solve_linear_sum_problem.
+    """
+    return solve_assignment(cost_matrix_problem(costs, forbidden))
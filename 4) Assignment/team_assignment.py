@@ -0,0 +1,205 @@
+# Column generation for Teams of Workers: team-capacitated assignment at scale
+
+# "Teams of Workers CPSAT.py" and "Teams of Workers MIP.py" build a Boolean x[worker, task]
+# for every pair plus one capacity constraint per team: 50 teams and 10000 tasks make
+# over 100 million variables. solve_teams generates the variables team by team instead:
+# - The master LP (GLOP) is the model of the scripts restricted to the (worker, task)
+#   arcs generated so far. It starts from one artificial arc per task, priced above the
+#   costs of the task (ten times more whenever the master settles on using it).
+# - Pricing: with the duals pi (tasks), rho (workers) and mu (teams), the best bundle of a
+#   team is the matching of at most team_max members to tasks of least total reduced cost
+#   costs[member, task] - pi[task] - rho[member] - mu. It is a linear sum assignment of the
+#   members to the tasks and to idle slots, team_size - team_max of which must be taken.
+#   A member of such a matching always has one of its team_max best tasks free, so only
+#   those arcs are kept. The arcs of the bundles join the master.
+# - The pricing also gives a Lagrangian lower bound on the optimal cost. With no arc left
+#   to add the master is optimal, and the bound equals the master LP value.
+# - A final SCIP solve over the generated arcs gives the integer solution; its distance to
+#   the best bound is the error_bound of the returned AssignmentSolution.
+# Bundles could instead be the master columns, with at most one per team (Dantzig-Wolfe),
+# but then the master only recombines whole bundles and needs over team_max iterations to
+# converge: 140 on 60 workers, against 8 with the arcs. The constraints are totally
+# unimodular (the worker and team constraints are nested), so the master LP and the
+# final solve agree on the optimal cost.
+
+import time
+
+import numpy as np
+from ortools.linear_solver import pywraplp
+
+from linear_sum import AssignmentSolution
+from linear_sum import LinearSumProblem
+from linear_sum import solve_linear_sum_problem
+
+COLUMN_GENERATION = 'column generation'
+
+# Reduced costs above -REDUCED_COST_TOLERANCE do not improve the master
+REDUCED_COST_TOLERANCE = 1e-6
+
+
+def price_team(reduced_costs, capacity):
+    """Returns (member indices, tasks, reduced cost) of the matching of at most capacity
+    rows of reduced_costs to different columns of least total cost, or None if no arc is
+    negative."""
+    num_members, num_tasks = reduced_costs.shape
+    capacity = min(capacity, num_members, num_tasks)
+    if not capacity:
+        return None
+    if capacity < num_tasks:
+        best = np.argpartition(reduced_costs, capacity - 1, axis=1)[:, :capacity]
+    else:
+        best = np.broadcast_to(np.arange(num_tasks), (num_members, num_tasks))
+    members = np.repeat(np.arange(num_members), best.shape[1])
+    tasks = best.ravel()
+    arc_costs = reduced_costs[members, tasks]
+    negative = arc_costs < 0
+    if not np.any(negative):
+        return None
+    members, tasks, arc_costs = members[negative], tasks[negative], arc_costs[negative]
+    candidates, right = np.unique(tasks, return_inverse=True)
+    # Right nodes: the candidate tasks, then num_members idle slots at cost 0, the first
+    # num_members - capacity of which must be taken
+    slots = len(candidates) + np.arange(num_members)
+    problem = LinearSumProblem(
+        np.concatenate([members, np.repeat(np.arange(num_members), num_members)]),
+        np.concatenate([right, np.tile(slots, num_members)]),
+        np.concatenate([arc_costs, np.zeros(num_members**2)]), None, num_members,
+        len(candidates) + num_members,
+        np.concatenate([np.zeros(len(candidates), dtype=bool),
+                        np.arange(num_members) < num_members - capacity]))
+    status, _, mates, _ = solve_linear_sum_problem(problem)
+    if status != 'OPTIMAL':
+        raise ValueError('pricing failed: ' + status)
+    busy = np.flatnonzero(mates < len(candidates))
+    chosen_tasks = candidates[mates[busy]]
+    return busy, chosen_tasks, float(reduced_costs[busy, chosen_tasks].sum())
+
+
+def _rows(index, num_rows):
+    """Returns the arcs of every row, given the row of every arc."""
+    order = np.argsort(index, kind='stable')
+    bounds = np.searchsorted(index[order], np.arange(num_rows + 1))
+    return [order[bounds[row]:bounds[row + 1]].tolist() for row in range(num_rows)]
+
+
+def solve_teams(costs, team, team_max, max_iterations=1000, time_limit=None, log=False):
+    """Assigns every task a different worker with at most team_max tasks per team.
+
+    costs is a workers x tasks matrix, team the team of every worker and team_max the
+    limit of every team (a number, or one per team). Returns an AssignmentSolution whose
+    values are the task of every worker (-1: none). time_limit (seconds) stops the column
+    generation; the final integer solve gets what is left, at least a tenth of it.
+    """
+    start_time = time.perf_counter()
+    costs = np.asarray(costs)
+    team = np.asarray(team, dtype=np.int64)
+    num_workers, num_tasks = costs.shape
+    if len(team) != num_workers:
+        raise ValueError('team must give the team of every worker')
+    num_teams = int(team.max(initial=-1)) + 1
+    team_max = np.broadcast_to(np.asarray(team_max, dtype=np.int64), (num_teams,))
+    members = [np.flatnonzero(team == g) for g in range(num_teams)]
+
+    master = pywraplp.Solver.CreateSolver('GLOP')
+    task_rows = [master.Constraint(1, 1) for _ in range(num_tasks)]
+    worker_rows = [master.Constraint(-master.infinity(), 1) for _ in range(num_workers)]
+    team_rows = [master.Constraint(-master.infinity(), int(team_max[g]))
+                 for g in range(num_teams)]
+    objective = master.Objective()
+    objective.SetMinimization()
+    artificial_costs = np.abs(costs).max(axis=0, initial=0).astype(np.float64) + 1
+    # Past the cost of assigning every task, the tasks cannot be covered
+    artificial_limit = 10 * artificial_costs.sum()
+    artificials = [master.NumVar(0, master.infinity(), '') for _ in range(num_tasks)]
+    for task, variable in enumerate(artificials):
+        objective.SetCoefficient(variable, artificial_costs[task])
+        task_rows[task].SetCoefficient(variable, 1)
+    # The generated arcs as worker * num_tasks + task
+    arcs = set()
+
+    lower_bound = -np.inf
+    iterations = 0
+    converged = False
+    while iterations < max_iterations:
+        if time_limit is not None and time.perf_counter() - start_time > time_limit:
+            break
+        if master.Solve() != pywraplp.Solver.OPTIMAL:
+            raise ValueError('master LP failed')
+        iterations += 1
+        master_value = objective.Value()
+        task_duals = np.array([row.dual_value() for row in task_rows])
+        worker_duals = np.array([row.dual_value() for row in worker_rows])
+        team_duals = np.array([row.dual_value() for row in team_rows])
+        bound = task_duals.sum() + worker_duals.sum() + team_duals @ team_max
+        new_arcs = 0
+        for g in range(num_teams):
+            team_members = members[g]
+            reduced_costs = (costs[team_members] - task_duals -
+                             (worker_duals[team_members] + team_duals[g])[:, np.newaxis])
+            bundle = price_team(reduced_costs, int(team_max[g]))
+            if bundle is None:
+                continue
+            busy, tasks, reduced_cost = bundle
+            # Every team takes one bundle at most, so no solution beats the bound
+            bound += reduced_cost
+            for member, task in zip(busy.tolist(), tasks.tolist()):
+                worker = int(team_members[member])
+                if (worker * num_tasks + task in arcs or
+                        reduced_costs[member, task] >= -REDUCED_COST_TOLERANCE):
+                    continue
+                arcs.add(worker * num_tasks + task)
+                variable = master.NumVar(0, master.infinity(), '')
+                objective.SetCoefficient(variable, float(costs[worker, task]))
+                task_rows[task].SetCoefficient(variable, 1)
+                worker_rows[worker].SetCoefficient(variable, 1)
+                team_rows[g].SetCoefficient(variable, 1)
+                new_arcs += 1
+        lower_bound = max(lower_bound, bound)
+        if log:
+            print('iteration {}: master {:.6g}, bound {:.6g}, {} arcs'.format(
+                iterations, master_value, lower_bound, new_arcs))
+        if not new_arcs:
+            lower_bound = max(lower_bound, master_value)
+            used = [task for task, variable in enumerate(artificials)
+                    if variable.solution_value() > REDUCED_COST_TOLERANCE]
+            if not used or artificial_costs[used].max() >= artificial_limit:
+                converged = True
+                break
+            for task in used:
+                artificial_costs[task] *= 10
+                objective.SetCoefficient(artificials[task], artificial_costs[task])
+
+    # Final integer solve over the generated arcs
+    arcs = np.array(sorted(arcs), dtype=np.int64)
+    workers, tasks = arcs // max(num_tasks, 1), arcs % max(num_tasks, 1)
+    restricted = pywraplp.Solver.CreateSolver('SCIP')
+    if time_limit is not None:
+        remaining = max(time_limit - (time.perf_counter() - start_time), time_limit / 10)
+        restricted.SetTimeLimit(int(1000 * remaining))
+    x = [restricted.BoolVar('') for _ in range(len(arcs))]
+    for task_arcs in _rows(tasks, num_tasks):
+        restricted.Add(restricted.Sum([x[arc] for arc in task_arcs]) == 1)
+    for worker_arcs in _rows(workers, num_workers):
+        restricted.Add(restricted.Sum([x[arc] for arc in worker_arcs]) <= 1)
+    for g, team_arcs in enumerate(_rows(team[workers], num_teams)):
+        restricted.Add(restricted.Sum([x[arc] for arc in team_arcs]) <= int(team_max[g]))
+    restricted.Minimize(restricted.Sum([float(cost) * variable for cost, variable
+                                        in zip(costs[workers, tasks].tolist(), x)]))
+    status = restricted.Solve()
+    if status not in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+        # Without all the arcs, no solution may just mean that some are missing
+        infeasible = converged and status == pywraplp.Solver.INFEASIBLE
+        return AssignmentSolution('INFEASIBLE' if infeasible else 'NOT_SOLVED', None, None,
+                                  COLUMN_GENERATION, None)
+    chosen = np.array([variable.solution_value() > 0.5 for variable in x], dtype=bool)
+    values = np.full(num_workers, -1, dtype=np.int64)
+    values[workers[chosen]] = tasks[chosen]
+    total = costs[workers[chosen], tasks[chosen]].sum().item()
+    if np.issubdtype(costs.dtype, np.integer):
+        # The optimal cost is an integer too
+        lower_bound = np.ceil(lower_bound - REDUCED_COST_TOLERANCE)
+    error_bound = max(total - float(lower_bound), 0)
+    # Float costs leave rounding errors between the LP bound and the total
+    optimal = error_bound <= REDUCED_COST_TOLERANCE * max(1, abs(total))
+    return AssignmentSolution('OPTIMAL' if optimal else 'FEASIBLE', total, values,
+                              COLUMN_GENERATION, 0 if optimal else error_bound)
@@ -0,0 +1,74 @@
+# Benchmark: serial row-blocked requests vs tiled, pooled, concurrent fetching
+
+# Builds a cold distance matrix for num_addresses addresses against the local stand-in
+# Distance Matrix server, which adds `latency` seconds to every request. The baseline
+# is the original create_distance_matrix algorithm: max_elements // num_addresses origin
+# rows per request, sent one after another, with a fresh urllib connection each time.
+
+import time
+
+from distance_matrix_api import build_distance_matrix
+from distance_matrix_api import send_request
+from distance_matrix_api import tile_requests
+from distance_fetcher import DistanceMatrixFetcher
+from distance_matrix_server import DistanceMatrixServer
+from distance_matrix_server import fake_distance
+
+num_addresses = 100
+latency = 0.05
+
+
+def row_blocked_distance_matrix(addresses, API_key, base_url):
+    """The original serial algorithm: whole rows per request, no connection reuse."""
+    max_rows = 100 // len(addresses)
+    distance_matrix = []
+    for start in range(0, len(addresses), max_rows):
+        origin_addresses = addresses[start:start + max_rows]
+        response = send_request(origin_addresses, addresses, API_key, base_url=base_url)
+        distance_matrix += build_distance_matrix(response)
+    return distance_matrix
+
+
+def tiled_distance_matrix(addresses, fetcher):
+    cells = fetcher.fetch(tile_requests(addresses, addresses))
+    return [[cells[origin, destination] for destination in addresses]
+            for origin in addresses]
+
+
+addresses = ['{}+Main+St+Memphis+TN'.format(i) for i in range(num_addresses)]
+expected = [[fake_distance(o, d) for d in addresses] for o in addresses]
+
+print('{} addresses, {:.0f} ms simulated latency per request\n'.format(
+    num_addresses, latency * 1000))
+print('{:34} {:>9} {:>9} {:>12} {:>8}'.format(
+    'mode', 'seconds', 'requests', 'connections', 'retries'))
+
+server = DistanceMatrixServer(latency=latency).start()
+start_time = time.perf_counter()
+matrix = row_blocked_distance_matrix(addresses, 'KEY', server.base_url)
+elapsed = time.perf_counter() - start_time
+assert matrix == expected
+print('{:34} {:9.3f} {:9} {:>12} {:>8}'.format(
+    'row-blocked serial (original)', elapsed, server.request_count,
+    server.request_count, 0))
+server.stop()
+
+runs = [('tiled, 1 worker, keep-alive', 1, 0),
+        ('tiled, 8 workers', 8, 0),
+        ('tiled, 32 workers', 32, 0),
+        ('tiled, 32 workers, 20 req/s limit', 32, 20),
+        ('tiled, 8 workers, every 10th fails', 8, 0)]
+for name, max_workers, rate_limit in runs:
+    fail_every = 10 if 'fails' in name else 0
+    server = DistanceMatrixServer(latency=latency, fail_every=fail_every).start()
+    fetcher = DistanceMatrixFetcher('KEY', base_url=server.base_url,
+                                    max_workers=max_workers,
+                                    rate_limit=rate_limit or None, backoff=0.05)
+    start_time = time.perf_counter()
+    matrix = tiled_distance_matrix(addresses, fetcher)
+    elapsed = time.perf_counter() - start_time
+    assert matrix == expected
+    print('{:34} {:9.3f} {:9} {:12} {:8}'.format(
+        name, elapsed, fetcher.request_count, fetcher.connection_count,
+        fetcher.retry_count))
+    server.stop()
@@ -5,10 +5,13 @@
 
 # TODO: Add "guided local search" which enables the solver to escape a local minimum—a solution that is shorter than all nearby routes, but which is not the global minimum. After moving away from the local minimum, the solver continues the search
 
-import math
 from ortools.constraint_solver import routing_enums_pb2
 from ortools.constraint_solver import pywrapcp
 
+from distance_matrix import compute_euclidean_distance_matrix
+from routes import extract_routes
+from transit import register_transit_matrix
+
 
 def create_data_model():
     data = {}
@@ -66,39 +69,15 @@ def create_data_model():
     data['depot'] = 0
     return data
 
-# Calculates distances between each point
-# Returns array where row[i] is an array of distances from point[i] to all other points
-
-
-def compute_euclidean_distance_matrix(locations):
-    distances = {}
-    for from_counter, from_node in enumerate(locations):
-        distances[from_counter] = {}
-        for to_counter, to_node in enumerate(locations):
-            if from_counter == to_counter:
-                distances[from_counter][to_counter] = 0
-            else:
-                # Euclidean distance
-                distances[from_counter][to_counter] = (int(
-                    math.hypot((from_node[0] - to_node[0]),
-                               (from_node[1] - to_node[1]))))
-    return distances
-
 
 def print_solution(manager, routing, solution):
     print('Objective: {}'.format(solution.ObjectiveValue()))
-    index = routing.Start(0)
+    route = extract_routes(manager, routing, solution)[0]
+    nodes = route['nodes'].tolist()
     plan_output = 'Route:\n'
-    route_distance = 0
-    while not routing.IsEnd(index):
-        plan_output += ' {} ->'.format(manager.IndexToNode(index))
-        previous_index = index
-        index = solution.Value(routing.NextVar(index))
-        route_distance += routing.GetArcCostForVehicle(
-            previous_index, index, 0)
-    plan_output += ' {}\n'.format(manager.IndexToNode(index))
+    plan_output += ''.join(' {} ->'.format(node) for node in nodes[:-1])
+    plan_output += ' {}\n'.format(nodes[-1])
     print(plan_output)
-    plan_output += 'Objective: {}m\n'.format(route_distance)
 
 
 # Define data
@@ -111,18 +90,12 @@ manager = pywrapcp.RoutingIndexManager(
 # Define routing model
 routing = pywrapcp.RoutingModel(manager)
 
+# Calculates distances between each point as an n x n int64 array
+# Row[i] holds the distances from point[i] to all other points
 distance_matrix = compute_euclidean_distance_matrix(data['locations'])
 
-
-def distance_callback(from_index, to_index):
-    """Returns the distance between the two nodes."""
-    # Convert from routing variable Index to distance matrix NodeIndex.
-    from_node = manager.IndexToNode(from_index)
-    to_node = manager.IndexToNode(to_index)
-    return distance_matrix[from_node][to_node]
-
-
-transit_callback_index = routing.RegisterTransitCallback(distance_callback)
+# Register the distance matrix with the solver; arc costs are looked up in C++
+transit_callback_index = register_transit_matrix(routing, manager, distance_matrix)
 
 # Define cost of each arc
 routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
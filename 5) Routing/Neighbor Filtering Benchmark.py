@@ -0,0 +1,131 @@
+# Benchmark: dense complete graph vs k-nearest-neighbour candidate graph (time to quality)
+
+# Solves the 280-hole circuit board and synthetic boards with guided local search under the
+# same time limit and records every improving solution:
+# - complete: the dense baseline, starting from PATH_CHEAPEST_ARC
+# - k-nearest: starts from nearest_neighbor_tour, operators limited to the k candidates
+# - k-forbid: as k-nearest, and every non-candidate arc is removed from the model
+# Boards above 5000 holes are out of reach of the routing solver here: closing the model
+# evaluates every one of the n^2 arcs, through the on-demand Python callback above
+# max_dense_size (4 s at 3000 holes, about 47 s at 10000, and some 20 minutes at 50000,
+# all before the first solution), and a dense matrix for RegisterTransitMatrix takes a
+# nested list of n^2 Python ints (about 3.6 GB at 10000).
+# Usage: python "Neighbor Filtering Benchmark.py" [sizes] [k] [seconds]
+# e.g. python "Neighbor Filtering Benchmark.py" 280,2000,5000 10 60
+
+import sys
+import time
+
+import numpy as np
+from ortools.constraint_solver import routing_enums_pb2
+from ortools.constraint_solver import pywrapcp
+
+from distance_matrix import compute_euclidean_distance_matrix
+from example_loader import load_functions
+from neighbors import k_nearest_neighbors
+from neighbors import nearest_neighbor_tour
+from neighbors import restrict_to_neighbors
+from neighbors import set_neighbor_search_parameters
+from transit import register_euclidean_callback
+from transit import register_transit_matrix
+
+sizes = [int(size) for size in (sys.argv[1] if len(sys.argv) > 1 else '280,2000').split(',')]
+num_neighbors = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+time_limit = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+# Above this many holes the dense matrix is not materialized; distances are computed on demand
+max_dense_size = 3000
+
+
+def synthetic_board(num_holes, seed=0):
+    """Returns num_holes distinct integer hole positions on a square board."""
+    rng = np.random.default_rng(seed)
+    side = int(10 * np.sqrt(num_holes)) + 1
+    holes = set()
+    while len(holes) < num_holes:
+        points = rng.integers(0, side, size=(num_holes, 2))
+        holes.update(map(tuple, points.tolist()))
+    return sorted(holes)[:num_holes]
+
+
+def solve(locations, neighbors=None, forbid_far_arcs=False):
+    """Returns (build seconds, [(seconds, objective) for every improving solution])."""
+    start_time = time.perf_counter()
+    manager = pywrapcp.RoutingIndexManager(len(locations), 1, 0)
+    routing = pywrapcp.RoutingModel(manager)
+    if len(locations) <= max_dense_size:
+        transit_callback_index = register_transit_matrix(
+            routing, manager, compute_euclidean_distance_matrix(locations))
+    else:
+        transit_callback_index = register_euclidean_callback(routing, manager, locations)
+    routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
+
+    search_parameters = pywrapcp.DefaultRoutingSearchParameters()
+    search_parameters.first_solution_strategy = (
+        routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC)
+    search_parameters.local_search_metaheuristic = (
+        routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH)
+    search_parameters.time_limit.seconds = time_limit
+    build_time = time.perf_counter() - start_time
+
+    trajectory = []
+
+    def record_solution():
+        objective = routing.CostVar().Max()
+        if not trajectory or objective < trajectory[-1][1]:
+            trajectory.append((time.perf_counter() - start_time, objective))
+
+    routing.AddAtSolutionCallback(record_solution)
+    start_time = time.perf_counter()
+    if neighbors is None:
+        routing.SolveWithParameters(search_parameters)
+        return build_time, trajectory
+
+    # The initial tour is part of the search time, like PATH_CHEAPEST_ARC is above
+    tour = nearest_neighbor_tour(locations, neighbors)
+    if forbid_far_arcs:
+        restrict_to_neighbors(routing, manager, neighbors, routes=[tour])
+    set_neighbor_search_parameters(search_parameters, neighbors)
+    routing.CloseModelWithParameters(search_parameters)
+    initial_solution = routing.ReadAssignmentFromRoutes([tour], True)
+    routing.SolveFromAssignmentWithParameters(initial_solution, search_parameters)
+    return build_time, trajectory
+
+
+def time_to(trajectory, target):
+    for seconds, objective in trajectory:
+        if objective <= target:
+            return '{:.2f}'.format(seconds)
+    return '-'
+
+
+(create_data_model,) = load_functions('Drilling a Circuit Board.py', 'create_data_model')
+
+print('k = {}, {} s per run\n'.format(num_neighbors, time_limit))
+print('{:>7} {:14} {:>8} {:>10} {:>12} {:>10} {:>9} {:>9}'.format(
+    'holes', 'graph', 'build s', 'first s', 'first obj', 'best obj', 'to +5% s',
+    'to +1% s'))
+for size in sizes:
+    if size == 280:
+        locations = create_data_model()['locations']
+    else:
+        locations = synthetic_board(size)
+
+    start_time = time.perf_counter()
+    neighbors = k_nearest_neighbors(locations, num_neighbors)
+    neighbor_time = time.perf_counter() - start_time
+
+    results = [('complete', ) + solve(locations),
+               ('{}-nearest'.format(num_neighbors), ) + solve(locations, neighbors),
+               ('{}-forbid'.format(num_neighbors), ) + solve(locations, neighbors, True)]
+    best = min(trajectory[-1][1] for _, _, trajectory in results if trajectory)
+    for graph, build_time, trajectory in results:
+        if not trajectory:
+            print('{:7} {:14} {:8.2f} no solution'.format(size, graph, build_time))
+            continue
+        if graph != 'complete':
+            build_time += neighbor_time
+        print('{:7} {:14} {:8.2f} {:10.2f} {:12} {:10} {:>9} {:>9}'.format(
+            size, graph, build_time, trajectory[0][0], trajectory[0][1],
+            trajectory[-1][1], time_to(trajectory, best * 1.05),
+            time_to(trajectory, best * 1.01)))
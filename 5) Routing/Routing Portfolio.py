@@ -0,0 +1,40 @@
+# Portfolio solve of the CVRP and VRPTW examples
+
+# Runs every first solution strategy x metaheuristic x seed combination of portfolio.py in
+# a process pool under one shared wall-clock budget per problem and reports the objective
+# of each configuration and which one won.
+# Usage: python "Routing Portfolio.py" [budget seconds] [workers] [seeds]
+# e.g. python "Routing Portfolio.py" 60 8 0,1,2
+
+import sys
+
+from portfolio import config_name
+from portfolio import portfolio_configs
+from portfolio import solve_portfolio
+
+budget = float(sys.argv[1]) if len(sys.argv) > 1 else 12
+max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+seeds = [int(seed) for seed in (sys.argv[3] if len(sys.argv) > 3 else '0,1').split(',')]
+
+problems = [('VRP with Constraints.py', ['Capacity']),
+            ('VRP with Time Windows.py', ['Time'])]
+
+if __name__ == '__main__':
+    configs = portfolio_configs(seeds=seeds)
+    for filename, dimensions in problems:
+        print('{}: {} configurations, {} s budget'.format(filename, len(configs), budget))
+        best, results = solve_portfolio(filename, configs, budget, max_workers, dimensions)
+        for result in results:
+            objective = result['objective'] if result['objective'] is not None else '-'
+            print('  {:62} {:>10} {:>8.2f} s  {}'.format(
+                config_name(result['config']), objective, result['seconds'],
+                result['status']))
+        if best is None:
+            print('  No solution\n')
+            continue
+        print('Winner: {} with objective {}'.format(config_name(best['config']),
+                                                   best['objective']))
+        for route in best['routes']:
+            print('  Route for vehicle {}: {}'.format(
+                route['vehicle_id'], ' -> '.join(map(str, route['nodes']))))
+        print()
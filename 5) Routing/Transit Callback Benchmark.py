@@ -0,0 +1,70 @@
+# Benchmark: Python distance_callback vs matrix-based transit registration
+
+# Solves the 280-hole circuit board instance from "Drilling a Circuit Board.py" with the
+# same search parameters twice: once with the original Python closure (two IndexToNode
+# calls and a nested-list lookup per arc) and once with register_transit_matrix, where
+# arc costs are looked up in C++. Both runs must reach the same objective.
+
+import statistics
+import time
+
+from ortools.constraint_solver import routing_enums_pb2
+from ortools.constraint_solver import pywrapcp
+
+from distance_matrix import compute_euclidean_distance_matrix
+from example_loader import load_functions
+from transit import register_transit_matrix
+
+num_runs = 5
+
+
+def register_python_callback(routing, manager, distance_matrix):
+    """Registers the distance matrix the way the examples originally did."""
+    distance_matrix = distance_matrix.tolist()
+
+    def distance_callback(from_index, to_index):
+        from_node = manager.IndexToNode(from_index)
+        to_node = manager.IndexToNode(to_index)
+        return distance_matrix[from_node][to_node]
+
+    return routing.RegisterTransitCallback(distance_callback)
+
+
+def solve(data, distance_matrix, register):
+    """Builds and solves the model, returning (build seconds, solve seconds, objective)."""
+    start_time = time.perf_counter()
+    manager = pywrapcp.RoutingIndexManager(
+        len(data['locations']), data['num_vehicles'], data['depot'])
+    routing = pywrapcp.RoutingModel(manager)
+    transit_callback_index = register(routing, manager, distance_matrix)
+    routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
+
+    search_parameters = pywrapcp.DefaultRoutingSearchParameters()
+    search_parameters.first_solution_strategy = (
+        routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC)
+    build_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    solution = routing.SolveWithParameters(search_parameters)
+    solve_time = time.perf_counter() - start_time
+    return build_time, solve_time, solution.ObjectiveValue()
+
+
+(create_data_model,) = load_functions('Drilling a Circuit Board.py', 'create_data_model')
+data = create_data_model()
+distance_matrix = compute_euclidean_distance_matrix(data['locations'])
+
+print('Circuit board: {} holes, {} runs each\n'.format(len(data['locations']), num_runs))
+results = {}
+for name, register in [('python callback', register_python_callback),
+                       ('transit matrix', register_transit_matrix)]:
+    runs = [solve(data, distance_matrix, register) for _ in range(num_runs)]
+    build_time = statistics.median(run[0] for run in runs)
+    solve_time = statistics.median(run[1] for run in runs)
+    objectives = {run[2] for run in runs}
+    results[name] = solve_time
+    print('{:16} build {:8.4f} s  solve {:8.4f} s  objective {}'.format(
+        name, build_time, solve_time, ', '.join(map(str, sorted(objectives)))))
+
+print('\nSolve speedup: {:.2f}x'.format(
+    results['python callback'] / results['transit matrix']))
@@ -5,6 +5,9 @@
 from ortools.constraint_solver import routing_enums_pb2
 from ortools.constraint_solver import pywrapcp
 
+from routes import extract_routes
+from transit import register_transit_matrix
+
 
 def create_data_model():
     # Stores the data for the problem
@@ -46,18 +49,12 @@ def create_data_model():
 def print_solution(manager, routing, solution):
     """Prints solution on console."""
     print('Objective: {} miles'.format(solution.ObjectiveValue()))
-    index = routing.Start(0)
+    route = extract_routes(manager, routing, solution)[0]
+    nodes = route['nodes'].tolist()
     plan_output = 'Route for vehicle 0:\n'
-    route_distance = 0
-    while not routing.IsEnd(index):
-        plan_output += ' {} ->'.format(manager.IndexToNode(index))
-        previous_index = index
-        index = solution.Value(routing.NextVar(index))
-        route_distance += routing.GetArcCostForVehicle(
-            previous_index, index, 0)
-    plan_output += ' {}\n'.format(manager.IndexToNode(index))
+    plan_output += ''.join(' {} ->'.format(node) for node in nodes[:-1])
+    plan_output += ' {}\n'.format(nodes[-1])
     print(plan_output)
-    plan_output += 'Route distance: {}miles\n'.format(route_distance)
 
 
 data = create_data_model()
@@ -69,15 +66,8 @@ manager = pywrapcp.RoutingIndexManager(
 # Create Routing Model
 routing = pywrapcp.RoutingModel(manager)
 
-
-def distance_callback(from_index, to_index):
-    """Returns the distance between the two nodes."""
-    # Convert from routing variable Index to distance matrix NodeIndex.
-    from_node = manager.IndexToNode(from_index)
-    to_node = manager.IndexToNode(to_index)
-    return data['distance_matrix'][from_node][to_node]
-
-transit_callback_index = routing.RegisterTransitCallback(distance_callback)
+# Register the distance matrix with the solver; arc costs are looked up in C++
+transit_callback_index = register_transit_matrix(routing, manager, data['distance_matrix'])
 
 # Define cost of each arc
 routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
@@ -5,6 +5,10 @@
 from ortools.constraint_solver import routing_enums_pb2
 from ortools.constraint_solver import pywrapcp
 
+from routes import iter_routes
+from transit import register_transit_matrix
+from transit import register_unary_transit_vector
+
 
 def create_data_model():
     """Stores the data for the problem."""
@@ -88,33 +92,22 @@ def create_data_model():
     return data
 
 
-def demand_callback(from_index):
-    """Returns the demand of the node."""
-    # Convert from routing variable Index to demands NodeIndex.
-    from_node = manager.IndexToNode(from_index)
-    return data['demands'][from_node]
-
-
 def print_solution(data, manager, routing, solution):
     """Prints solution on console."""
     print(f'Objective: {solution.ObjectiveValue()}')
     total_distance = 0
     total_load = 0
-    for vehicle_id in range(data['num_vehicles']):
-        index = routing.Start(vehicle_id)
-        plan_output = 'Route for vehicle {}:\n'.format(vehicle_id)
-        route_distance = 0
-        route_load = 0
-        while not routing.IsEnd(index):
-            node_index = manager.IndexToNode(index)
-            route_load += data['demands'][node_index]
-            plan_output += ' {0} Load({1}) -> '.format(node_index, route_load)
-            previous_index = index
-            index = solution.Value(routing.NextVar(index))
-            route_distance += routing.GetArcCostForVehicle(
-                previous_index, index, vehicle_id)
-        plan_output += ' {0} Load({1})\n'.format(manager.IndexToNode(index),
-                                                 route_load)
+    for route in iter_routes(manager, routing, solution, dimensions=['Capacity']):
+        nodes = route['nodes'].tolist()
+        # The Capacity cumul at a stop is the load picked up before it
+        loads = route['cumuls']['Capacity']['min'].tolist()
+        route_distance = int(route['distance'][-1])
+        route_load = loads[-1]
+        plan_output = 'Route for vehicle {}:\n'.format(route['vehicle_id'])
+        plan_output += ''.join(
+            ' {0} Load({1}) -> '.format(node, load + data['demands'][node])
+            for node, load in zip(nodes[:-1], loads[:-1]))
+        plan_output += ' {0} Load({1})\n'.format(nodes[-1], route_load)
         plan_output += 'Distance of the route: {}m\n'.format(route_distance)
         plan_output += 'Load of the route: {}\n'.format(route_load)
         print(plan_output)
@@ -124,45 +117,36 @@ def print_solution(data, manager, routing, solution):
     print('Total load of all routes: {}'.format(total_load))
 
 
-def distance_callback(from_index, to_index):
-    """Returns the distance between the two nodes."""
-    # Convert from routing variable Index to distance matrix NodeIndex.
-    from_node = manager.IndexToNode(from_index)
-    to_node = manager.IndexToNode(to_index)
-    return data['distance_matrix'][from_node][to_node]
-
+def create_routing_model(data):
+    """Builds the routing model; returns (manager, routing)."""
+    # Define routing index manager
+    manager = pywrapcp.RoutingIndexManager(len(data['distance_matrix']),
+                                           data['num_vehicles'],
+                                           data['depot'])
 
-def demand_callback(from_index):
-    """Returns the demand of the node."""
-    # Convert from routing variable Index to demands NodeIndex.
-    from_node = manager.IndexToNode(from_index)
-    return data['demands'][from_node]
+    # Define routing model
+    routing = pywrapcp.RoutingModel(manager)
 
+    # Register the distance matrix with the solver; arc costs are looked up in C++
+    transit_callback_index = register_transit_matrix(routing, manager, data['distance_matrix'])
 
-data = create_data_model()
-
-# Define routing index manager
-manager = pywrapcp.RoutingIndexManager(len(data['distance_matrix']),
-                                       data['num_vehicles'],
-                                       data['depot'])
+    # Define cost of each arc
+    routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
 
-# Define routing model
-routing = pywrapcp.RoutingModel(manager)
+    # Add capacity constraint
+    demand_callback_index = register_unary_transit_vector(routing, manager, data['demands'])
 
-transit_callback_index = routing.RegisterTransitCallback(distance_callback)
+    routing.AddDimensionWithVehicleCapacity(
+        demand_callback_index,
+        0,  # null capacity slack
+        data['vehicle_capacities'],  # vehicle maximum capacities
+        True,  # start cumul to zero
+        'Capacity')
+    return manager, routing
 
-# Define cost of each arc
-routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
 
-# Add capacity constraint
-demand_callback_index = routing.RegisterUnaryTransitCallback(demand_callback)
-
-routing.AddDimensionWithVehicleCapacity(
-    demand_callback_index,
-    0,  # null capacity slack
-    data['vehicle_capacities'],  # vehicle maximum capacities
-    True,  # start cumul to zero
-    'Capacity')
+data = create_data_model()
+manager, routing = create_routing_model(data)
 
 # Setting first solution heuristic
 search_parameters = pywrapcp.DefaultRoutingSearchParameters()
@@ -4,13 +4,17 @@
 
 from __future__ import division
 from __future__ import print_function
-import requests
-import json
-import urllib
 
 from ortools.constraint_solver import routing_enums_pb2
 from ortools.constraint_solver import pywrapcp
 
+import distance_cache
+from distance_cache import DistanceCache
+from distance_fetcher import DistanceMatrixFetcher
+
+from routes import iter_routes
+from transit import register_transit_matrix
+
 def create_data():
   data = {}
   data['API_key'] = 'YOUR API KEY' # Get API key here: https://developers.google.com/maps/documentation/distance-matrix/start#get-a-key
@@ -33,88 +37,40 @@ def create_data():
                       ]
   data['num_vehicles'] = 4
   data['depot'] = 0
+  # SQLite file holding every distance fetched so far, keyed by (units, origin, destination)
+  data['distance_cache'] = 'distance_matrix_cache.sqlite'
   
   return data
 
 
 def create_distance_matrix(data):
-    addresses = data["addresses"]
-    API_key = data["API_key"]
-    # Distance Matrix API only accepts 100 elements per request, so get rows in multiple requests.
-    max_elements = 100
-    num_addresses = len(addresses)  # 16 in this example.
-    # Maximum number of rows that can be computed per request (6 in this example).
-    max_rows = max_elements // num_addresses
-    # num_addresses = q * max_rows + r (q = 2 and r = 4 in this example).
-    q, r = divmod(num_addresses, max_rows)
-    dest_addresses = addresses
-    distance_matrix = []
-    # Send q requests, returning max_rows rows per request.
-    for i in range(q):
-        origin_addresses = addresses[i * max_rows: (i + 1) * max_rows]
-        response = send_request(origin_addresses, dest_addresses, API_key)
-        distance_matrix += build_distance_matrix(response)
-
-    # Get the remaining remaining r rows, if necessary.
-    if r > 0:
-        origin_addresses = addresses[q * max_rows: q * max_rows + r]
-        response = send_request(origin_addresses, dest_addresses, API_key)
-        distance_matrix += build_distance_matrix(response)
-    return distance_matrix
-
-
-
-def build_address_str(addresses):
-    # Build a pipe-separated string of addresses
-    address_str = ''
-    for i in range(len(addresses) - 1):
-        address_str += addresses[i] + '|'
-    address_str += addresses[-1]
-    return address_str
-
-def send_request(origin_addresses, dest_addresses, API_key):
-    """ Build and send request for the given origin and destination addresses."""
-    request = 'https://maps.googleapis.com/maps/api/distancematrix/json?units=imperial'
-    origin_address_str = build_address_str(origin_addresses)
-    dest_address_str = build_address_str(dest_addresses)
-    request = request + '&origins=' + origin_address_str + '&destinations=' + \
-                       dest_address_str + '&key=' + API_key
-                       
-    with urllib.request.urlopen(request) as url:
-        jsonResult = url.read()
-        response = json.loads(jsonResult)
-        return response
-
-def build_distance_matrix(response):
-    distance_matrix = []
-    for row in response['rows']:
-        row_list = [row['elements'][j]['distance']['value'] for j in range(len(row['elements']))]
-        distance_matrix.append(row_list)
-    return distance_matrix
+    # Cells fetched on earlier runs are read from the local cache, so only origin/destination
+    # pairs that are not cached yet are requested from the API. Requests are tiled under the
+    # 100-element cap and sent concurrently over keep-alive connections.
+    fetcher = DistanceMatrixFetcher(data['API_key'], max_workers=8, rate_limit=50)
+    with DistanceCache(data['distance_cache']) as cache:
+        return distance_cache.create_distance_matrix(data['addresses'], cache, fetcher)
+
 
 def print_solution(data, manager, routing, solution):
     print(f'Objective: {solution.ObjectiveValue()}')
     max_route_distance = 0
     total_distance_traveled = 0
-    for vehicle_id in range(data['num_vehicles']):
-        index = routing.Start(vehicle_id)
-        plan_output = 'Route for vehicle {}:\n'.format(vehicle_id)
-        route_distance = 0
-        while not routing.IsEnd(index):
-            plan_output += ' {} -> '.format(manager.IndexToNode(index))
-            previous_index = index
-            index = solution.Value(routing.NextVar(index))
-            route_distance += routing.GetArcCostForVehicle(
-                previous_index, index, vehicle_id)
-        plan_output += '{}\n'.format(manager.IndexToNode(index))
+    for route in iter_routes(manager, routing, solution):
+        nodes = route['nodes'].tolist()
+        route_distance = int(route['distance'][-1])
+        plan_output = 'Route for vehicle {}:\n'.format(route['vehicle_id'])
+        plan_output += ''.join(' {} -> '.format(node) for node in nodes[:-1])
+        plan_output += '{}\n'.format(nodes[-1])
         plan_output += 'Distance of the route: {}m\n'.format(route_distance)
         print(plan_output)
         total_distance_traveled += route_distance
         max_route_distance = max(route_distance, max_route_distance)
-        
+
     print('Maximum of the route distances: {}m'.format(max_route_distance))
     print('Total distance traveled: {}m'.format(total_distance_traveled))
 
+
 # Define data model
 data = create_data()
 
@@ -142,15 +98,8 @@ manager = pywrapcp.RoutingIndexManager(
 # Define routing model
 routing = pywrapcp.RoutingModel(manager)
 
-# Create and register a transit callback
-def distance_callback(from_index, to_index):
-    # Returns the distance between the two nodes
-    # Convert from routing variable Index to distance matrix NodeIndex
-    from_node = manager.IndexToNode(from_index)
-    to_node = manager.IndexToNode(to_index)
-    return data['distance_matrix'][from_node][to_node]
-
-transit_callback_index = routing.RegisterTransitCallback(distance_callback)
+# Register the distance matrix with the solver; arc costs are looked up in C++
+transit_callback_index = register_transit_matrix(routing, manager, data['distance_matrix'])
 
 # Define cost of each arc
 routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
@@ -0,0 +1,105 @@
+# Re-planning the Distance Matrix VRP as addresses are added and removed during the day
+
+# Problem: Keep the routes of "VRP with Google Distance Matrix.py" up to date when stops are
+# added or cancelled, without rebuilding the whole distance matrix each time. Only the row
+# and column of each new address (2n - 1 cells) are requested.
+# Note: Runs against the local stand-in server so no API key is needed. Use the real
+# DISTANCE_MATRIX_URL and your API key to fetch real distances.
+
+from ortools.constraint_solver import routing_enums_pb2
+from ortools.constraint_solver import pywrapcp
+
+from distance_cache import DistanceCache
+from distance_cache import create_distance_block
+from distance_fetcher import DistanceMatrixFetcher
+from distance_matrix_server import DistanceMatrixServer
+from incremental_matrix import IncrementalDistanceMatrix
+from transit import register_transit_matrix
+
+
+def create_data():
+    data = {}
+    data['API_key'] = 'YOUR API KEY'
+    data['addresses'] = ['3610+Hacks+Cross+Rd+Memphis+TN',  # depot
+                         '1921+Elvis+Presley+Blvd+Memphis+TN',
+                         '149+Union+Avenue+Memphis+TN',
+                         '1034+Audubon+Drive+Memphis+TN',
+                         '1532+Madison+Ave+Memphis+TN',
+                         '706+Union+Ave+Memphis+TN',
+                         '3641+Central+Ave+Memphis+TN',
+                         '926+E+McLemore+Ave+Memphis+TN',
+                         '4339+Park+Ave+Memphis+TN',
+                         '600+Goodwyn+St+Memphis+TN',
+                         '2000+North+Pkwy+Memphis+TN',
+                         '262+Danny+Thomas+Pl+Memphis+TN',
+                         '125+N+Front+St+Memphis+TN',
+                         '5959+Park+Ave+Memphis+TN',
+                         '814+Scott+St+Memphis+TN',
+                         '1005+Tillman+St+Memphis+TN']
+    # Stops that come in and are cancelled later in the day
+    data['added_addresses'] = ['1000+Cooper+St+Memphis+TN',
+                               '2585+Summer+Ave+Memphis+TN']
+    data['removed_addresses'] = ['926+E+McLemore+Ave+Memphis+TN']
+    data['num_vehicles'] = 4
+    data['depot'] = 0
+    return data
+
+
+def solve(data, distance_matrix):
+    """Builds the routing model for the current locations and returns the objective."""
+    # The manager only needs the node count; node i is distance_matrix.locations[i]
+    manager = pywrapcp.RoutingIndexManager(
+        len(distance_matrix), data['num_vehicles'], data['depot'])
+    routing = pywrapcp.RoutingModel(manager)
+
+    transit_callback_index = register_transit_matrix(
+        routing, manager, distance_matrix.to_array())
+    routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
+
+    dimension_name = 'Distance'
+    routing.AddDimension(
+        transit_callback_index,
+        0,          # no slack
+        1000000,    # vehicle maximum travel distance
+        True,       # start cumul to zero
+        dimension_name)
+    routing.GetDimensionOrDie(dimension_name).SetGlobalSpanCostCoefficient(100)
+
+    search_parameters = pywrapcp.DefaultRoutingSearchParameters()
+    search_parameters.first_solution_strategy = (
+        routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC)
+    solution = routing.SolveWithParameters(search_parameters)
+    return solution.ObjectiveValue() if solution else None
+
+
+data = create_data()
+
+server = DistanceMatrixServer().start()
+fetcher = DistanceMatrixFetcher(data['API_key'], base_url=server.base_url)
+cache = DistanceCache()
+
+
+def distance_block(origins, destinations):
+    return create_distance_block(origins, destinations, cache, fetcher)
+
+
+# Morning plan: the full matrix is fetched once
+distance_matrix = IncrementalDistanceMatrix(distance_block, data['addresses'])
+print('Initial plan: {} stops, {} cells fetched, objective {}'.format(
+    len(distance_matrix), server.element_count, solve(data, distance_matrix)))
+
+# Intra-day changes: each new stop costs one row and one column
+for address in data['added_addresses']:
+    fetched = server.element_count
+    distance_matrix.add(address)
+    print('Added {}: {} cells fetched, objective {}'.format(
+        address, server.element_count - fetched, solve(data, distance_matrix)))
+
+for address in data['removed_addresses']:
+    fetched = server.element_count
+    distance_matrix.remove(address)
+    print('Removed {}: {} cells fetched, objective {}'.format(
+        address, server.element_count - fetched, solve(data, distance_matrix)))
+
+cache.close()
+server.stop()
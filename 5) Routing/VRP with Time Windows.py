@@ -5,6 +5,9 @@
 from ortools.constraint_solver import routing_enums_pb2
 from ortools.constraint_solver import pywrapcp
 
+from routes import iter_routes
+from transit import register_transit_matrix
+
 
 def create_data_model():
     """Stores the data for the problem."""
@@ -55,85 +58,73 @@ def create_data_model():
 def print_solution(data, manager, routing, solution):
     """Prints solution on console."""
     print(f'Objective: {solution.ObjectiveValue()}')
-    time_dimension = routing.GetDimensionOrDie('Time')
     total_time = 0
-    for vehicle_id in range(data['num_vehicles']):
-        index = routing.Start(vehicle_id)
-        plan_output = 'Route for vehicle {}:\n'.format(vehicle_id)
-        while not routing.IsEnd(index):
-            time_var = time_dimension.CumulVar(index)
-            plan_output += '{0} Time({1},{2}) -> '.format(
-                manager.IndexToNode(index), solution.Min(time_var),
-                solution.Max(time_var))
-            index = solution.Value(routing.NextVar(index))
-        time_var = time_dimension.CumulVar(index)
-        plan_output += '{0} Time({1},{2})\n'.format(manager.IndexToNode(index),
-                                                    solution.Min(time_var),
-                                                    solution.Max(time_var))
-        plan_output += 'Time of the route: {}min\n'.format(
-            solution.Min(time_var))
+    for route in iter_routes(manager, routing, solution, dimensions=['Time']):
+        nodes = route['nodes'].tolist()
+        time_min = route['cumuls']['Time']['min'].tolist()
+        time_max = route['cumuls']['Time']['max'].tolist()
+        plan_output = 'Route for vehicle {}:\n'.format(route['vehicle_id'])
+        plan_output += ''.join('{0} Time({1},{2}) -> '.format(*stop)
+                               for stop in zip(nodes[:-1], time_min, time_max))
+        plan_output += '{0} Time({1},{2})\n'.format(nodes[-1], time_min[-1], time_max[-1])
+        plan_output += 'Time of the route: {}min\n'.format(time_min[-1])
         print(plan_output)
-        total_time += solution.Min(time_var)
+        total_time += time_min[-1]
     print('Total time of all routes: {}min'.format(total_time))
 
 
+def create_routing_model(data):
+    """Builds the routing model with its time windows; returns (manager, routing)."""
+    # Define routing index manager
+    manager = pywrapcp.RoutingIndexManager(len(data['time_matrix']),
+                                           data['num_vehicles'],
+                                           data['depot'])
+
+    # Define routing model
+    routing = pywrapcp.RoutingModel(manager)
+
+    # Register the time matrix with the solver; arc costs are looked up in C++
+    transit_callback_index = register_transit_matrix(routing, manager, data['time_matrix'])
+
+    # Define cost of each arc
+    routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
+
+    # Add Time Windows constraint
+    time = 'Time'
+    routing.AddDimension(
+        transit_callback_index,
+        30,     # Maximum wait time per vehicle
+        30,     # Maximum time per vehicle
+        False,  # Don't force start cumul to zero.
+        time)
+
+    time_dimension = routing.GetDimensionOrDie(time)
+
+    # Add time window constraints for each location except depot
+    for location_idx, time_window in enumerate(data['time_windows']):
+        if location_idx == data['depot']:
+            continue
+        index = manager.NodeToIndex(location_idx)
+        time_dimension.CumulVar(index).SetRange(time_window[0], time_window[1])
+
+    # Add time window constraints for each vehicle start node
+    depot_idx = data['depot']
+    for vehicle_id in range(data['num_vehicles']):
+        index = routing.Start(vehicle_id)
+        time_dimension.CumulVar(index).SetRange(
+            data['time_windows'][depot_idx][0],
+            data['time_windows'][depot_idx][1])
+
+    # Instantiate route start and end times to produce feasible times
+    for i in range(data['num_vehicles']):
+        routing.AddVariableMinimizedByFinalizer(time_dimension.CumulVar(routing.Start(i)))
+        routing.AddVariableMinimizedByFinalizer(time_dimension.CumulVar(routing.End(i)))
+    return manager, routing
+
+
 data = create_data_model()
+manager, routing = create_routing_model(data)
 
-# Define routing index manager
-manager = pywrapcp.RoutingIndexManager(len(data['time_matrix']),
-                                       data['num_vehicles'],
-                                       data['depot'])
-
-# Define routing model
-routing = pywrapcp.RoutingModel(manager)
-
-# Create and register a transit callback
-
-
-def time_callback(from_index, to_index):
-    """Returns the travel time between the two nodes."""
-    # Convert from routing variable Index to time matrix NodeIndex.
-    from_node = manager.IndexToNode(from_index)
-    to_node = manager.IndexToNode(to_index)
-    return data['time_matrix'][from_node][to_node]
-
-
-transit_callback_index = routing.RegisterTransitCallback(time_callback)
-
-# Define cost of each arc
-routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
-
-# Add Time Windows constraint
-time = 'Time'
-routing.AddDimension(
-    transit_callback_index,
-    30,     # Maximum wait time per vehicle
-    30,     # Maximum time per vehicle
-    False,  # Don't force start cumul to zero.
-    time)
-
-time_dimension = routing.GetDimensionOrDie(time)
-
-# Add time window constraints for each location except depot
-for location_idx, time_window in enumerate(data['time_windows']):
-    if location_idx == data['depot']:
-        continue
-    index = manager.NodeToIndex(location_idx)
-    time_dimension.CumulVar(index).SetRange(time_window[0], time_window[1])
-
-# Add time window constraints for each vehicle start node
-depot_idx = data['depot']
-for vehicle_id in range(data['num_vehicles']):
-    index = routing.Start(vehicle_id)
-    time_dimension.CumulVar(index).SetRange(
-        data['time_windows'][depot_idx][0],
-        data['time_windows'][depot_idx][1])
-
-# Instantiate route start and end times to produce feasible times
-for i in range(data['num_vehicles']):
-    routing.AddVariableMinimizedByFinalizer(time_dimension.CumulVar(routing.Start(i)))
-    routing.AddVariableMinimizedByFinalizer(time_dimension.CumulVar(routing.End(i)))
-    
 # Setting first solution heuristic
 search_parameters = pywrapcp.DefaultRoutingSearchParameters()
 search_parameters.first_solution_strategy = (routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC)
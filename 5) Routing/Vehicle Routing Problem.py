@@ -6,6 +6,9 @@
 from ortools.constraint_solver import routing_enums_pb2
 from ortools.constraint_solver import pywrapcp
 
+from routes import iter_routes
+from transit import register_transit_matrix
+
 
 def create_data_model():
     """Stores the data for the problem."""
@@ -89,22 +92,17 @@ def print_solution(data, manager, routing, solution):
     print(f'Objective: {solution.ObjectiveValue()}')
     max_route_distance = 0
     total_distance_traveled = 0
-    for vehicle_id in range(data['num_vehicles']):
-        index = routing.Start(vehicle_id)
-        plan_output = 'Route for vehicle {}:\n'.format(vehicle_id)
-        route_distance = 0
-        while not routing.IsEnd(index):
-            plan_output += ' {} -> '.format(manager.IndexToNode(index))
-            previous_index = index
-            index = solution.Value(routing.NextVar(index))
-            route_distance += routing.GetArcCostForVehicle(
-                previous_index, index, vehicle_id)
-        plan_output += '{}\n'.format(manager.IndexToNode(index))
+    for route in iter_routes(manager, routing, solution):
+        nodes = route['nodes'].tolist()
+        route_distance = int(route['distance'][-1])
+        plan_output = 'Route for vehicle {}:\n'.format(route['vehicle_id'])
+        plan_output += ''.join(' {} -> '.format(node) for node in nodes[:-1])
+        plan_output += '{}\n'.format(nodes[-1])
         plan_output += 'Distance of the route: {}m\n'.format(route_distance)
         print(plan_output)
         total_distance_traveled += route_distance
         max_route_distance = max(route_distance, max_route_distance)
-        
+
     print('Maximum of the route distances: {}m'.format(max_route_distance))
     print('Total distance traveled: {}m'.format(total_distance_traveled))
 
@@ -119,16 +117,8 @@ manager = pywrapcp.RoutingIndexManager(
 # Define routing model
 routing = pywrapcp.RoutingModel(manager)
 
-# Create and register a transit callback
-def distance_callback(from_index, to_index):
-    # Returns the distance between the two nodes
-    # Convert from routing variable Index to distance matrix NodeIndex
-    from_node = manager.IndexToNode(from_index)
-    to_node = manager.IndexToNode(to_index)
-    return data['distance_matrix'][from_node][to_node]
-
-
-transit_callback_index = routing.RegisterTransitCallback(distance_callback)
+# Register the distance matrix with the solver; arc costs are looked up in C++
+transit_callback_index = register_transit_matrix(routing, manager, data['distance_matrix'])
 
 # Define cost of each arc
 routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
@@ -0,0 +1,127 @@
+# Benchmark: warm start from the previous day's routes vs cold start
+
+# Simulates day-to-day changes on the CVRP and VRPTW examples: yesterday's instance misses
+# a few of today's stops (new orders) and has a few that are gone today (cancellations).
+# Yesterday's solution is serialized with routes.write_routes_jsonl and read back, then
+# today's instance is solved cold (PATH_CHEAPEST_ARC) and warm (warm_start) with guided
+# local search. Reports the time to the first feasible solution and to the target
+# objective (the best one either run found); the warm clock includes the route repair.
+# Usage: python "Warm Start Benchmark.py" [seconds] [changes] [seed]
+
+import io
+import random
+import sys
+import time
+
+from ortools.constraint_solver import routing_enums_pb2
+from ortools.constraint_solver import pywrapcp
+
+from example_loader import load_functions
+from routes import iter_routes
+from routes import read_routes_jsonl
+from routes import write_routes_jsonl
+from warm_start import warm_start_assignment
+
+time_limit = float(sys.argv[1]) if len(sys.argv) > 1 else 2
+num_changes = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+
+problems = ['VRP with Constraints.py', 'VRP with Time Windows.py']
+
+
+def subset_data(data, keep):
+    """Returns a copy of a data model restricted to the nodes in keep (depot first)."""
+    num_nodes = len(data['time_matrix' if 'time_matrix' in data else 'distance_matrix'])
+    subset = dict(data)
+    for key, value in data.items():
+        if key.endswith('_matrix'):
+            subset[key] = [[value[i][j] for j in keep] for i in keep]
+        elif key in ('demands', 'time_windows') and len(value) == num_nodes:
+            subset[key] = [value[i] for i in keep]
+    return subset
+
+
+def search_parameters(seconds):
+    parameters = pywrapcp.DefaultRoutingSearchParameters()
+    parameters.first_solution_strategy = (
+        routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC)
+    parameters.local_search_metaheuristic = (
+        routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH)
+    parameters.time_limit.FromMilliseconds(int(seconds * 1000))
+    return parameters
+
+
+def solve(create_routing_model, data, previous_routes=None, node_map=None):
+    """Returns (trajectory, report): [(seconds, objective)] of every improving solution."""
+    start_time = time.perf_counter()
+    manager, routing = create_routing_model(data)
+    trajectory = []
+
+    def record_solution():
+        objective = routing.CostVar().Max()
+        if not trajectory or objective < trajectory[-1][1]:
+            trajectory.append((time.perf_counter() - start_time, objective))
+
+    routing.AddAtSolutionCallback(record_solution)
+    parameters = search_parameters(time_limit)
+    if previous_routes is None:
+        routing.SolveWithParameters(parameters)
+        return trajectory, None
+    assignment, report = warm_start_assignment(routing, manager, previous_routes,
+                                               parameters, node_map)
+    if assignment is None:
+        routing.SolveWithParameters(parameters)
+    else:
+        routing.SolveFromAssignmentWithParameters(assignment, parameters)
+    return trajectory, report
+
+
+def time_to(trajectory, target):
+    for seconds, objective in trajectory:
+        if objective <= target:
+            return '{:.4f}'.format(seconds)
+    return '-'
+
+
+rng = random.Random(seed)
+print('{} s per run, {} new and {} cancelled stops\n'.format(time_limit, num_changes,
+                                                              num_changes))
+print('{:26} {:6} {:>9} {:>9} {:>9} {:>10} {:>10}'.format(
+    'instance', 'start', 'first s', 'first', 'final', 'target', 'to target s'))
+for filename in problems:
+    create_data_model, create_routing_model = load_functions(
+        filename, 'create_data_model', 'create_routing_model')
+    full_data = create_data_model()
+    num_nodes = len(full_data['time_matrix' if 'time_matrix' in full_data
+                              else 'distance_matrix'])
+    stops = rng.sample(range(1, num_nodes), 2 * num_changes)
+    new_stops, cancelled_stops = stops[:num_changes], stops[num_changes:]
+    yesterday = [0] + [node for node in range(1, num_nodes) if node not in new_stops]
+    today = [0] + [node for node in range(1, num_nodes) if node not in cancelled_stops]
+
+    # Yesterday's plan, serialized as it would be at the end of the day
+    yesterday_data = subset_data(full_data, yesterday)
+    manager, routing = create_routing_model(yesterday_data)
+    solution = routing.SolveWithParameters(search_parameters(time_limit))
+    stored = io.StringIO()
+    write_routes_jsonl(iter_routes(manager, routing, solution), stored)
+    stored.seek(0)
+    previous_routes = list(read_routes_jsonl(stored))
+
+    # Node ids of the two days are matched through the full instance
+    today_node = {node: position for position, node in enumerate(today)}
+    node_map = {position: today_node.get(node) for position, node in enumerate(yesterday)}
+
+    today_data = subset_data(full_data, today)
+    cold, _ = solve(create_routing_model, today_data)
+    warm, report = solve(create_routing_model, today_data, previous_routes, node_map)
+    target = min(trajectory[-1][1] for trajectory in (cold, warm) if trajectory)
+    for start, trajectory in (('cold', cold), ('warm', warm)):
+        if not trajectory:
+            print('{:26} {:6} no solution'.format(filename[:-3], start))
+            continue
+        print('{:26} {:6} {:9.4f} {:9} {:9} {:10} {:>10}'.format(
+            filename[:-3], start, trajectory[0][0], trajectory[0][1], trajectory[-1][1],
+            target, time_to(trajectory, target)))
+    print('{:26} repair: dropped {}, inserted {}, unplaced {}\n'.format(
+        '', len(report['dropped']), len(report['inserted']), len(report['unplaced'])))
@@ -0,0 +1,110 @@
+# Persistent on-disk cache for Distance Matrix API results
+
+# Every cell is stored in a local SQLite file keyed by its content: (units, origin,
+# destination). Building a matrix looks up all cells first and only requests the missing
+# ones from the API, so re-planning a day with 5% new addresses costs roughly 5% of the
+# requests. Missing cells are grouped by origin rows that share the same missing
+# destinations (e.g. the new columns of every old address), tiled under the API limits and
+# fetched by a DistanceMatrixFetcher.
+
+import sqlite3
+
+from distance_matrix_api import MAX_ADDRESSES
+from distance_matrix_api import MAX_ELEMENTS
+from distance_matrix_api import tile_requests
+
+class DistanceCache:
+    """SQLite-backed map from (units, origin, destination) to distance in meters."""
+
+    def __init__(self, filename=':memory:'):
+        self.filename = filename
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS distances ('
+            ' units TEXT NOT NULL,'
+            ' origin TEXT NOT NULL,'
+            ' destination TEXT NOT NULL,'
+            ' distance INTEGER NOT NULL,'
+            ' PRIMARY KEY (units, origin, destination)) WITHOUT ROWID')
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM distances').fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+    def get_many(self, origins, destinations, units='imperial'):
+        """Returns {(origin, destination): distance} for the cached cells of origins x destinations."""
+        # The requested addresses go into temporary tables, so the join reads only the
+        # requested cells through the primary key, with no limit on bound parameters
+        for table, addresses in (('requested_origins', origins),
+                                 ('requested_destinations', destinations)):
+            self.connection.execute(
+                'CREATE TEMP TABLE IF NOT EXISTS {} (address TEXT PRIMARY KEY)'.format(table))
+            self.connection.execute('DELETE FROM temp.{}'.format(table))
+            self.connection.executemany(
+                'INSERT OR IGNORE INTO temp.{} VALUES (?)'.format(table),
+                ((address,) for address in addresses))
+        rows = self.connection.execute(
+            'SELECT d.origin, d.destination, d.distance'
+            # CROSS JOIN keeps this loop order: one primary key lookup per requested cell
+            ' FROM temp.requested_origins o CROSS JOIN temp.requested_destinations t'
+            ' CROSS JOIN distances d'
+            ' WHERE d.units = ? AND d.origin = o.address AND d.destination = t.address',
+            (units,))
+        return {(origin, destination): distance for origin, destination, distance in rows}
+
+    def put_many(self, cells, units='imperial'):
+        """Stores {(origin, destination): distance} cells."""
+        self.connection.executemany(
+            'INSERT OR REPLACE INTO distances VALUES (?, ?, ?, ?)',
+            ((units, origin, destination, int(distance))
+             for (origin, destination), distance in cells.items()))
+        self.connection.commit()
+
+
+def plan_missing_requests(origins, destinations, cached_cells, max_elements=MAX_ELEMENTS,
+                          max_addresses=MAX_ADDRESSES):
+    """Returns (origins, destinations) blocks that cover every uncached cell."""
+    origins = list(dict.fromkeys(origins))
+    destinations = list(dict.fromkeys(destinations))
+    # Group origins by the exact set of destinations they are missing. Uncached diagonal
+    # cells are requested too: skipping them would give every origin of a cold matrix a
+    # different missing set and break the rows up into one-origin requests.
+    groups = {}
+    for origin in origins:
+        missing = tuple(destination for destination in destinations
+                        if (origin, destination) not in cached_cells)
+        if missing:
+            groups.setdefault(missing, []).append(origin)
+
+    tiles = []
+    for missing, group in groups.items():
+        tiles += tile_requests(group, list(missing), max_elements, max_addresses)
+    return tiles
+
+
+def create_distance_block(origins, destinations, cache, fetcher):
+    """Returns the origins x destinations distances, fetching only cells missing from cache."""
+    cells = cache.get_many(origins, destinations, fetcher.units)
+    tiles = plan_missing_requests(origins, destinations, cells)
+    if tiles:
+        fetched = fetcher.fetch(tiles)
+        cache.put_many(fetched, fetcher.units)
+        cells.update(fetched)
+
+    return [[0 if origin == destination else cells[origin, destination]
+             for destination in destinations]
+            for origin in origins]
+
+
+def create_distance_matrix(addresses, cache, fetcher):
+    """Returns the distance matrix for addresses, fetching only cells missing from cache."""
+    return create_distance_block(addresses, addresses, cache, fetcher)
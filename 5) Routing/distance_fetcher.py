@@ -0,0 +1,166 @@
+# Concurrent, pooled fetching of Distance Matrix API blocks
+
+# send_request opens a fresh urllib connection per block and the blocks were requested
+# strictly one after another. DistanceMatrixFetcher sends the blocks from a thread pool
+# instead. Each worker thread keeps one HTTP/1.1 keep-alive connection open. A token
+# bucket caps the request rate, and failed requests are retried with exponential backoff.
+
+import concurrent.futures
+import http.client
+import json
+import random
+import threading
+import time
+import urllib.parse
+
+from distance_matrix_api import DISTANCE_MATRIX_URL
+from distance_matrix_api import build_distance_matrix
+from distance_matrix_api import build_request_url
+
+# Response statuses worth retrying; anything else is a permanent error
+RETRY_HTTP_STATUSES = {429, 500, 502, 503, 504}
+RETRY_API_STATUSES = {'OVER_QUERY_LIMIT', 'UNKNOWN_ERROR'}
+
+
+class RetryableError(Exception):
+    pass
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing rate calls per second, with bursts up to burst."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class DistanceMatrixFetcher:
+    """Requests (origins, destinations) blocks concurrently and returns their cells.
+
+    max_workers bounds the number of requests in flight, rate_limit (requests per second,
+    None for unlimited) bounds how fast they are sent, and each block is attempted up to
+    max_retries + 1 times with backoff * 2**attempt seconds (plus jitter) between attempts.
+    """
+
+    def __init__(self, API_key, units='imperial', base_url=DISTANCE_MATRIX_URL,
+                 max_workers=8, rate_limit=None, max_retries=4, backoff=0.5,
+                 timeout=30):
+        self.API_key = API_key
+        self.units = units
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(rate_limit, burst=max_workers) if rate_limit else None
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.request_count = 0
+        self.retry_count = 0
+        self.connection_count = 0
+        self.count_lock = threading.Lock()
+        self.local = threading.local()
+        self.connections = []
+
+    def fetch(self, tiles):
+        """Returns {(origin, destination): distance} for every cell of every block."""
+        cells = {}
+        try:
+            if self.max_workers <= 1:
+                for tile in tiles:
+                    cells.update(self.fetch_tile(tile))
+            else:
+                with concurrent.futures.ThreadPoolExecutor(self.max_workers) as executor:
+                    for tile_cells in executor.map(self.fetch_tile, tiles):
+                        cells.update(tile_cells)
+        finally:
+            self.close_connections()
+        return cells
+
+    def fetch_tile(self, tile):
+        origin_addresses, dest_addresses = tile
+        rows = build_distance_matrix(self.request_with_retries(origin_addresses,
+                                                               dest_addresses))
+        cells = {}
+        for origin, row in zip(origin_addresses, rows):
+            for destination, distance in zip(dest_addresses, row):
+                cells[origin, destination] = distance
+        return cells
+
+    def request_with_retries(self, origin_addresses, dest_addresses):
+        url = build_request_url(origin_addresses, dest_addresses, self.API_key,
+                                self.units, self.base_url)
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            try:
+                return self.request(url)
+            except (RetryableError, OSError, http.client.HTTPException):
+                # Drop the connection; it may be half-closed after the failure
+                self.close_connection()
+                if attempt == self.max_retries:
+                    raise
+                with self.count_lock:
+                    self.retry_count += 1
+                delay = self.backoff * 2 ** attempt
+                time.sleep(delay + random.uniform(0, delay))
+
+    def request(self, url):
+        parts = urllib.parse.urlsplit(url)
+        connection = self.connection(parts)
+        connection.request('GET', parts.path + '?' + parts.query)
+        response = connection.getresponse()
+        body = response.read()
+        with self.count_lock:
+            self.request_count += 1
+        if response.status in RETRY_HTTP_STATUSES:
+            raise RetryableError('HTTP {}'.format(response.status))
+        if response.status != 200:
+            raise ValueError('Distance Matrix request failed: HTTP {}'.format(
+                response.status))
+        result = json.loads(body)
+        if result.get('status') in RETRY_API_STATUSES:
+            raise RetryableError(result['status'])
+        return result
+
+    def connection(self, parts):
+        """Returns this thread's keep-alive connection, opening it if needed."""
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            if parts.scheme == 'https':
+                connection = http.client.HTTPSConnection(parts.netloc, timeout=self.timeout)
+            else:
+                connection = http.client.HTTPConnection(parts.netloc, timeout=self.timeout)
+            self.local.connection = connection
+            with self.count_lock:
+                self.connections.append(connection)
+                self.connection_count += 1
+        return connection
+
+    def close_connection(self):
+        """Closes this thread's connection so the next request opens a fresh one."""
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+    def close_connections(self):
+        """Closes the keep-alive connections opened by every thread."""
+        with self.count_lock:
+            connections, self.connections = self.connections, []
+        for connection in connections:
+            connection.close()
+        self.local = threading.local()
@@ -0,0 +1,79 @@
+# Shared distance-matrix builders for the routing examples
+
+# The matrix is one contiguous int64 NumPy array computed with broadcasting instead of a
+# dict-of-dicts filled by a nested Python loop. Distances are truncated to int, exactly
+# like the original int(math.hypot(dx, dy)). For boards with tens of thousands of holes
+# the chunked mode fills the matrix a block of rows at a time, optionally into a
+# memory-mapped .npy file so the full matrix never has to fit in RAM.
+
+import numpy as np
+
+# Rows per block in chunked mode: 1024 rows x 50k columns x 8 bytes is ~400MB of scratch
+DEFAULT_CHUNK_SIZE = 1024
+
+
+def as_locations_array(locations):
+    """Returns the locations as an (n, 2) float64 array."""
+    points = np.asarray(locations, dtype=np.float64)
+    if len(points) == 0:
+        return points.reshape(0, 2)
+    if points.ndim != 2 or points.shape[1] != 2:
+        raise ValueError('locations must be a sequence of (x, y) pairs')
+    return points
+
+
+def euclidean_distances(from_locations, to_locations):
+    """Returns the truncated distances from every from_location to every to_location."""
+    from_points = as_locations_array(from_locations)[:, np.newaxis, :]
+    to_points = as_locations_array(to_locations)[np.newaxis, :, :]
+    block = np.hypot(from_points[..., 0] - to_points[..., 0],
+                     from_points[..., 1] - to_points[..., 1])
+    # Casting to int64 truncates toward zero, same as int() on a non-negative float
+    return block.astype(np.int64)
+
+
+def euclidean_distance_block(points, start, stop):
+    """Returns the truncated distances from points[start:stop] to every point."""
+    return euclidean_distances(points[start:stop], points)
+
+
+def iter_euclidean_distance_chunks(locations, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yields (start_row, block) pairs that together cover the full distance matrix."""
+    points = as_locations_array(locations)
+    num_locations = len(points)
+    for start in range(0, num_locations, chunk_size):
+        stop = min(start + chunk_size, num_locations)
+        yield start, euclidean_distance_block(points, start, stop)
+
+
+def compute_euclidean_distance_matrix(locations, chunk_size=None, out=None):
+    """Returns an n x n int64 array where row[i] holds the distances from point[i].
+
+    With chunk_size set, rows are computed chunk_size at a time so the float64 scratch
+    space stays bounded. out may be any preallocated n x n int64 array, e.g. a memmap.
+    """
+    points = as_locations_array(locations)
+    num_locations = len(points)
+    if out is None:
+        out = np.empty((num_locations, num_locations), dtype=np.int64)
+    elif out.shape != (num_locations, num_locations):
+        raise ValueError('out must have shape ({0}, {0})'.format(num_locations))
+
+    if chunk_size is None:
+        out[:] = euclidean_distance_block(points, 0, num_locations)
+        return out
+
+    for start, block in iter_euclidean_distance_chunks(points, chunk_size):
+        out[start:start + len(block)] = block
+    return out
+
+
+def compute_euclidean_distance_memmap(locations, filename,
+                                      chunk_size=DEFAULT_CHUNK_SIZE):
+    """Writes the distance matrix to a .npy file chunk by chunk and returns it memory-mapped."""
+    num_locations = len(locations)
+    out = np.lib.format.open_memmap(filename, mode='w+', dtype=np.int64,
+                                    shape=(num_locations, num_locations))
+    compute_euclidean_distance_matrix(locations, chunk_size=chunk_size, out=out)
+    out.flush()
+    return out
@@ -0,0 +1,73 @@
+# Google Distance Matrix API requests for the routing examples
+
+# https://developers.google.com/maps/documentation/distance-matrix/overview
+# The base URL can be pointed at a local stand-in server (see distance_matrix_server.py)
+# so the request, caching and tiling code can be exercised without an API key.
+
+import json
+import urllib.parse
+import urllib.request
+
+DISTANCE_MATRIX_URL = 'https://maps.googleapis.com/maps/api/distancematrix/json'
+
+# The API accepts at most 100 elements (origins x destinations) per request, with at most
+# 25 origins and 25 destinations
+MAX_ELEMENTS = 100
+MAX_ADDRESSES = 25
+
+
+def build_address_str(addresses):
+    """Builds a pipe-separated string of addresses."""
+    # Addresses are already URL-encoded ('+' for spaces), so only unsafe characters are quoted
+    return '|'.join(urllib.parse.quote(address, safe="+,%:/'") for address in addresses)
+
+
+def build_request_url(origin_addresses, dest_addresses, API_key, units='imperial',
+                      base_url=DISTANCE_MATRIX_URL):
+    """Returns the request URL for the given origin and destination addresses."""
+    return (base_url + '?units=' + units +
+            '&origins=' + build_address_str(origin_addresses) +
+            '&destinations=' + build_address_str(dest_addresses) +
+            '&key=' + urllib.parse.quote(API_key, safe=''))
+
+
+def send_request(origin_addresses, dest_addresses, API_key, units='imperial',
+                 base_url=DISTANCE_MATRIX_URL):
+    """Builds and sends the request for the given origin and destination addresses."""
+    request = build_request_url(origin_addresses, dest_addresses, API_key, units,
+                                base_url)
+    with urllib.request.urlopen(request) as url:
+        return json.loads(url.read())
+
+
+def build_distance_matrix(response):
+    """Returns the distances (in meters) of a response as a list of rows."""
+    if response.get('status', 'OK') != 'OK':
+        raise ValueError('Distance Matrix request failed: {}'.format(
+            response.get('error_message', response['status'])))
+    distance_matrix = []
+    for row in response['rows']:
+        row_list = []
+        for element in row['elements']:
+            if element.get('status', 'OK') != 'OK':
+                raise ValueError('No distance available: {}'.format(element['status']))
+            row_list.append(element['distance']['value'])
+        distance_matrix.append(row_list)
+    return distance_matrix
+
+
+def tile_requests(origin_addresses, dest_addresses, max_elements=MAX_ELEMENTS,
+                  max_addresses=MAX_ADDRESSES):
+    """Splits origins x destinations into (origins, destinations) blocks within the limits.
+
+    Blocks are tiled in both dimensions, so wide matrices are no longer limited to
+    max_elements // num_addresses rows per request.
+    """
+    num_cols = min(len(dest_addresses), max_addresses, max_elements)
+    num_rows = min(max_addresses, max(1, max_elements // max(num_cols, 1)))
+    tiles = []
+    for row in range(0, len(origin_addresses), num_rows):
+        for col in range(0, len(dest_addresses), num_cols):
+            tiles.append((origin_addresses[row:row + num_rows],
+                          dest_addresses[col:col + num_cols]))
+    return tiles
@@ -0,0 +1,105 @@
+# Local stand-in for the Google Distance Matrix API
+
+# Serves the same JSON shape as the real API with deterministic fake distances, so the
+# request, caching and tiling code can be run without an API key or network access.
+# Every request and element served is counted, which is what the caching and fetching
+# benchmarks measure.
+
+import http.server
+import json
+import threading
+import time
+import urllib.parse
+import zlib
+
+
+def fake_location(address):
+    """Maps an address to a deterministic (x, y) position in meters."""
+    checksum = zlib.crc32(address.encode('utf-8'))
+    return checksum % 20000, (checksum // 20000) % 20000
+
+
+def fake_distance(origin, destination):
+    """Returns a deterministic Manhattan distance between two addresses."""
+    if origin == destination:
+        return 0
+    (x1, y1), (x2, y2) = fake_location(origin), fake_location(destination)
+    return abs(x1 - x2) + abs(y1 - y2)
+
+
+class DistanceMatrixHandler(http.server.BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep the connection alive between requests. Headers and body
+    # are separate writes, so Nagle's algorithm would stall every keep-alive response.
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        query = urllib.parse.urlsplit(self.path).query
+        # parse_qs would turn '+' into spaces; keep addresses as the client encoded them
+        params = dict(param.split('=', 1) for param in query.split('&') if '=' in param)
+        origins = [urllib.parse.unquote(address)
+                   for address in params.get('origins', '').split('|')]
+        destinations = [urllib.parse.unquote(address)
+                        for address in params.get('destinations', '').split('|')]
+
+        if server.latency:
+            time.sleep(server.latency)
+        with server.lock:
+            server.request_count += 1
+            server.element_count += len(origins) * len(destinations)
+            fail = server.fail_every and server.request_count % server.fail_every == 0
+
+        if fail:
+            self.send_response(503)
+            body = b'{"status": "UNKNOWN_ERROR"}'
+        elif len(origins) * len(destinations) > server.max_elements:
+            self.send_response(200)
+            body = json.dumps({'status': 'MAX_ELEMENTS_EXCEEDED', 'rows': []}).encode()
+        else:
+            self.send_response(200)
+            body = json.dumps({
+                'status': 'OK',
+                'origin_addresses': origins,
+                'destination_addresses': destinations,
+                'rows': [{'elements': [{'status': 'OK',
+                                        'distance': {'value': fake_distance(o, d)}}
+                                       for d in destinations]}
+                         for o in origins],
+            }).encode()
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class DistanceMatrixServer(http.server.ThreadingHTTPServer):
+    """Threaded stand-in server; latency (seconds) is added to every request."""
+
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, fail_every=0, max_elements=100, port=0):
+        super().__init__(('127.0.0.1', port), DistanceMatrixHandler)
+        self.latency = latency
+        # Answer every fail_every-th request with HTTP 503 (0 disables failures)
+        self.fail_every = fail_every
+        self.max_elements = max_elements
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.element_count = 0
+
+    @property
+    def base_url(self):
+        return 'http://{}:{}/maps/api/distancematrix/json'.format(*self.server_address)
+
+    def start(self):
+        """Serves requests on a background thread and returns self."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,34 @@
+# Loads functions from the example scripts without running them
+
+# The example scripts build and solve their model at module level, so importing one
+# would run the whole example. This pulls out only the imports and the requested
+# top-level function definitions and executes those.
+
+import ast
+import os
+
+EXAMPLES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_functions(filename, *names):
+    """Returns the named top-level functions of an example script, in order."""
+    path = filename if os.path.isabs(filename) else os.path.join(EXAMPLES_DIR, filename)
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    body = []
+    found = set()
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            body.append(node)
+        elif isinstance(node, ast.FunctionDef) and node.name in names:
+            body.append(node)
+            found.add(node.name)
+    missing = [name for name in names if name not in found]
+    if missing:
+        raise LookupError('{} does not define {}'.format(filename, ', '.join(missing)))
+
+    namespace = {'__name__': os.path.splitext(os.path.basename(path))[0],
+                 '__file__': path}
+    exec(compile(ast.Module(body=body, type_ignores=[]), path, 'exec'), namespace)
+    return tuple(namespace[name] for name in names)
@@ -0,0 +1,126 @@
+# Incremental distance matrix for intra-day re-planning
+
+# Adding one address used to mean rebuilding (and re-fetching) the whole n x n matrix.
+# IncrementalDistanceMatrix keeps the distances in a preallocated array and, when a
+# location is added, computes only its new row and column: 2n - 1 cells. The stored
+# matrix stays compact, node i in row and column i, so the routing model of the current
+# locations is registered from a view of the array without gathering a copy. Removing a
+# location moves the last node into its row and column (O(n)), so the nodes after it may
+# be renumbered; node() follows them. Node 0, the first location, is the depot (the
+# examples' data['depot'] = 0) and cannot be removed.
+
+import numpy as np
+
+
+class IncrementalDistanceMatrix:
+    """Distance matrix over a changing set of locations.
+
+    distance_block(origins, destinations) must return the origins x destinations
+    distances as a 2-D array or list of rows, e.g. distance_matrix.euclidean_distances
+    for (x, y) locations, or a wrapper around distance_cache.create_distance_block for
+    addresses. Locations must be hashable and unique.
+    """
+
+    def __init__(self, distance_block, locations=(), capacity=16):
+        self.distance_block = distance_block
+        self.distances = np.zeros((capacity, capacity), dtype=np.int64)
+        # locations[node] is stored in row and column node; node_of inverts locations
+        self.locations = []
+        self.node_of = {}
+        self.cells_computed = 0
+        if locations:
+            self.add_many(locations)
+
+    def __len__(self):
+        return len(self.locations)
+
+    def __contains__(self, location):
+        return location in self.node_of
+
+    @property
+    def capacity(self):
+        return len(self.distances)
+
+    def node(self, location):
+        """Returns the routing NodeIndex of a location."""
+        return self.node_of[location]
+
+    def add(self, location):
+        """Adds one location, computing its row and column (2n - 1 cells)."""
+        self.add_many([location])
+
+    def add_many(self, new_locations):
+        """Adds locations, computing only the rows and columns that involve them."""
+        new_locations = [location for location in dict.fromkeys(new_locations)
+                         if location not in self.node_of]
+        if not new_locations:
+            return
+        old_locations = self.locations
+        num_old, num_all = len(old_locations), len(old_locations) + len(new_locations)
+        self.reserve(num_all)
+        all_locations = old_locations + new_locations
+
+        # New rows against every location (new ones included), then the new columns of
+        # the old rows: k * (n + k) + n * k cells, i.e. 2n - 1 for a single location
+        rows = np.asarray(self.distance_block(new_locations, all_locations), dtype=np.int64)
+        self.distances[num_old:num_all, :num_all] = rows
+        self.cells_computed += rows.size
+        if old_locations:
+            columns = np.asarray(self.distance_block(old_locations, new_locations),
+                                 dtype=np.int64)
+            self.distances[:num_old, num_old:num_all] = columns
+            self.cells_computed += columns.size
+
+        self.locations = all_locations
+        for node, location in enumerate(new_locations, num_old):
+            self.node_of[location] = node
+
+    def remove(self, location):
+        """Removes a location; the last node takes over its NodeIndex."""
+        self.remove_many([location])
+
+    def remove_many(self, locations):
+        removed = set(locations)
+        missing = [location for location in removed if location not in self.node_of]
+        if missing:
+            raise KeyError(missing[0])
+        if self.locations[0] in removed:
+            raise ValueError('the depot (node 0) cannot be removed')
+        num_kept = len(self.locations) - len(removed)
+        # Nodes past the kept range that stay move into the holes the removed ones leave
+        holes = sorted(self.node_of[location] for location in removed
+                       if self.node_of[location] < num_kept)
+        movers = [node for node in range(num_kept, len(self.locations))
+                  if self.locations[node] not in removed]
+        size = len(self.locations)
+        self.distances[holes, :size] = self.distances[movers, :size]
+        self.distances[:size, holes] = self.distances[:size, movers]
+        for location in removed:
+            del self.node_of[location]
+        for hole, mover in zip(holes, movers):
+            self.locations[hole] = self.locations[mover]
+            self.node_of[self.locations[hole]] = hole
+        del self.locations[num_kept:]
+
+    def reserve(self, size):
+        """Grows the array (doubling) so it can hold at least size locations."""
+        capacity = self.capacity
+        if size <= capacity:
+            return
+        new_capacity = max(size, 2 * capacity)
+        distances = np.zeros((new_capacity, new_capacity), dtype=np.int64)
+        num_nodes = len(self.locations)
+        distances[:num_nodes, :num_nodes] = self.distances[:num_nodes, :num_nodes]
+        self.distances = distances
+
+    def distance(self, from_node, to_node):
+        """Returns the distance between two routing NodeIndexes."""
+        return int(self.distances[from_node, to_node])
+
+    def to_array(self):
+        """Returns the current n x n matrix in NodeIndex order.
+
+        The result is a view of the stored array, valid until the next change.
+        """
+        num_nodes = len(self.locations)
+        return self.distances[:num_nodes, :num_nodes]
@@ -0,0 +1,163 @@
+# Sparse k-nearest-neighbour arc filtering for large TSP / drilling instances
+
+# The drilling examples hand the solver a complete graph, so first solution heuristics like
+# PATH_CHEAPEST_ARC and every local search neighbourhood scan O(n^2) arcs. Good tours on
+# geometric instances almost only use arcs between near neighbours, so the solver can be
+# restricted to a k-nearest-neighbour candidate graph. The candidate lists are built with a
+# uniform grid (about k points per cell), which is exact and needs no extra dependency.
+# The recommended use is soft: seed the search with nearest_neighbor_tour and limit the
+# local search operators to the candidates with set_neighbor_search_parameters. Forbidding
+# far arcs outright (restrict_to_neighbors) also blocks intermediate moves and gave clearly
+# worse tours under guided local search; penalize_far_arcs is the in-between option.
+
+import math
+
+import numpy as np
+
+from distance_matrix import as_locations_array
+
+
+def k_nearest_neighbors(locations, k):
+    """Returns an (n, k) int64 array: row i holds the k points nearest to point i, nearest first."""
+    points = as_locations_array(locations)
+    num_points = len(points)
+    k = min(k, num_points - 1)
+    if k <= 0:
+        return np.zeros((num_points, 0), dtype=np.int64)
+
+    # Grid with about k points per cell
+    lower = points.min(axis=0)
+    span = np.maximum(points.max(axis=0) - lower, 1e-9)
+    # (the second term keeps cells from collapsing when the points are nearly collinear)
+    cell_size = max(math.sqrt(span[0] * span[1] * k / num_points),
+                    float(span.max()) * k / num_points)
+    cells = np.floor((points - lower) / cell_size).astype(np.int64)
+    grid_width, grid_height = cells.max(axis=0) + 1
+    cell_ids = cells[:, 0] * grid_height + cells[:, 1]
+    order = np.argsort(cell_ids, kind='stable')
+    occupied, starts, counts = np.unique(cell_ids[order], return_index=True,
+                                         return_counts=True)
+    cell_points = {cell_id: order[start:start + count]
+                   for cell_id, start, count in zip(occupied.tolist(), starts.tolist(),
+                                                    counts.tolist())}
+
+    neighbors = np.empty((num_points, k), dtype=np.int64)
+    for cell_id, members in cell_points.items():
+        cell_x, cell_y = divmod(cell_id, grid_height)
+        radius = 1
+        while True:
+            # Points in the (2r + 1) x (2r + 1) block of cells around this one
+            candidates = [cell_points[x * grid_height + y]
+                          for x in range(max(cell_x - radius, 0),
+                                         min(cell_x + radius + 1, grid_width))
+                          for y in range(max(cell_y - radius, 0),
+                                         min(cell_y + radius + 1, grid_height))
+                          if x * grid_height + y in cell_points]
+            candidates = np.concatenate(candidates)
+            covers_grid = (cell_x - radius <= 0 and cell_y - radius <= 0 and
+                           cell_x + radius >= grid_width - 1 and
+                           cell_y + radius >= grid_height - 1)
+            if len(candidates) > k:
+                deltas = points[members, np.newaxis, :] - points[np.newaxis, candidates, :]
+                squared = np.einsum('ijk,ijk->ij', deltas, deltas)
+                squared[members[:, np.newaxis] == candidates[np.newaxis, :]] = np.inf
+                nearest = np.argpartition(squared, k - 1, axis=1)[:, :k]
+                nearest_squared = np.take_along_axis(squared, nearest, axis=1)
+                # Every point outside the block is at least radius cells away, so the
+                # candidates are exact once the k-th distance is within that radius
+                if covers_grid or nearest_squared.max() <= (radius * cell_size) ** 2:
+                    ranked = np.argsort(nearest_squared, axis=1, kind='stable')
+                    neighbors[members] = candidates[np.take_along_axis(nearest, ranked,
+                                                                       axis=1)]
+                    break
+            radius += 1
+    return neighbors
+
+
+def neighbor_sets(neighbors):
+    """Returns symmetric candidate sets: j is a candidate of i if either is among the other's k nearest."""
+    candidates = [set(row) for row in neighbors.tolist()]
+    for node, row in enumerate(neighbors.tolist()):
+        for neighbor in row:
+            candidates[neighbor].add(node)
+    return candidates
+
+
+def nearest_neighbor_tour(locations, neighbors, depot=0):
+    """Returns a nearest-neighbour tour (depot excluded) that walks the candidate graph.
+
+    PATH_CHEAPEST_ARC dead-ends on a sparse candidate graph once every candidate of the
+    current node is visited; here the walk then jumps to the nearest unvisited point.
+    Use it as the initial route for SolveFromAssignmentWithParameters.
+    """
+    points = as_locations_array(locations)
+    visited = [False] * len(points)
+    visited[depot] = True
+    candidates = neighbors.tolist()
+    tour = []
+    current = depot
+    for _ in range(len(points) - 1):
+        following = next((node for node in candidates[current] if not visited[node]), None)
+        if following is None:
+            unvisited = np.flatnonzero(~np.array(visited))
+            deltas = points[unvisited] - points[current]
+            following = int(unvisited[np.argmin(np.einsum('ij,ij->i', deltas, deltas))])
+        visited[following] = True
+        tour.append(following)
+        current = following
+    return tour
+
+
+def restrict_to_neighbors(routing, manager, neighbors, routes=()):
+    """Forbids every arc that is not in the (symmetric) k-nearest-neighbour candidate graph.
+
+    Returning to the depot (any route end) stays allowed from every node, so the candidate
+    graph only restricts the order of the visits, not where routes may finish. The arcs of
+    routes (lists of nodes, depot excluded) are allowed too, so an initial solution such as
+    nearest_neighbor_tour stays feasible. Greedy path construction (PATH_CHEAPEST_ARC) can
+    dead-end on the restricted graph, so seed the search with such a route.
+    """
+    candidates = neighbor_sets(neighbors)
+    num_vehicles = manager.GetNumberOfVehicles()
+    for vehicle, route in enumerate(routes):
+        route = [manager.IndexToNode(routing.Start(vehicle))] + list(route)
+        for from_node, to_node in zip(route, route[1:]):
+            candidates[from_node].add(to_node)
+            candidates[to_node].add(from_node)
+
+    end_indices = [routing.End(vehicle) for vehicle in range(num_vehicles)]
+    depot_nodes = {manager.IndexToNode(index)
+                   for vehicle in range(num_vehicles)
+                   for index in (routing.Start(vehicle), routing.End(vehicle))}
+    for index in range(routing.Size()):
+        node = manager.IndexToNode(index)
+        allowed = [manager.NodeToIndex(neighbor) for neighbor in candidates[node]
+                   if neighbor not in depot_nodes]
+        # The index itself keeps optional nodes able to be inactive
+        routing.NextVar(index).SetValues(allowed + end_indices + [index])
+
+
+def penalize_far_arcs(distance_matrix, neighbors, far_cost, depot=0):
+    """Returns a copy of a dense matrix where every non-candidate arc costs far_cost.
+
+    The soft alternative to restrict_to_neighbors: far arcs stay usable, so the model can
+    never become infeasible, but the search steers away from them. Arcs back to the depot
+    keep their real cost.
+    """
+    distance_matrix = np.asarray(distance_matrix)
+    penalized = np.full(distance_matrix.shape, far_cost, dtype=np.int64)
+    for node, candidates in enumerate(neighbor_sets(neighbors)):
+        allowed = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        penalized[node, allowed] = distance_matrix[node, allowed]
+    penalized[:, depot] = distance_matrix[:, depot]
+    np.fill_diagonal(penalized, 0)
+    return penalized
+
+
+def set_neighbor_search_parameters(search_parameters, neighbors):
+    """Limits neighbour-based local search operators to the k nearest candidates."""
+    num_points, k = neighbors.shape
+    # Only available in newer OR-Tools releases
+    if hasattr(search_parameters, 'ls_operator_neighbors_ratio') and num_points:
+        search_parameters.ls_operator_neighbors_ratio = min(1.0, k / num_points)
+        search_parameters.ls_operator_min_neighbors = k
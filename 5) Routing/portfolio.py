@@ -0,0 +1,149 @@
+# Portfolio solve: many search configurations in parallel under one wall-clock budget
+
+# Which first solution strategy and metaheuristic work best depends on the instance, and a
+# single SolveWithParameters call only tries one. solve_portfolio runs every combination of
+# strategy x metaheuristic x seed in worker processes (routing models are not thread-safe
+# and hold the GIL in their Python callbacks) and returns the best solution together with
+# the configuration that found it. Every configuration gets a process of its own: in a
+# shared ProcessPoolExecutor one worker that dies breaks the pool and fails every pending
+# configuration. Workers rebuild the model from the example script through
+# example_loader, so only the script name and the configuration cross process boundaries.
+# RoutingSearchParameters has no random seed: a non-zero seed perturbs the guided local
+# search penalty factor instead, which is the only randomizable knob that changes the
+# trajectory. Seeds therefore only multiply the GUIDED_LOCAL_SEARCH configurations.
+
+import collections
+import concurrent.futures
+import math
+import os
+import random
+import time
+
+from ortools.constraint_solver import routing_enums_pb2
+from ortools.constraint_solver import pywrapcp
+
+from example_loader import load_functions
+from routes import iter_routes
+from routes import route_to_json
+
+DEFAULT_STRATEGIES = ('PATH_CHEAPEST_ARC', 'SAVINGS', 'PARALLEL_CHEAPEST_INSERTION',
+                      'CHRISTOFIDES')
+DEFAULT_METAHEURISTICS = ('GUIDED_LOCAL_SEARCH', 'SIMULATED_ANNEALING', 'TABU_SEARCH')
+
+# Model builders already loaded in this (worker) process, by script name
+_model_functions = {}
+
+
+def portfolio_configs(strategies=DEFAULT_STRATEGIES, metaheuristics=DEFAULT_METAHEURISTICS,
+                      seeds=(0,)):
+    """Returns the configurations to try, as dicts of enum names and a seed."""
+    seeds = list(seeds)
+    configs = []
+    for strategy in strategies:
+        for metaheuristic in metaheuristics:
+            # Other metaheuristics ignore the seed: one run is enough
+            for seed in seeds if metaheuristic == 'GUIDED_LOCAL_SEARCH' else seeds[:1]:
+                configs.append({'first_solution_strategy': strategy,
+                                'local_search_metaheuristic': metaheuristic,
+                                'seed': seed})
+    return configs
+
+
+def config_name(config):
+    """Returns a short label such as 'SAVINGS + TABU_SEARCH #1'."""
+    return '{} + {} #{}'.format(config['first_solution_strategy'],
+                                config['local_search_metaheuristic'], config['seed'])
+
+
+def create_search_parameters(config, time_limit):
+    """Returns the search parameters of a configuration with the given time limit in seconds."""
+    search_parameters = pywrapcp.DefaultRoutingSearchParameters()
+    search_parameters.first_solution_strategy = getattr(
+        routing_enums_pb2.FirstSolutionStrategy, config['first_solution_strategy'])
+    search_parameters.local_search_metaheuristic = getattr(
+        routing_enums_pb2.LocalSearchMetaheuristic, config['local_search_metaheuristic'])
+    if config['seed']:
+        rng = random.Random(config['seed'])
+        search_parameters.guided_local_search_lambda_coefficient = rng.uniform(0.02, 0.5)
+    search_parameters.time_limit.FromMilliseconds(max(1, int(time_limit * 1000)))
+    return search_parameters
+
+
+def solve_config(filename, config, time_limit, deadline, dimensions=()):
+    """Builds the model of an example script and solves it with one configuration.
+
+    Runs in a worker process. The solve gets time_limit seconds but never runs past
+    deadline (a time.time() value shared by the whole portfolio). Returns a picklable dict
+    with the configuration, 'objective' (None when no solution was found), 'seconds' and
+    the JSON route records.
+    """
+    if filename not in _model_functions:
+        _model_functions[filename] = load_functions(filename, 'create_data_model',
+                                                    'create_routing_model')
+    create_data_model, create_routing_model = _model_functions[filename]
+
+    start_time = time.perf_counter()
+    result = {'config': config, 'objective': None, 'routes': [], 'pid': os.getpid()}
+    data = create_data_model()
+    manager, routing = create_routing_model(data)
+    time_limit = min(time_limit, deadline - time.time())
+    if time_limit <= 0:
+        result.update(status='skipped', seconds=0.0)
+        return result
+
+    solution = routing.SolveWithParameters(create_search_parameters(config, time_limit))
+    result['seconds'] = time.perf_counter() - start_time
+    result['status'] = 'solved' if solution else 'no solution'
+    if solution:
+        result['objective'] = solution.ObjectiveValue()
+        result['routes'] = [route_to_json(route) for route in
+                            iter_routes(manager, routing, solution, dimensions)]
+    return result
+
+
+def solve_portfolio(filename, configs, budget, max_workers=None, dimensions=()):
+    """Solves an example script with every configuration within budget seconds.
+
+    The configurations run max_workers at a time (default: one per CPU), each in its own
+    process, so each gets an equal share budget / waves of the wall clock. A configuration
+    whose worker raises or dies is recorded with status 'failed' and does not stop the
+    others. Returns (best, results): best is the
+    result with the lowest objective (ties go to the earlier configuration) or None, and
+    results lists every configuration in order.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    waves = math.ceil(len(configs) / max_workers)
+    time_limit = budget / max(waves, 1)
+    deadline = time.time() + budget
+
+    results = [None] * len(configs)
+    waiting = collections.deque(enumerate(configs))
+    # Future of every running configuration -> (position, its single-process executor)
+    running = {}
+    try:
+        while waiting or running:
+            while waiting and len(running) < max_workers:
+                position, config = waiting.popleft()
+                executor = concurrent.futures.ProcessPoolExecutor(1)
+                future = executor.submit(solve_config, filename, config, time_limit,
+                                         deadline, tuple(dimensions))
+                running[future] = position, executor
+            done, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                position, executor = running.pop(future)
+                executor.shutdown()
+                try:
+                    results[position] = future.result()
+                except Exception as error:
+                    # Including BrokenProcessPool when the worker died
+                    results[position] = {'config': configs[position], 'objective': None,
+                                         'routes': [], 'status': 'failed', 'seconds': 0.0,
+                                         'error': repr(error)}
+    finally:
+        for _, executor in running.values():
+            executor.shutdown(cancel_futures=True)
+
+    solved = [result for result in results if result['objective'] is not None]
+    best = min(solved, key=lambda result: result['objective']) if solved else None
+    return best, results
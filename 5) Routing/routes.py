@@ -0,0 +1,93 @@
+# Route extraction for the routing examples
+
+# Walks a solution once per vehicle and returns compact arrays instead of building output
+# strings: the visited node ids, the cumulative arc cost (distance) at each stop and, for
+# every requested dimension (e.g. 'Capacity' or 'Time'), the min/max of its cumul variable
+# at each stop. iter_routes is a generator, so very large fleets can be streamed to disk
+# (see write_routes_jsonl) without holding every route in memory. The print_solution
+# functions of the examples are thin formatters over these records.
+
+import json
+
+import numpy as np
+
+
+def iter_routes(manager, routing, solution, dimensions=(), skip_empty=False):
+    """Yields one route record per vehicle.
+
+    A record is a dict with 'vehicle_id', 'nodes' (start and end included), 'distance'
+    (cumulative arc cost at each stop, starting at 0) and 'cumuls', which maps each
+    dimension name to {'min': array, 'max': array} over the same stops.
+    """
+    dimensions = [(name, routing.GetDimensionOrDie(name)) for name in dimensions]
+    for vehicle_id in range(manager.GetNumberOfVehicles()):
+        index = routing.Start(vehicle_id)
+        indices = [index]
+        arc_costs = [0]
+        while not routing.IsEnd(index):
+            next_index = solution.Value(routing.NextVar(index))
+            arc_costs.append(routing.GetArcCostForVehicle(index, next_index, vehicle_id))
+            indices.append(next_index)
+            index = next_index
+        if skip_empty and len(indices) == 2:
+            continue
+
+        cumuls = {}
+        for name, dimension in dimensions:
+            cumul_vars = [dimension.CumulVar(index) for index in indices]
+            cumuls[name] = {
+                'min': np.array([solution.Min(var) for var in cumul_vars], dtype=np.int64),
+                'max': np.array([solution.Max(var) for var in cumul_vars], dtype=np.int64),
+            }
+        yield {
+            'vehicle_id': vehicle_id,
+            'nodes': np.array([manager.IndexToNode(index) for index in indices],
+                              dtype=np.int64),
+            'distance': np.cumsum(np.array(arc_costs, dtype=np.int64)),
+            'cumuls': cumuls,
+        }
+
+
+def extract_routes(manager, routing, solution, dimensions=(), skip_empty=False):
+    """Returns the route records of every vehicle as a list."""
+    return list(iter_routes(manager, routing, solution, dimensions, skip_empty))
+
+
+def route_to_json(route):
+    """Returns a route record with its arrays converted to lists."""
+    return {
+        'vehicle_id': route['vehicle_id'],
+        'nodes': route['nodes'].tolist(),
+        'distance': route['distance'].tolist(),
+        'cumuls': {name: {bound: values.tolist() for bound, values in cumul.items()}
+                   for name, cumul in route['cumuls'].items()},
+    }
+
+
+def route_from_json(record):
+    """Returns the route record for a dict produced by route_to_json."""
+    return {
+        'vehicle_id': record['vehicle_id'],
+        'nodes': np.array(record['nodes'], dtype=np.int64),
+        'distance': np.array(record['distance'], dtype=np.int64),
+        'cumuls': {name: {bound: np.array(values, dtype=np.int64)
+                          for bound, values in cumul.items()}
+                   for name, cumul in record.get('cumuls', {}).items()},
+    }
+
+
+def write_routes_jsonl(routes, file):
+    """Writes route records (any iterable, e.g. iter_routes) as JSON lines; returns the count."""
+    count = 0
+    for route in routes:
+        file.write(json.dumps(route_to_json(route), separators=(',', ':')))
+        file.write('\n')
+        count += 1
+    return count
+
+
+def read_routes_jsonl(file):
+    """Yields the route records of a JSON-lines file written by write_routes_jsonl."""
+    for line in file:
+        if line.strip():
+            yield route_from_json(json.loads(line))
@@ -0,0 +1,81 @@
+# Shared transit registration for the routing examples
+
+# The examples used to register a Python distance_callback that calls manager.IndexToNode
+# twice and indexes a nested list, and the C++ solver calls it millions of times during
+# local search. These helpers hand the whole matrix (or vector) to the solver instead, so
+# arc costs are looked up in C++ and no Python code runs on the hot path.
+
+import math
+
+import numpy as np
+
+
+def as_int_rows(matrix):
+    """Returns a dense matrix (nested lists or NumPy array) as a list of int rows."""
+    return np.asarray(matrix, dtype=np.int64).tolist()
+
+
+def as_int_values(values):
+    """Returns a vector (list or NumPy array) as a list of ints."""
+    return np.asarray(values, dtype=np.int64).tolist()
+
+
+def index_to_node_array(manager):
+    """Returns a list mapping every routing variable Index to its NodeIndex."""
+    return [manager.IndexToNode(index)
+            for index in range(manager.GetNumberOfIndices())]
+
+
+def register_transit_matrix(routing, manager, matrix):
+    """Registers a node-indexed matrix and returns the transit callback index."""
+    rows = as_int_rows(matrix)
+    if len(rows) != manager.GetNumberOfNodes():
+        raise ValueError('matrix has {} rows but the manager has {} nodes'.format(
+            len(rows), manager.GetNumberOfNodes()))
+    if hasattr(routing, 'RegisterTransitMatrix'):
+        return routing.RegisterTransitMatrix(rows)
+
+    # Older OR-Tools releases have no matrix registration: fall back to a callback that
+    # does two list lookups, with the Index -> NodeIndex mapping computed once up front.
+    index_to_node = index_to_node_array(manager)
+
+    def transit_callback(from_index, to_index):
+        return rows[index_to_node[from_index]][index_to_node[to_index]]
+
+    return routing.RegisterTransitCallback(transit_callback)
+
+
+def register_unary_transit_vector(routing, manager, values):
+    """Registers a node-indexed vector (e.g. demands) and returns the callback index."""
+    values = as_int_values(values)
+    if len(values) != manager.GetNumberOfNodes():
+        raise ValueError('vector has {} values but the manager has {} nodes'.format(
+            len(values), manager.GetNumberOfNodes()))
+    if hasattr(routing, 'RegisterUnaryTransitVector'):
+        return routing.RegisterUnaryTransitVector(values)
+
+    index_to_node = index_to_node_array(manager)
+
+    def unary_transit_callback(from_index):
+        return values[index_to_node[from_index]]
+
+    return routing.RegisterUnaryTransitCallback(unary_transit_callback)
+
+
+def register_euclidean_callback(routing, manager, locations):
+    """Registers truncated Euclidean distances computed on demand.
+
+    For boards too large for a dense n x n matrix (e.g. 50k holes). Each arc costs a
+    Python call, so use the soft neighbour mode of neighbors.py to keep the number of
+    evaluated arcs down: seed the search with nearest_neighbor_tour and limit the local
+    search with set_neighbor_search_parameters (penalize_far_arcs is the same steering for
+    a dense matrix). Forbidding far arcs with restrict_to_neighbors gave worse tours.
+    """
+    index_to_node = index_to_node_array(manager)
+    xs = [float(locations[node][0]) for node in index_to_node]
+    ys = [float(locations[node][1]) for node in index_to_node]
+
+    def distance_callback(from_index, to_index):
+        return int(math.hypot(xs[from_index] - xs[to_index], ys[from_index] - ys[to_index]))
+
+    return routing.RegisterTransitCallback(distance_callback)
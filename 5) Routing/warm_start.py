@@ -0,0 +1,181 @@
+# Warm-starting a routing solve from a previous day's routes
+
+# Fleet routes change little from one day to the next, but SolveWithParameters always
+# starts from scratch. solve_from_routes takes the previous routes (route records from
+# routes.read_routes_jsonl, or plain lists of nodes), drops the nodes that no longer exist,
+# inserts today's new nodes at their cheapest feasible position and hands the result to
+# SolveFromAssignmentWithParameters as the initial solution.
+# Partial assignments are rejected by the solver, so every new node has to be placed before
+# the search starts. Feasibility of an insertion is checked against the model's own
+# dimensions (transits, slacks, cumul ranges such as time windows, and the capacity of the
+# vehicle) by propagating the cumul interval along the route. Pickup and delivery pairs are not
+# inserted together; when the repaired routes are not a feasible solution the solve falls
+# back to a cold start.
+
+from routes import route_from_json
+
+
+def previous_visits(routes, num_vehicles, node_map=None):
+    """Returns (visits, dropped): per-vehicle lists of today's nodes, depots excluded.
+
+    routes are route records or node lists (start and end depot included) in the previous
+    numbering. node_map maps previous nodes to today's; by default node ids are unchanged.
+    Nodes missing from node_map (or mapped to None) no longer exist and are returned in
+    dropped. Routes of vehicles that are gone are dropped too.
+    """
+    visits = [[] for _ in range(num_vehicles)]
+    dropped = []
+    for vehicle_id, route in enumerate(routes):
+        if isinstance(route, dict):
+            vehicle_id = route['vehicle_id']
+            if not hasattr(route['nodes'], 'tolist'):
+                route = route_from_json(route)
+            route = route['nodes']
+        nodes = list(route[1:-1].tolist() if hasattr(route, 'tolist') else route[1:-1])
+        if vehicle_id >= num_vehicles:
+            dropped.extend(nodes)
+            continue
+        for node in nodes:
+            current = node_map.get(node) if node_map is not None else node
+            if current is None:
+                dropped.append(node)
+            else:
+                visits[vehicle_id].append(current)
+    return visits, dropped
+
+
+class RouteChecker:
+    """Checks whether a route satisfies every dimension of a closed routing model."""
+
+    def __init__(self, routing):
+        self.dimensions = [routing.GetDimensionOrDie(name)
+                           for name in routing.GetAllDimensionNames()]
+        # The cumul range of a visit is the largest capacity of the fleet, so the capacity
+        # of each vehicle is checked separately. Older wrappers do not expose
+        # vehicle_capacities(); the model bounds the end cumul of a vehicle by it.
+        self.capacities = []
+        for dimension in self.dimensions:
+            if hasattr(dimension, 'vehicle_capacities'):
+                capacities = list(dimension.vehicle_capacities())
+            else:
+                capacities = [dimension.CumulVar(routing.End(vehicle)).Max()
+                              for vehicle in range(routing.vehicles())]
+            self.capacities.append(capacities)
+
+    def is_feasible(self, vehicle, indices):
+        """Returns True if the route (start and end indices included) is feasible.
+
+        For each dimension the interval of feasible cumul values is pushed along the
+        route: the next cumul is the current one plus the transit plus a slack in
+        [0, slack max], intersected with the cumul range of the next index and with
+        [0, capacity of the vehicle].
+        """
+        for dimension, capacities in zip(self.dimensions, self.capacities):
+            capacity = capacities[vehicle]
+            cumul = dimension.CumulVar(indices[0])
+            low, high = cumul.Min(), min(cumul.Max(), capacity)
+            if low > high:
+                return False
+            for from_index, to_index in zip(indices, indices[1:]):
+                transit = dimension.GetTransitValue(from_index, to_index, vehicle)
+                slack_max = dimension.SlackVar(from_index).Max()
+                cumul = dimension.CumulVar(to_index)
+                low = max(low + transit, cumul.Min())
+                high = min(high + transit + slack_max, cumul.Max(), capacity)
+                if low > high:
+                    return False
+        return True
+
+
+def insert_nodes(routing, manager, visits, nodes, checker=None):
+    """Inserts nodes one by one at their cheapest feasible position; returns the unplaced ones.
+
+    visits (per-vehicle node lists, depots excluded) are updated in place. Positions are
+    tried in order of increasing arc cost, so usually the first one checked is taken.
+    """
+    checker = checker or RouteChecker(routing)
+    paths = [[routing.Start(vehicle)] + [manager.NodeToIndex(node) for node in route] +
+             [routing.End(vehicle)]
+             for vehicle, route in enumerate(visits)]
+    unplaced = []
+    for node in nodes:
+        index = manager.NodeToIndex(node)
+        candidates = []
+        for vehicle, path in enumerate(paths):
+            for position in range(1, len(path)):
+                before, after = path[position - 1], path[position]
+                delta = (routing.GetArcCostForVehicle(before, index, vehicle) +
+                         routing.GetArcCostForVehicle(index, after, vehicle) -
+                         routing.GetArcCostForVehicle(before, after, vehicle))
+                candidates.append((delta, vehicle, position))
+        candidates.sort()
+        for _, vehicle, position in candidates:
+            path = paths[vehicle][:position] + [index] + paths[vehicle][position:]
+            if checker.is_feasible(vehicle, path):
+                paths[vehicle] = path
+                visits[vehicle].insert(position - 1, node)
+                break
+        else:
+            unplaced.append(node)
+    return unplaced
+
+
+def repair_routes(routing, manager, routes, node_map=None):
+    """Turns previous routes into a complete set of visits for today's model.
+
+    Returns (visits, report) where report lists the 'dropped', 'inserted' and 'unplaced'
+    nodes. The model must be closed (CloseModelWithParameters).
+    """
+    visits, dropped = previous_visits(routes, manager.GetNumberOfVehicles(), node_map)
+    depots = {manager.IndexToNode(index)
+              for vehicle in range(manager.GetNumberOfVehicles())
+              for index in (routing.Start(vehicle), routing.End(vehicle))}
+
+    # A node may only be visited once; later duplicates and depots are dropped
+    seen = set(depots)
+    for route in visits:
+        kept = []
+        for node in route:
+            if node in seen or not 0 <= node < manager.GetNumberOfNodes():
+                dropped.append(node)
+            else:
+                seen.add(node)
+                kept.append(node)
+        route[:] = kept
+
+    # Dropping nodes can break a route (e.g. by changing arrival times); its nodes are then
+    # inserted again like new ones
+    checker = RouteChecker(routing)
+    for vehicle, route in enumerate(visits):
+        path = ([routing.Start(vehicle)] + [manager.NodeToIndex(node) for node in route] +
+                [routing.End(vehicle)])
+        if not checker.is_feasible(vehicle, path):
+            seen.difference_update(route)
+            route[:] = []
+
+    new_nodes = [node for node in range(manager.GetNumberOfNodes()) if node not in seen]
+    unplaced = insert_nodes(routing, manager, visits, new_nodes, checker)
+    report = {'dropped': dropped, 'unplaced': unplaced,
+              'inserted': [node for node in new_nodes if node not in unplaced]}
+    return visits, report
+
+
+def warm_start_assignment(routing, manager, routes, search_parameters, node_map=None):
+    """Returns (assignment, report): the repaired previous routes as an initial solution.
+
+    assignment is None when the repaired routes are not feasible for today's model.
+    """
+    routing.CloseModelWithParameters(search_parameters)
+    visits, report = repair_routes(routing, manager, routes, node_map)
+    if report['unplaced']:
+        return None, report
+    return routing.ReadAssignmentFromRoutes(visits, True), report
+
+
+def solve_from_routes(routing, manager, routes, search_parameters, node_map=None):
+    """Solves today's model starting from previous routes; falls back to a cold start."""
+    assignment, _ = warm_start_assignment(routing, manager, routes, search_parameters,
+                                          node_map)
+    if assignment is None:
+        return routing.SolveWithParameters(search_parameters)
+    return routing.SolveFromAssignmentWithParameters(assignment, search_parameters)
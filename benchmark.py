@@ -0,0 +1,499 @@
+# Time-to-quality benchmark harness for the example problems
+
+# Runs every example N times with fixed seeds and writes build time, solve time, objective,
+# gap and peak RSS to a JSON results file; compare flags regressions between two files.
+# Each run is a separate child process: the OR-Tools solve entry points (pywraplp, CP-SAT,
+# routing and linear sum assignment, and linear_sum.solve_linear_sum_problem, which
+# reports the costs the examples give rather than the shifted ones the solver sees) are
+# wrapped before the script runs, so the code up to
+# the solve call is timed as the model build, and the script is stopped as soon as its
+# solve returns. Solution printing and other top-level side effects after the solve never
+# run, output is discarded, files are written to a temporary directory and peak RSS is
+# per run. Seeds are applied where the solver has one (CP-SAT random_seed, SCIP seed
+# shift, Python's and NumPy's global generators); GLOP and the routing solver are
+# deterministic. With --check, every example also runs once in full and the objective it
+# prints (a 'Total cost = ' or 'Objective value = ' line) must match the recorded one.
+# Usage:
+#   python benchmark.py run [-n RUNS] [--seed SEED] [-k FILTER] [-o results.json] [--check]
+#   python benchmark.py compare baseline.json candidate.json [--tolerance 0.2]
+
+import argparse
+import datetime
+import importlib
+import json
+import os
+import platform
+import random
+import re
+import resource
+import runpy
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PROBLEMS = [
+    '1) Linear Optimization/3x+4y Problem.py',
+    '1) Linear Optimization/3x+y Example.py',
+    '1) Linear Optimization/Stigler Diet.py',
+    '2) Integer Optimization/MIP with Array.py',
+    '2) Integer Optimization/x + 10y Example.py',
+    '2) Integer Optimization/x + 10y Linear Example.py',
+    '3) Constraint Optimization/2x + 2y + 3z Example.py',
+    '3) Constraint Optimization/CP-SAT Solver.py',
+    '3) Constraint Optimization/Cryptarithmetic Puzzle.py',
+    '3) Constraint Optimization/N-Queens Problem.py',
+    '4) Assignment/Assignment Problem CPSAT.py',
+    '4) Assignment/Assignment Problem Linear Sum.py',
+    '4) Assignment/Assignment Problem MIP.py',
+    '4) Assignment/Assignment with Allowed Groups CPSAT.py',
+    '4) Assignment/Assignment with Allowed Groups MIP.py',
+    '4) Assignment/Assignment with Task Sizes CPSAT.py',
+    '4) Assignment/Assignment with Task Sizes MIP.py',
+    '4) Assignment/Teams of Workers CPSAT.py',
+    '4) Assignment/Teams of Workers MIP.py',
+    '5) Routing/Drilling a Circuit Board Improved.py',
+    '5) Routing/Drilling a Circuit Board.py',
+    '5) Routing/Traveling Salesperson Problem.py',
+    '5) Routing/VRP with Constraints.py',
+    '5) Routing/VRP with Google Distance Matrix.py',
+    '5) Routing/VRP with Pickups and Deliveries.py',
+    '5) Routing/VRP with Time Windows.py',
+    '5) Routing/Vehicle Routing Problem.py',
+]
+
+LINEAR_SOLVER_STATUSES = {0: 'OPTIMAL', 1: 'FEASIBLE', 2: 'INFEASIBLE', 3: 'UNBOUNDED',
+                          4: 'ABNORMAL', 5: 'MODEL_INVALID', 6: 'NOT_SOLVED'}
+ROUTING_STATUSES = {0: 'ROUTING_NOT_SOLVED', 1: 'ROUTING_SUCCESS',
+                    2: 'ROUTING_PARTIAL_SUCCESS_LOCAL_OPTIMUM_NOT_REACHED',
+                    3: 'ROUTING_FAIL', 4: 'ROUTING_FAIL_TIMEOUT', 5: 'ROUTING_INVALID',
+                    6: 'ROUTING_INFEASIBLE', 7: 'ROUTING_OPTIMAL'}
+
+# The objective line of the examples that print one
+PRINTED_OBJECTIVE = re.compile(r'^(?:Total cost|Objective value) = (\S+)$', re.MULTILINE)
+
+# The time metrics of a run; compare_summaries treats a change below min_seconds as noise
+TIME_METRICS = ('build_seconds', 'solve_seconds')
+
+
+class SolveFinished(BaseException):
+    """Raised by the solve wrappers to stop the example script after its solve."""
+
+
+class SolveRecorder:
+    """Wraps the solve entry points and records the first solve of a script."""
+
+    def __init__(self, seed):
+        self.seed = seed
+        self.start_time = time.perf_counter()
+        self.result = None
+        self.depth = 0
+
+    def install(self):
+        """Wraps every solve entry point that is importable in this OR-Tools release."""
+        entry_points = [
+            ('ortools.linear_solver.pywraplp', 'Solver', 'Solve', self.linear_solver),
+            ('ortools.sat.python.cp_model', 'CpSolver', 'solve', self.cp_sat),
+            ('ortools.sat.python.cp_model', 'CpSolver', 'SolveWithSolutionCallback',
+             self.cp_sat),
+            ('ortools.constraint_solver.pywrapcp', 'RoutingModel', 'Solve', self.routing),
+            ('ortools.constraint_solver.pywrapcp', 'RoutingModel', 'SolveWithParameters',
+             self.routing),
+            ('ortools.constraint_solver.pywrapcp', 'RoutingModel',
+             'SolveFromAssignmentWithParameters', self.routing),
+            ('ortools.graph.python.linear_sum_assignment', 'SimpleLinearSumAssignment',
+             'solve', self.assignment),
+            ('ortools.graph.pywrapgraph', 'LinearSumAssignment', 'Solve', self.assignment),
+            # A module function of "4) Assignment", importable from its scripts only
+            ('linear_sum', None, 'solve_linear_sum_problem', self.linear_sum),
+        ]
+        for module_name, class_name, method_name, describe in entry_points:
+            try:
+                owner = importlib.import_module(module_name)
+                if class_name is not None:
+                    owner = getattr(owner, class_name)
+                method = getattr(owner, method_name)
+            except (ImportError, AttributeError):
+                continue
+            setattr(owner, method_name, self.wrap(method, describe))
+
+    def wrap(self, method, describe):
+        recorder = self
+
+        def solve(solver, *args, **kwargs):
+            if recorder.depth:
+                return method(solver, *args, **kwargs)
+            build_seconds = time.perf_counter() - recorder.start_time
+            describe(solver, args, None)
+            recorder.depth += 1
+            start_time = time.perf_counter()
+            try:
+                result = method(solver, *args, **kwargs)
+            finally:
+                recorder.depth -= 1
+            solve_seconds = time.perf_counter() - start_time
+            recorder.result = {'build_seconds': build_seconds,
+                               'solve_seconds': solve_seconds}
+            recorder.result.update(describe(solver, args, result))
+            raise SolveFinished()
+
+        return solve
+
+    # Each describe function is called once before the solve (result None) to apply the
+    # seed, and once after it to return the solver, status, objective, bound and sense.
+
+    def linear_solver(self, solver, args, result):
+        if result is None:
+            if 'SCIP' in solver.SolverVersion():
+                solver.SetSolverSpecificParametersAsString(
+                    'randomization/randomseedshift = {}'.format(self.seed))
+            return None
+        objective = solver.Objective()
+        status = LINEAR_SOLVER_STATUSES.get(result, str(result))
+        described = {'solver': solver.SolverVersion(), 'status': status,
+                     'sense': 'max' if objective.maximization() else 'min'}
+        if status in ('OPTIMAL', 'FEASIBLE'):
+            described['objective'] = objective.Value()
+            described['bound'] = (objective.BestBound() if solver.IsMip()
+                                  else objective.Value())
+        return described
+
+    def cp_sat(self, solver, args, result):
+        model = args[0]
+        if result is None:
+            solver.parameters.random_seed = self.seed
+            return None
+        proto = model.Proto()
+        status = solver.StatusName(result)
+        described = {'solver': 'CP-SAT', 'status': status}
+        if proto.HasField('objective'):
+            described['sense'] = 'max' if proto.objective.scaling_factor < 0 else 'min'
+            if status in ('OPTIMAL', 'FEASIBLE'):
+                described['objective'] = solver.ObjectiveValue()
+                described['bound'] = solver.BestObjectiveBound()
+        if len(args) > 1 and hasattr(args[1], 'solution_count'):
+            described['solutions'] = args[1].solution_count()
+        return described
+
+    def routing(self, routing, args, result):
+        if result is None:
+            return None
+        described = {'solver': 'routing', 'sense': 'min',
+                     'status': ROUTING_STATUSES.get(routing.status(), str(routing.status()))}
+        if result:
+            described['objective'] = result.ObjectiveValue()
+        return described
+
+    def assignment(self, assignment, args, result):
+        if result is None:
+            return None
+        optimal_cost = getattr(assignment, 'optimal_cost', None) or assignment.OptimalCost
+        status = getattr(result, 'name', str(result))
+        described = {'solver': 'linear sum assignment', 'sense': 'min', 'status': status}
+        if status == 'OPTIMAL' or result == getattr(assignment, 'OPTIMAL', None):
+            described['objective'] = optimal_cost()
+            described['bound'] = described['objective']
+        return described
+
+    def linear_sum(self, problem, args, result):
+        if result is None:
+            return None
+        status, cost, _, error_bound = result
+        described = {'solver': 'linear sum assignment', 'sense': 'min', 'status': status}
+        if status == 'OPTIMAL':
+            described['objective'] = cost
+            described['bound'] = cost - error_bound
+        return described
+
+
+def gap(objective, bound):
+    """Returns the relative gap between objective and bound, or None when unknown."""
+    if objective is None or bound is None:
+        return None
+    if objective == bound:
+        return 0.0
+    return abs(objective - bound) / max(abs(objective), 1e-9)
+
+
+def run_child(path, seed):
+    """Runs one example in this process and writes its JSON result line to stdout."""
+    output = os.fdopen(os.dup(sys.stdout.fileno()), 'w')
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    sys.stdout.flush()
+    os.dup2(devnull, sys.stdout.fileno())
+
+    result = {'status': 'NO_SOLVE'}
+    script_dir = os.path.dirname(path)
+    sys.path.insert(0, script_dir)
+
+    # After the path change, so that the modules next to the script can be wrapped
+    recorder = SolveRecorder(seed)
+    recorder.install()
+    random.seed(seed)
+    try:
+        import numpy
+        numpy.random.seed(seed)
+    except ImportError:
+        pass
+
+    sys.argv = [path]
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        recorder.start_time = time.perf_counter()
+        try:
+            runpy.run_path(path, run_name='__main__')
+            result['build_seconds'] = time.perf_counter() - recorder.start_time
+        except SolveFinished:
+            result = recorder.result
+        except (Exception, SystemExit) as error:
+            result = {'status': 'ERROR', 'error': traceback.format_exception_only(
+                type(error), error)[-1].strip()}
+        os.chdir(ROOT_DIR)
+
+    result['gap'] = gap(result.get('objective'), result.get('bound'))
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result['peak_rss_mb'] = peak_rss / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10)
+    sys.stdout.flush()
+    output.write(json.dumps(result) + '\n')
+    output.flush()
+
+
+def run_problem(problem, seed, timeout):
+    """Runs one example in a child process and returns its result record."""
+    record = {'problem': problem, 'seed': seed}
+    command = [sys.executable, os.path.abspath(__file__), 'child',
+               os.path.join(ROOT_DIR, problem), str(seed)]
+    try:
+        process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                 timeout=timeout, universal_newlines=True)
+    except subprocess.TimeoutExpired:
+        record.update(status='TIMEOUT', error='no result after {} s'.format(timeout))
+        return record
+    lines = process.stdout.strip().splitlines()
+    if process.returncode or not lines:
+        stderr = process.stderr.strip().splitlines()
+        record.update(status='CRASHED', error='exit code {}: {}'.format(
+            process.returncode, stderr[-1] if stderr else ''))
+        return record
+    record.update(json.loads(lines[-1]))
+    return record
+
+
+def printed_objective(problem, timeout):
+    """Runs an example in full and returns the objective it prints, or None."""
+    with tempfile.TemporaryDirectory() as work_dir:
+        try:
+            process = subprocess.run([sys.executable, os.path.join(ROOT_DIR, problem)],
+                                     cwd=work_dir, stdout=subprocess.PIPE,
+                                     stderr=subprocess.PIPE, timeout=timeout,
+                                     universal_newlines=True)
+        except subprocess.TimeoutExpired:
+            return None
+    match = PRINTED_OBJECTIVE.search(process.stdout)
+    return float(match.group(1)) if match else None
+
+
+def check_objectives(summaries, timeout, objective_tolerance=1e-6):
+    """Returns (problem, message) for every recorded objective that differs from the one
+    the example prints."""
+    mismatches = []
+    for problem, summary in summaries.items():
+        recorded = summary['objective']
+        if recorded is None:
+            continue
+        printed = printed_objective(problem, timeout)
+        if printed is None:
+            continue
+        if abs(printed - recorded) > objective_tolerance * max(abs(printed), 1.0):
+            mismatches.append((problem, 'recorded objective {:.10g}, printed {:.10g}'.format(
+                recorded, printed)))
+    return mismatches
+
+
+def summarize(runs):
+    """Returns {problem: summary} with medians over the runs of each problem."""
+    by_problem = {}
+    for run in runs:
+        by_problem.setdefault(run['problem'], []).append(run)
+
+    summaries = {}
+    for problem, problem_runs in by_problem.items():
+        summary = {'runs': len(problem_runs),
+                   'status': sorted({run['status'] for run in problem_runs}),
+                   'sense': problem_runs[0].get('sense')}
+        for metric in TIME_METRICS + ('peak_rss_mb', 'objective', 'gap'):
+            values = [run[metric] for run in problem_runs if run.get(metric) is not None]
+            summary[metric] = statistics.median(values) if values else None
+        summaries[problem] = summary
+    return summaries
+
+
+def format_value(value, spec):
+    return '-' if value is None else format(value, spec)
+
+
+def print_summary(summaries):
+    print('{:52} {:>4} {:>9} {:>9} {:>14} {:>8} {:>8}  {}'.format(
+        'problem', 'runs', 'build s', 'solve s', 'objective', 'gap', 'RSS MB', 'status'))
+    for problem, summary in summaries.items():
+        print('{:52} {:4} {:>9} {:>9} {:>14} {:>8} {:>8}  {}'.format(
+            problem[:52], summary['runs'], format_value(summary['build_seconds'], '.4f'),
+            format_value(summary['solve_seconds'], '.4f'),
+            format_value(summary['objective'], '.6g'), format_value(summary['gap'], '.2%'),
+            format_value(summary['peak_rss_mb'], '.1f'), ','.join(summary['status'])))
+
+
+def run_benchmark(args):
+    problems = [problem for problem in PROBLEMS
+                if not args.filter or args.filter.lower() in problem.lower()]
+    runs = []
+    for problem in problems:
+        for run in range(args.runs):
+            record = run_problem(problem, args.seed + run, args.timeout)
+            record['run'] = run
+            runs.append(record)
+            if record.get('error'):
+                print('{} (seed {}): {}'.format(problem, record['seed'], record['error']),
+                      file=sys.stderr)
+
+    results = {
+        'metadata': {
+            'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'ortools': package_version('ortools'),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'runs': args.runs,
+            'seed': args.seed,
+        },
+        'runs': runs,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=1)
+    summaries = summarize(runs)
+    print_summary(summaries)
+    print('\nResults written to {}'.format(args.output))
+    if not args.check:
+        return 0
+    mismatches = check_objectives(summaries, args.timeout)
+    print('Objective mismatches: {}'.format(len(mismatches)))
+    for problem, message in mismatches:
+        print('  {:52} {}'.format(problem[:52], message))
+    return 1 if mismatches else 0
+
+
+def package_version(name):
+    try:
+        from importlib import metadata
+        return metadata.version(name)
+    except Exception:
+        return None
+
+
+def compare_summaries(baseline, candidate, tolerance=0.2, min_seconds=0.01, min_rss_mb=5.0,
+                      objective_tolerance=1e-6):
+    """Returns (regressions, improvements) as lists of (problem, message).
+
+    A time or memory median is a regression when it grows by more than tolerance
+    (relative) and by more than min_seconds / min_rss_mb (absolute). An objective is a
+    regression when it gets worse in the problem's sense, a gap when it grows, and a
+    status when a problem that solved no longer does.
+    """
+    regressions = []
+    improvements = []
+    for problem, old in baseline.items():
+        new = candidate.get(problem)
+        if new is None:
+            regressions.append((problem, 'missing from the candidate results'))
+            continue
+        failed = {'ERROR', 'CRASHED', 'TIMEOUT'}
+        if not failed.intersection(old['status']) and failed.intersection(new['status']):
+            regressions.append((problem, 'status {} -> {}'.format(
+                ','.join(old['status']), ','.join(new['status']))))
+            continue
+
+        for metric, noise in [(metric, min_seconds) for metric in TIME_METRICS] + [
+                ('peak_rss_mb', min_rss_mb)]:
+            before, after = old.get(metric), new.get(metric)
+            if before is None or after is None:
+                continue
+            change = '{} {:.4g} -> {:.4g} ({:+.0%})'.format(
+                metric, before, after, (after - before) / before if before else 0.0)
+            if after > before * (1 + tolerance) and after - before > noise:
+                regressions.append((problem, change))
+            elif after < before / (1 + tolerance) and before - after > noise:
+                improvements.append((problem, change))
+
+        before, after = old.get('objective'), new.get('objective')
+        if before is not None and after is not None:
+            worse = after - before if old.get('sense') != 'max' else before - after
+            change = 'objective {:.10g} -> {:.10g}'.format(before, after)
+            if worse > objective_tolerance * max(abs(before), 1.0):
+                regressions.append((problem, change))
+            elif -worse > objective_tolerance * max(abs(before), 1.0):
+                improvements.append((problem, change))
+        elif before is not None:
+            regressions.append((problem, 'objective {:.10g} -> none'.format(before)))
+
+        before, after = old.get('gap'), new.get('gap')
+        if before is not None and after is not None and after > before + objective_tolerance:
+            regressions.append((problem, 'gap {:.2%} -> {:.2%}'.format(before, after)))
+    return regressions, improvements
+
+
+def compare_benchmark(args):
+    summaries = []
+    for filename in (args.baseline, args.candidate):
+        with open(filename) as f:
+            summaries.append(summarize(json.load(f)['runs']))
+    regressions, improvements = compare_summaries(
+        summaries[0], summaries[1], args.tolerance, args.min_seconds, args.min_rss_mb)
+    for label, changes in (('Improvements', improvements), ('Regressions', regressions)):
+        print('{}: {}'.format(label, len(changes)))
+        for problem, message in changes:
+            print('  {:52} {}'.format(problem[:52], message))
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the example problems.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the examples and write a results file')
+    run_parser.add_argument('-n', '--runs', type=int, default=3, help='runs per problem')
+    run_parser.add_argument('--seed', type=int, default=0, help='seed of the first run')
+    run_parser.add_argument('-k', '--filter', help='only problems whose path contains this')
+    run_parser.add_argument('-o', '--output', default='benchmark_results.json')
+    run_parser.add_argument('--timeout', type=float, default=600,
+                            help='seconds before a run is killed')
+    run_parser.add_argument('--check', action='store_true',
+                            help='check the recorded objectives against the printed ones')
+
+    compare_parser = commands.add_parser('compare', help='flag regressions between two files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    compare_parser.add_argument('--tolerance', type=float, default=0.2,
+                                help='relative change in time or memory that is flagged')
+    compare_parser.add_argument('--min-seconds', type=float, default=0.01)
+    compare_parser.add_argument('--min-rss-mb', type=float, default=5.0)
+
+    child_parser = commands.add_parser('child')
+    child_parser.add_argument('path')
+    child_parser.add_argument('seed', type=int)
+
+    args = parser.parse_args(argv)
+    if args.command == 'child':
+        run_child(args.path, args.seed)
+        return 0
+    if args.command == 'compare':
+        return compare_benchmark(args)
+    return run_benchmark(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
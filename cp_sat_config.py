@@ -0,0 +1,129 @@
+# Shared CP-SAT solver configuration for the constraint and assignment examples
+
+# The CP-SAT scripts create a bare CpSolver, and only the enumeration examples set a
+# parameter. configure_solver sets what they leave out in one place:
+# - num_workers: by default the CPUs this process may run on (os.sched_getaffinity, so a
+#   container or taskset limit is respected), rather than every CPU of the machine
+# - deterministic: interleave_search, which runs the workers' subsolvers in fixed batches
+#   and synchronizes between them, so the same model, seed and parameters give the same
+#   solution and statistics for any number of workers and any machine load
+# - enumerate_all: enumerate_all_solutions. CP-SAT rejects enumeration with more than one
+#   worker (MODEL_INVALID, interleaved or not), so it runs with one worker; use
+#   enumerate_partitioned to enumerate on several CPUs
+# enumerate_partitioned splits the domain of one variable into slices and enumerates each
+# slice in its own process with a single worker; the slices' solutions are disjoint, so
+# together they are exactly the solutions of the model.
+
+import concurrent.futures
+import os
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+
+def available_cpus():
+    """Returns the number of CPUs this process may run on."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def configure_solver(solver, num_workers=None, deterministic=False, enumerate_all=False,
+                     time_limit=None, seed=0, log=False):
+    """Sets the parameters of a CpSolver and returns it.
+
+    num_workers defaults to available_cpus(). time_limit is in seconds (wall time, or
+    deterministic time when deterministic is set, so that the limit is reproducible too).
+    """
+    parameters = solver.parameters
+    if enumerate_all:
+        if num_workers not in (None, 1):
+            raise ValueError('CP-SAT enumerates all solutions with a single worker; '
+                             'use enumerate_partitioned to enumerate in parallel')
+        num_workers = 1
+        parameters.enumerate_all_solutions = True
+    parameters.num_workers = num_workers or available_cpus()
+    parameters.random_seed = seed
+    if deterministic:
+        parameters.interleave_search = True
+    if time_limit is not None:
+        if deterministic:
+            parameters.max_deterministic_time = time_limit
+        else:
+            parameters.max_time_in_seconds = time_limit
+    parameters.log_search_progress = log
+    return solver
+
+
+def create_solver(**options):
+    """Returns a CpSolver configured by configure_solver."""
+    return configure_solver(cp_model.CpSolver(), **options)
+
+
+class _SliceCollector(cp_model.CpSolverSolutionCallback):
+    """Collects the values of variables, given by index, in a list of rows."""
+
+    def __init__(self, indices, count_only):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self.indices = indices
+        self.count_only = count_only
+        self.rows = []
+        self.count = 0
+
+    def on_solution_callback(self):
+        self.count += 1
+        if not self.count_only:
+            self.rows.append(list(map(self.SolutionIntegerValue, self.indices)))
+
+
+def _enumerate_slice(model_bytes, indices, split_index, low, high, count_only):
+    """Worker: enumerates the solutions with low <= variable split_index <= high."""
+    model = cp_model.CpModel()
+    model.Proto().ParseFromString(model_bytes)
+    restriction = model.Proto().constraints.add().linear
+    restriction.vars.append(split_index)
+    restriction.coeffs.append(1)
+    restriction.domain.extend([low, high])
+    collector = _SliceCollector(indices, count_only)
+    status = create_solver(enumerate_all=True).Solve(model, collector)
+    if status not in (cp_model.OPTIMAL, cp_model.INFEASIBLE):
+        raise RuntimeError('slice {}..{} ended with status {}'.format(
+            low, high, cp_model.CpSolver().StatusName(status)))
+    return collector.count, np.array(collector.rows, dtype=np.int64).reshape(-1, len(indices))
+
+
+def enumerate_partitioned(model, variables, split_variable=None, num_workers=None,
+                          num_slices=None, count_only=False):
+    """Enumerates the solutions of model in parallel; returns (count, solutions).
+
+    solutions has one row per solution with the values of variables (None with
+    count_only), in slice order. The domain of split_variable (default: the variable of
+    variables with the largest domain) is cut into num_slices ranges of values (default:
+    four per worker, to balance the load) that are enumerated in num_workers processes.
+    Variables must be plain integer variables, not negated literals.
+    """
+    proto = model.Proto()
+    indices = [variable.Index() for variable in variables]
+    if min(indices, default=0) < 0:
+        raise ValueError('variables must not be negated literals')
+    if split_variable is None:
+        split_variable = max(variables, key=lambda v: np.ptp(proto.variables[v.Index()].domain))
+    domain = proto.variables[split_variable.Index()].domain
+    num_workers = num_workers or available_cpus()
+    # Slice bounds as in np.array_split, without building the (possibly huge) value range
+    low, high = min(domain), max(domain)
+    num_slices = min(num_slices or 4 * num_workers, high - low + 1)
+    size, extra = divmod(high - low + 1, num_slices)
+    starts = [low + part * size + min(part, extra) for part in range(num_slices + 1)]
+    slices = list(zip(starts[:-1], [start - 1 for start in starts[1:]]))
+
+    model_bytes = proto.SerializeToString()
+    with concurrent.futures.ProcessPoolExecutor(num_workers) as executor:
+        futures = [executor.submit(_enumerate_slice, model_bytes, indices,
+                                   split_variable.Index(), first, last, count_only)
+                   for first, last in slices]
+        results = [future.result() for future in futures]
+    count = sum(result[0] for result in results)
+    if count_only:
+        return count, None
+    return count, np.concatenate([result[1] for result in results])
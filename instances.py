@@ -0,0 +1,362 @@
+# Seeded instance generator for every problem family of the examples
+
+# The examples hard-code tiny data (a 5 x 4 cost matrix, a 17-node VRP, 77 foods). These
+# generators produce instances of any size in the same shapes, from a seed, so scaling can
+# be measured. Every instance is a dict of NumPy arrays and scalars with a 'family' key,
+# and save_instance / load_instance store it in a compact binary .npz file.
+# Instances are feasible by construction:
+# - task sizes, team limits and vehicle capacities leave room for a next-fit packing
+# - allowed groups always select exactly as many workers as there are tasks
+# - time windows contain the arrival times of a planted sweep solution
+# - every diet nutrient is provided by at least one food
+# Routing instances store locations rather than a dense matrix (100k nodes would need 80 GB);
+# routing_data_model builds the create_data_model() dict, matrices included, for the sizes
+# where a dense matrix is practical. The example's grid distances are Manhattan, so the
+# generated ones are too. Assignment cost matrices are dense (workers x tasks int32); use
+# sparse_assignment to go beyond a few thousand workers.
+# Usage: python instances.py FAMILY SIZE [--seed SEED] [-o FILE]
+# e.g. python instances.py cvrp 10000 --seed 1 -o cvrp-10000.npz
+
+import argparse
+import json
+import math
+
+import numpy as np
+
+FAMILIES = {}
+
+
+def family(function):
+    """Registers a generator under its function name."""
+    FAMILIES[function.__name__] = function
+    return function
+
+
+def _costs(rng, num_workers, num_tasks, low=10, high=130):
+    return rng.integers(low, high, size=(num_workers, num_tasks), dtype=np.int32)
+
+
+def _next_fit_fits(sizes, capacity, num_bins):
+    """Returns True if next-fit packs sizes (in the given order) into num_bins bins."""
+    bins = 1
+    load = 0
+    for size in sizes.tolist():
+        if load + size > capacity:
+            bins += 1
+            load = 0
+        load += size
+    return bins <= num_bins
+
+
+def _packing_capacity(sizes, num_bins, slack):
+    """Returns the smallest capacity near slack x the average load that provably fits."""
+    ordered = np.sort(sizes)[::-1]
+    capacity = max(int(ordered[0]) if len(ordered) else 0,
+                   math.ceil(slack * int(sizes.sum()) / num_bins))
+    while not _next_fit_fits(ordered, capacity, num_bins):
+        capacity = max(capacity + 1, int(capacity * 1.05))
+    return capacity
+
+
+def _grid_locations(rng, num_points, side=None):
+    """Returns num_points distinct integer points on a side x side grid."""
+    side = side or int(10 * math.sqrt(num_points)) + 1
+    flat = rng.choice(side * side, size=num_points, replace=False)
+    return np.stack([flat // side, flat % side], axis=1).astype(np.int32)
+
+
+def _manhattan(locations):
+    points = locations.astype(np.int64)
+    return (np.abs(points[:, np.newaxis, 0] - points[np.newaxis, :, 0]) +
+            np.abs(points[:, np.newaxis, 1] - points[np.newaxis, :, 1]))
+
+
+def _sweep_routes(locations, depot, num_vehicles):
+    """Splits the customers into num_vehicles angular sectors around the depot.
+
+    Returns one array of customers per vehicle, each visited in angular order; used to
+    plant a known solution.
+    """
+    customers = np.delete(np.arange(len(locations)), depot)
+    deltas = (locations[customers] - locations[depot]).astype(np.float64)
+    order = customers[np.argsort(np.arctan2(deltas[:, 1], deltas[:, 0]), kind='stable')]
+    return np.array_split(order, num_vehicles)
+
+
+@family
+def assignment(num_workers, num_tasks=None, seed=0):
+    """Worker x task cost matrix (Assignment Problem)."""
+    rng = np.random.default_rng(seed)
+    num_tasks = num_tasks or num_workers
+    return {'family': 'assignment', 'seed': seed,
+            'costs': _costs(rng, num_workers, num_tasks)}
+
+
+@family
+def sparse_assignment(num_workers, num_tasks=None, seed=0, degree=10):
+    """Sparse worker -> task arcs with costs; a perfect assignment always exists.
+
+    Arcs are stored as parallel arrays 'arc_worker', 'arc_task' and 'arc_cost' sorted by
+    worker. Every worker gets degree random tasks plus one task of a planted matching, so
+    all tasks can be covered when num_tasks <= num_workers.
+    """
+    rng = np.random.default_rng(seed)
+    num_tasks = num_tasks or num_workers
+    if num_tasks > num_workers:
+        raise ValueError('num_tasks must not exceed num_workers')
+    degree = min(degree, num_tasks)
+    planted = rng.permutation(num_workers)[:num_tasks]
+    workers = np.repeat(np.arange(num_workers, dtype=np.int32), degree)
+    tasks = rng.integers(0, num_tasks, size=num_workers * degree, dtype=np.int32)
+    workers = np.concatenate([workers, planted.astype(np.int32)])
+    tasks = np.concatenate([tasks, np.arange(num_tasks, dtype=np.int32)])
+    arcs = np.unique(workers.astype(np.int64) * num_tasks + tasks)
+    return {'family': 'sparse_assignment', 'seed': seed,
+            'num_workers': num_workers, 'num_tasks': num_tasks,
+            'arc_worker': (arcs // num_tasks).astype(np.int32),
+            'arc_task': (arcs % num_tasks).astype(np.int32),
+            'arc_cost': rng.integers(10, 130, size=len(arcs), dtype=np.int32)}
+
+
+@family
+def task_sizes(num_workers, num_tasks=None, seed=0, max_size=15, slack=1.2):
+    """Costs, 'task_sizes' and 'total_size_max' (Assignment with Task Sizes)."""
+    rng = np.random.default_rng(seed)
+    num_tasks = num_tasks or num_workers
+    sizes = rng.integers(1, max_size + 1, size=num_tasks, dtype=np.int32)
+    return {'family': 'task_sizes', 'seed': seed,
+            'costs': _costs(rng, num_workers, num_tasks), 'task_sizes': sizes,
+            'total_size_max': _packing_capacity(sizes, num_workers, slack)}
+
+
+@family
+def teams(num_workers, num_tasks=None, seed=0, num_teams=2):
+    """Costs, 'team' (team of each worker) and 'team_max' (Teams of Workers)."""
+    rng = np.random.default_rng(seed)
+    num_tasks = num_tasks or max(num_workers * 2 // 3, 1)
+    if num_tasks > num_workers:
+        raise ValueError('num_tasks must not exceed num_workers')
+    team = (rng.permutation(num_workers) % num_teams).astype(np.int32)
+    team_max = math.ceil(num_tasks / num_teams)
+    # Every team needs at least team_max members for the limits to be reachable
+    if np.bincount(team, minlength=num_teams).min() < team_max:
+        raise ValueError('{} tasks do not fit {} teams of {} workers'.format(
+            num_tasks, num_teams, num_workers // num_teams))
+    return {'family': 'teams', 'seed': seed, 'costs': _costs(rng, num_workers, num_tasks),
+            'team': team, 'team_max': team_max}
+
+
+@family
+def allowed_groups(num_workers, num_tasks=None, seed=0, group_size=4,
+                   tuples_per_group=5):
+    """Costs and 'groups', the allowed work patterns (Assignment with Allowed Groups).
+
+    Workers are split into consecutive groups of group_size; groups[g] is a
+    (tuples, group_size) 0/1 array of the allowed patterns of group g. Every pattern of a
+    group selects the same number of workers and the numbers add up to num_tasks.
+    """
+    rng = np.random.default_rng(seed)
+    if num_workers % group_size:
+        raise ValueError('num_workers must be a multiple of group_size')
+    num_groups = num_workers // group_size
+    num_tasks = num_tasks or num_groups * (group_size // 2)
+    if num_tasks > num_workers:
+        raise ValueError('num_tasks must not exceed num_workers')
+    active = np.full(num_groups, num_tasks // num_groups)
+    active[rng.permutation(num_groups)[:num_tasks % num_groups]] += 1
+
+    tuples_per_group = min(tuples_per_group,
+                           min(math.comb(group_size, int(count)) for count in set(active)))
+    groups = np.zeros((num_groups, tuples_per_group, group_size), dtype=np.int8)
+    for group, count in enumerate(active.tolist()):
+        patterns = set()
+        while len(patterns) < tuples_per_group:
+            patterns.add(tuple(sorted(rng.choice(group_size, size=count, replace=False))))
+        for row, pattern in enumerate(sorted(patterns)):
+            groups[group, row, list(pattern)] = 1
+    return {'family': 'allowed_groups', 'seed': seed,
+            'costs': _costs(rng, num_workers, num_tasks), 'groups': groups}
+
+
+@family
+def cvrp(num_nodes, num_vehicles=None, seed=0, max_demand=8, slack=1.2):
+    """Locations, 'demands' and 'vehicle_capacities' (VRP with Constraints)."""
+    rng = np.random.default_rng(seed)
+    num_vehicles = num_vehicles or max(1, num_nodes // 4)
+    demands = rng.integers(1, max_demand + 1, size=num_nodes, dtype=np.int32)
+    demands[0] = 0
+    capacity = _packing_capacity(demands[1:], num_vehicles, slack)
+    return {'family': 'cvrp', 'seed': seed, 'depot': 0,
+            'locations': _grid_locations(rng, num_nodes), 'demands': demands,
+            'vehicle_capacities': np.full(num_vehicles, capacity, dtype=np.int32)}
+
+
+@family
+def time_windows(num_nodes, num_vehicles=None, seed=0, width=None, speed=10):
+    """Locations and 'time_windows' around a planted solution (VRP with Time Windows).
+
+    Travel times are Manhattan distances divided by speed (rounded up). Customers are
+    swept into one route per vehicle and every window contains the planted arrival time,
+    so the planted routes are feasible without waiting. Windows are width wide (default:
+    a third of the longest planted route). 'horizon' is the latest planted return to the
+    depot plus a window; like the example, vehicles may wait up to the horizon.
+    """
+    rng = np.random.default_rng(seed)
+    num_vehicles = num_vehicles or max(1, num_nodes // 4)
+    locations = _grid_locations(rng, num_nodes)
+    routes = _sweep_routes(locations, 0, num_vehicles)
+    arrivals = []
+    for route in routes:
+        path = np.concatenate([[0], route, [0]])
+        legs = np.abs(np.diff(locations[path].astype(np.int64), axis=0)).sum(axis=1)
+        arrivals.append(np.cumsum(-(-legs // speed)))
+    duration = max((int(times[-1]) for times in arrivals if len(times)), default=0)
+    width = width or max(5, duration // 3)
+
+    windows = np.zeros((num_nodes, 2), dtype=np.int32)
+    for route, times in zip(routes, arrivals):
+        opening = times[:-1] - rng.integers(0, width + 1, size=len(route))
+        windows[route, 0] = np.maximum(opening, 0)
+        windows[route, 1] = windows[route, 0] + width
+    windows[0] = (0, width)
+    horizon = duration + width
+    return {'family': 'time_windows', 'seed': seed, 'depot': 0, 'locations': locations,
+            'time_windows': windows, 'num_vehicles': num_vehicles, 'speed': speed,
+            'horizon': horizon, 'max_waiting_time': horizon}
+
+
+@family
+def pickup_delivery(num_pairs, num_vehicles=None, seed=0):
+    """Locations and 'pickups_deliveries' pairs (VRP with Pickups and Deliveries).
+
+    Node 0 is the depot; nodes 2i + 1 and 2i + 2 form pair i. 'vehicle_max_distance' fits
+    the worst single-pair round trip with a margin.
+    """
+    rng = np.random.default_rng(seed)
+    num_vehicles = num_vehicles or max(1, num_pairs // 4)
+    locations = _grid_locations(rng, 2 * num_pairs + 1)
+    pickups = np.arange(1, 2 * num_pairs + 1, 2, dtype=np.int32)
+    pairs = np.stack([pickups, pickups + 1], axis=1)
+    points = locations.astype(np.int64)
+    round_trips = (np.abs(points[pairs[:, 0]] - points[0]).sum(axis=1) +
+                   np.abs(points[pairs[:, 1]] - points[pairs[:, 0]]).sum(axis=1) +
+                   np.abs(points[0] - points[pairs[:, 1]]).sum(axis=1))
+    pairs_per_vehicle = math.ceil(num_pairs / num_vehicles)
+    return {'family': 'pickup_delivery', 'seed': seed, 'depot': 0, 'locations': locations,
+            'pickups_deliveries': pairs, 'num_vehicles': num_vehicles,
+            'vehicle_max_distance': int(round_trips.max()) * pairs_per_vehicle * 2}
+
+
+@family
+def diet(num_foods, num_nutrients=9, seed=0, density=0.6):
+    """Food prices, nutrient values per dollar and nutrient minimums (Stigler Diet).
+
+    'values' is a (num_foods, num_nutrients) array in the units of the example's table;
+    about density of the entries are non-zero and every nutrient has a source.
+    """
+    rng = np.random.default_rng(seed)
+    values = rng.gamma(0.8, 40.0, size=(num_foods, num_nutrients))
+    values *= rng.random((num_foods, num_nutrients)) < density
+    sources = rng.integers(0, num_foods, size=num_nutrients)
+    values[sources, np.arange(num_nutrients)] = np.maximum(
+        values[sources, np.arange(num_nutrients)], 1.0)
+    # Minimums a handful of average foods would cover
+    minimums = values.mean(axis=0) * rng.uniform(2.0, 6.0, size=num_nutrients)
+    return {'family': 'diet', 'seed': seed,
+            'prices': np.round(rng.uniform(1.0, 60.0, size=num_foods), 1),
+            'values': np.round(values, 1), 'minimums': np.round(minimums, 2)}
+
+
+@family
+def drilling(num_holes, seed=0):
+    """Distinct integer hole positions on a square board (Drilling a Circuit Board)."""
+    rng = np.random.default_rng(seed)
+    return {'family': 'drilling', 'seed': seed, 'depot': 0,
+            'locations': _grid_locations(rng, num_holes)}
+
+
+def generate(family_name, size, seed=0, **options):
+    """Returns an instance of a family; size is its main dimension (workers, nodes, ...)."""
+    if family_name not in FAMILIES:
+        raise ValueError('unknown family {!r}; choose from {}'.format(
+            family_name, ', '.join(sorted(FAMILIES))))
+    return FAMILIES[family_name](size, seed=seed, **options)
+
+
+def routing_data_model(instance):
+    """Returns the create_data_model() dict of the routing examples for an instance.
+
+    Builds the dense Manhattan 'distance_matrix' (or 'time_matrix' for time windows), so
+    it is meant for instances of up to a few thousand nodes.
+    """
+    data = {'depot': int(instance['depot'])}
+    distances = _manhattan(instance['locations'])
+    if instance['family'] == 'time_windows':
+        data['time_matrix'] = (-(-distances // instance['speed'])).tolist()
+        data['time_windows'] = [tuple(window) for window in instance['time_windows'].tolist()]
+        for key in ('num_vehicles', 'horizon', 'max_waiting_time'):
+            data[key] = int(instance[key])
+        return data
+
+    data['distance_matrix'] = distances.tolist()
+    data['locations'] = [tuple(point) for point in instance['locations'].tolist()]
+    if instance['family'] == 'cvrp':
+        data['demands'] = instance['demands'].tolist()
+        data['vehicle_capacities'] = instance['vehicle_capacities'].tolist()
+        data['num_vehicles'] = len(data['vehicle_capacities'])
+    elif instance['family'] == 'pickup_delivery':
+        data['pickups_deliveries'] = instance['pickups_deliveries'].tolist()
+        data['num_vehicles'] = int(instance['num_vehicles'])
+        data['vehicle_max_distance'] = int(instance['vehicle_max_distance'])
+    else:
+        data['num_vehicles'] = 1
+    return data
+
+
+def diet_tables(instance):
+    """Returns (nutrients, data) in the row layout of the Stigler Diet example."""
+    nutrients = [['Nutrient {}'.format(i), minimum]
+                 for i, minimum in enumerate(instance['minimums'].tolist())]
+    data = [['Food {}'.format(j), '1 unit', price] + values
+            for j, (price, values) in enumerate(zip(instance['prices'].tolist(),
+                                                    instance['values'].tolist()))]
+    return nutrients, data
+
+
+def save_instance(filename, instance, compressed=False):
+    """Writes an instance to a .npz file; scalars are stored as JSON metadata."""
+    arrays = {key: value for key, value in instance.items() if isinstance(value, np.ndarray)}
+    metadata = {key: value for key, value in instance.items()
+                if not isinstance(value, np.ndarray)}
+    arrays['__metadata__'] = np.frombuffer(json.dumps(metadata).encode('utf-8'),
+                                           dtype=np.uint8)
+    (np.savez_compressed if compressed else np.savez)(filename, **arrays)
+
+
+def load_instance(filename):
+    """Reads an instance written by save_instance."""
+    with np.load(filename) as stored:
+        instance = json.loads(stored['__metadata__'].tobytes().decode('utf-8'))
+        instance.update((key, stored[key]) for key in stored.files if key != '__metadata__')
+    return instance
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a problem instance.')
+    parser.add_argument('family', choices=sorted(FAMILIES))
+    parser.add_argument('size', type=int, help='workers, nodes, pairs, foods or holes')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--compressed', action='store_true')
+    parser.add_argument('-o', '--output', help='default: FAMILY-SIZE-SEED.npz')
+    args = parser.parse_args(argv)
+
+    instance = generate(args.family, args.size, args.seed)
+    output = args.output or '{}-{}-{}.npz'.format(args.family, args.size, args.seed)
+    save_instance(output, instance, args.compressed)
+    shapes = ', '.join('{} {}'.format(key, value.shape) for key, value in instance.items()
+                       if isinstance(value, np.ndarray))
+    print('Wrote {}: {}'.format(output, shapes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+# Bulk matrix-form construction of pywraplp models
+
+# "MIP with Array.py" and "Stigler Diet.py" add one coefficient at a time with
+# SetCoefficient, so building a model costs one SWIG call per nonzero, which dominates at
+# 10^5 - 10^6 nonzeros. load_matrix_model takes the whole model in matrix form,
+#     lower <= A x <= upper,  variable_lower <= x <= variable_upper,  min/max c x,
+# and hands it to the solver with a single LoadModelFromProtoKeepNames call. Filling an
+# MPModelProto field by field from Python would cost about as much as the loops, so
+# encode_model_proto writes the protobuf wire format directly with NumPy: the index and
+# coefficient lists of a row are packed fields, i.e. varint bytes and raw little-endian
+# doubles, and every message is a concatenation of such chunks, so no Python code runs
+# per variable, constraint or coefficient.
+# A can be a dense NumPy array or a SciPy sparse matrix (anything with tocsr(), or
+# indptr / indices / data); SciPy itself is not required. The result is the same model
+# the loops build: variables and constraints in the same order, with the same bounds,
+# names and nonzero coefficients (SetCoefficient drops zeros too).
+
+import collections
+import struct
+
+import numpy as np
+from ortools.linear_solver import linear_solver_pb2
+
+# Wire-format tags: (field number << 3) | wire type, where 1 = 64-bit, 2 = length-delimited
+# and 0 = varint. Field numbers are those of linear_solver.proto.
+_MODEL_MAXIMIZE = 0x08
+_MODEL_OBJECTIVE_OFFSET = 0x11
+_MODEL_VARIABLE = 0x1a
+_MODEL_CONSTRAINT = 0x22
+_MODEL_NAME = 0x2a
+_VARIABLE_NAME = 0x2a
+_CONSTRAINT_NAME = 0x22
+_CONSTRAINT_VAR_INDEX = 0x32
+_CONSTRAINT_COEFFICIENT = 0x3a
+
+# Fixed parts of the messages, as packed records of tags and values: variable lower bound
+# (field 1), upper bound (2), objective (3), is_integer (4); constraint bounds (2, 3)
+_VARIABLE_FIELDS = np.dtype([
+    ('lower_tag', 'u1'), ('lower', '<f8'), ('upper_tag', 'u1'), ('upper', '<f8'),
+    ('objective_tag', 'u1'), ('objective', '<f8'), ('integer_tag', 'u1'), ('integer', 'u1'),
+])
+_CONSTRAINT_BOUNDS = np.dtype([
+    ('lower_tag', 'u1'), ('lower', '<f8'), ('upper_tag', 'u1'), ('upper', '<f8'),
+])
+
+# Average chunk size in bytes above which _concatenate copies chunks with slices
+_LONG_CHUNKS = 256
+
+# A CSR matrix without SciPy; as_csr_arrays accepts it like a scipy.sparse.csr_matrix
+CsrMatrix = collections.namedtuple('CsrMatrix', ['shape', 'indptr', 'indices', 'data'])
+
+
+def as_csr_arrays(matrix):
+    """Returns (shape, indptr, indices, data) of a dense array or sparse matrix."""
+    if hasattr(matrix, 'tocsr'):
+        matrix = matrix.tocsr()
+    if hasattr(matrix, 'indptr'):
+        data = np.asarray(matrix.data, dtype=np.float64)
+        indices = np.asarray(matrix.indices, dtype=np.int64)
+        indptr = np.asarray(matrix.indptr, dtype=np.int64)
+        if np.any(data == 0):
+            # Explicit zeros are dropped, as SetCoefficient does
+            keep = data != 0
+            # Kept entries before every entry position, read at the row starts
+            indptr = np.concatenate([[0], np.cumsum(keep)])[indptr]
+            indices, data = indices[keep], data[keep]
+        return matrix.shape, indptr, indices, data
+
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if matrix.ndim != 2:
+        raise ValueError('the constraint matrix must be two-dimensional')
+    rows, columns = np.nonzero(matrix)
+    indptr = np.zeros(matrix.shape[0] + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=matrix.shape[0]), out=indptr[1:])
+    return matrix.shape, indptr, columns.astype(np.int64), matrix[rows, columns]
+
+
+def _encode_varints(values):
+    """Returns (bytes, lengths): the varint encodings of non-negative integers, as uint8."""
+    values = np.asarray(values, dtype=np.uint64)
+    lengths = np.ones(len(values), dtype=np.int64)
+    width = (int(values.max()).bit_length() + 6) // 7 if len(values) else 1
+    for group in range(1, width):
+        lengths += values >= np.uint64(1 << (7 * group))
+    width = max(width, 1)
+    shifts = np.arange(width, dtype=np.uint64) * np.uint64(7)
+    groups = ((values[:, np.newaxis] >> shifts) & np.uint64(0x7f)).astype(np.uint8)
+    positions = np.arange(width)[np.newaxis, :]
+    groups[positions < lengths[:, np.newaxis] - 1] |= 0x80
+    return groups[positions < lengths[:, np.newaxis]], lengths
+
+
+def _concatenate(segments):
+    """Concatenates per-record chunks.
+
+    segments is a list of (data, lengths) pairs over the same records: data holds the
+    chunks of all records back to back (uint8) and lengths their sizes. Record i is chunk
+    i of the first segment, then chunk i of the second, and so on. Returns (data, lengths)
+    of the records.
+    """
+    lengths = sum(segment_lengths for _, segment_lengths in segments)
+    buffer = np.empty(int(lengths.sum()), dtype=np.uint8)
+    offsets = np.cumsum(lengths) - lengths
+    for data, segment_lengths in segments:
+        chunk_starts = np.cumsum(segment_lengths) - segment_lengths
+        if len(data) >= _LONG_CHUNKS * len(segment_lengths):
+            # Few long chunks (rows of coefficients): copy them one by one
+            for offset, start, length in zip(offsets.tolist(), chunk_starts.tolist(),
+                                             segment_lengths.tolist()):
+                buffer[offset:offset + length] = data[start:start + length]
+        elif len(data):
+            # Many short chunks: the position of every byte is its record's offset plus
+            # its place within the chunk
+            buffer[np.repeat(offsets - chunk_starts, segment_lengths) +
+                   np.arange(len(data))] = data
+        offsets = offsets + segment_lengths
+    return buffer, lengths
+
+
+def _fields(tag, data, lengths):
+    """Returns (data, lengths) of one length-delimited field per record; empty ones are omitted."""
+    present = lengths > 0
+    tag_lengths = present.astype(np.int64)
+    size_data, present_size_lengths = _encode_varints(lengths[present])
+    size_lengths = np.zeros(len(lengths), dtype=np.int64)
+    size_lengths[present] = present_size_lengths
+    return _concatenate([(np.full(int(present.sum()), tag, dtype=np.uint8), tag_lengths),
+                         (size_data, size_lengths), (data, lengths)])
+
+
+def _strings(strings, count):
+    """Returns (data, lengths) of UTF-8 encoded strings (all empty when strings is None)."""
+    if strings is None:
+        return np.zeros(0, dtype=np.uint8), np.zeros(count, dtype=np.int64)
+    encoded = [string.encode('utf-8') for string in strings]
+    if len(encoded) != count:
+        raise ValueError('expected {} names, got {}'.format(count, len(encoded)))
+    return (np.frombuffer(b''.join(encoded), dtype=np.uint8),
+            np.fromiter(map(len, encoded), dtype=np.int64, count=count))
+
+
+def _as_vector(values, size, name):
+    vector = np.asarray(values, dtype=np.float64)
+    if vector.ndim == 0:
+        return np.full(size, float(vector))
+    if vector.shape != (size,):
+        raise ValueError('{} must have {} entries'.format(name, size))
+    return vector
+
+
+def encode_model_proto(constraint_matrix, constraint_lower_bounds, constraint_upper_bounds,
+                       objective_coefficients, variable_lower_bounds=0.0,
+                       variable_upper_bounds=np.inf, integer=False, maximize=False,
+                       variable_names=None, constraint_names=None, objective_offset=0.0,
+                       name=''):
+    """Returns the serialized MPModelProto of a model in matrix form.
+
+    Bounds and objective coefficients are scalars or vectors; use +-np.inf for missing
+    bounds. integer is a bool or a per-variable vector. Names default to ''.
+    """
+    (num_constraints, num_vars), indptr, indices, data = as_csr_arrays(constraint_matrix)
+    header = b''
+    if maximize:
+        header += bytes([_MODEL_MAXIMIZE, 1])
+    if objective_offset:
+        header += bytes([_MODEL_OBJECTIVE_OFFSET]) + struct.pack('<d', objective_offset)
+    if name:
+        encoded_name = name.encode('utf-8')
+        header += bytes([_MODEL_NAME]) + bytes(_encode_varints([len(encoded_name)])[0])
+        header += encoded_name
+
+    fields = np.empty(num_vars, dtype=_VARIABLE_FIELDS)
+    fields['lower_tag'], fields['upper_tag'] = 0x09, 0x11
+    fields['objective_tag'], fields['integer_tag'] = 0x19, 0x20
+    fields['lower'] = _as_vector(variable_lower_bounds, num_vars, 'variable lower bounds')
+    fields['upper'] = _as_vector(variable_upper_bounds, num_vars, 'variable upper bounds')
+    fields['objective'] = _as_vector(objective_coefficients, num_vars, 'objective')
+    fields['integer'] = np.broadcast_to(np.asarray(integer, dtype=bool), (num_vars,))
+    variables = _fields(_MODEL_VARIABLE, *_concatenate([
+        (fields.view(np.uint8).ravel(), np.full(num_vars, _VARIABLE_FIELDS.itemsize)),
+        _fields(_VARIABLE_NAME, *_strings(variable_names, num_vars)),
+    ]))
+
+    bounds = np.empty(num_constraints, dtype=_CONSTRAINT_BOUNDS)
+    bounds['lower_tag'], bounds['upper_tag'] = 0x11, 0x19
+    bounds['lower'] = _as_vector(constraint_lower_bounds, num_constraints,
+                                 'constraint lower bounds')
+    bounds['upper'] = _as_vector(constraint_upper_bounds, num_constraints,
+                                 'constraint upper bounds')
+    index_data, index_lengths = _encode_varints(indices)
+    index_ends = np.concatenate([[0], np.cumsum(index_lengths)])
+    row_nonzeros = np.diff(indptr)
+    constraints = _fields(_MODEL_CONSTRAINT, *_concatenate([
+        (bounds.view(np.uint8).ravel(),
+         np.full(num_constraints, _CONSTRAINT_BOUNDS.itemsize)),
+        _fields(_CONSTRAINT_NAME, *_strings(constraint_names, num_constraints)),
+        _fields(_CONSTRAINT_VAR_INDEX, index_data,
+                index_ends[indptr[1:]] - index_ends[indptr[:-1]]),
+        _fields(_CONSTRAINT_COEFFICIENT, data.astype('<f8').view(np.uint8), 8 * row_nonzeros),
+    ]))
+    return header + variables[0].tobytes() + constraints[0].tobytes()
+
+
+def build_model_proto(*args, **kwargs):
+    """Returns the MPModelProto of a model in matrix form (arguments of encode_model_proto)."""
+    return linear_solver_pb2.MPModelProto.FromString(encode_model_proto(*args, **kwargs))
+
+
+def load_matrix_model(solver, *args, **kwargs):
+    """Replaces the model of a pywraplp solver by a model in matrix form.
+
+    Takes the arguments of encode_model_proto and returns the solver's variables.
+    """
+    error = solver.LoadModelFromProtoKeepNames(build_model_proto(*args, **kwargs))
+    if error:
+        raise ValueError(error)
+    return solver.variables()
+
+
+def model_terms(solver):
+    """Returns a comparable description of a pywraplp model.
+
+    Coefficients are sorted by variable index, since the solver keeps them in hash order.
+    Used to check that two ways of building a model give the same model.
+    """
+    proto = linear_solver_pb2.MPModelProto()
+    solver.ExportModelToProto(proto)
+    for constraint in proto.constraint:
+        terms = sorted(zip(constraint.var_index, constraint.coefficient))
+        del constraint.var_index[:], constraint.coefficient[:]
+        constraint.var_index.extend(index for index, _ in terms)
+        constraint.coefficient.extend(coefficient for _, coefficient in terms)
+    return proto
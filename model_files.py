@@ -0,0 +1,336 @@
+# Export and import of pywraplp models as MPS, LP and protobuf files
+
+# The linear and integer examples rebuild their model from Python lists on every run.
+# write_model saves the model of any pywraplp solver; the format follows the file name:
+# .mps (free MPS), .lp (CPLEX LP) or .pb (binary MPModelProto), optionally gzipped (.gz).
+# read_model loads .mps and .pb files back into a solver. The protobuf path is a single
+# C++ load, so a model built once can be shipped and solved on a batch node with almost no
+# Python cost. read_mps streams an MPS file line by line, from a memory map (or a gzip
+# stream), into compact arrays, so the text is never held in memory, and the model is
+# loaded in bulk with matrix_model. Parsing costs about 1 us per nonzero, so MPS is for
+# exchange with other tools and .pb for repeated solves.
+# Conventions are those of the OR-Tools MPS reader: free format (names without spaces),
+# the first N row is the objective and other N rows are free constraints, the RHS of the
+# objective is minus the objective offset, and integer columns between markers without
+# any bound default to [0, 1].
+# Models read back are the same up to variable order (the MPS writer puts integer
+# variables first) and names (unnamed constraints are named auto_c_...). LP files can be
+# written but not read.
+# Usage:
+#   python model_files.py export "2) Integer Optimization/MIP with Array.py" model.mps
+#   python model_files.py solve model.mps [--solver SCIP] [--values]
+
+import argparse
+import array
+import gzip
+import mmap
+import os
+import runpy
+import sys
+import time
+
+import numpy as np
+from ortools.linear_solver import linear_solver_pb2
+from ortools.linear_solver import pywraplp
+
+from matrix_model import CsrMatrix
+from matrix_model import load_matrix_model
+
+FORMATS = ('.mps', '.lp', '.pb')
+
+
+def model_format(filename):
+    """Returns (format, compressed) of a model file name, e.g. ('.mps', True)."""
+    base, extension = os.path.splitext(filename)
+    compressed = extension == '.gz'
+    if compressed:
+        extension = os.path.splitext(base)[1]
+    if extension not in FORMATS:
+        raise ValueError('{}: unknown model format, use one of {} (optionally .gz)'.format(
+            filename, ', '.join(FORMATS)))
+    return extension, compressed
+
+
+def write_model(solver, filename):
+    """Writes the model of a pywraplp solver to an .mps, .lp or .pb file."""
+    extension, compressed = model_format(filename)
+    if extension == '.pb':
+        proto = linear_solver_pb2.MPModelProto()
+        solver.ExportModelToProto(proto)
+        content = proto.SerializeToString()
+    elif extension == '.mps':
+        content = solver.ExportModelAsMpsFormat(False, False).encode('utf-8')
+    else:
+        content = solver.ExportModelAsLpFormat(False).encode('utf-8')
+    if compressed:
+        # Level 6 is several times faster to write than gzip's default 9, for ~5% more bytes
+        with gzip.open(filename, 'wb', compresslevel=6) as file:
+            file.write(content)
+    else:
+        with open(filename, 'wb') as file:
+            file.write(content)
+
+
+def read_model(solver, filename):
+    """Replaces the model of a pywraplp solver by the model of an .mps or .pb file.
+
+    Returns the solver's variables.
+    """
+    extension, compressed = model_format(filename)
+    if extension == '.mps':
+        return load_matrix_model(solver, **read_mps(filename))
+    if extension == '.lp':
+        raise ValueError('{}: LP files cannot be read, use .mps or .pb'.format(filename))
+    with (gzip.open if compressed else open)(filename, 'rb') as file:
+        proto = linear_solver_pb2.MPModelProto.FromString(file.read())
+    error = solver.LoadModelFromProtoKeepNames(proto)
+    if error:
+        raise ValueError('{}: {}'.format(filename, error))
+    return solver.variables()
+
+
+def iter_lines(filename):
+    """Yields the lines of a file as bytes, from a memory map or a gzip stream."""
+    if model_format(filename)[1]:
+        with gzip.open(filename, 'rb') as file:
+            yield from file
+        return
+    with open(filename, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield from iter(mapped.readline, b'')
+
+
+def read_mps(filename):
+    """Parses a free-format MPS file.
+
+    Returns the keyword arguments of matrix_model.encode_model_proto (and so of
+    load_matrix_model). Raises ValueError on malformed input.
+    """
+    name = ''
+    maximize = False
+    objective_row = None
+    row_index = {}  # -1 for the objective
+    row_types = bytearray()
+    row_names = []
+    column_index = {}
+    column_names = []
+    integer = bytearray()
+    entry_rows = array.array('q')
+    entry_columns = array.array('q')
+    entry_values = array.array('d')
+    objective = {}
+    right_hand_sides = {}
+    ranges = {}
+    bounds = []
+    objective_offset = 0.0
+    in_integer_block = False
+    column = None
+    section = None
+
+    def column_number(column_name):
+        number = column_index.get(column_name)
+        if number is None:
+            number = column_index[column_name] = len(column_names)
+            column_names.append(column_name.decode('utf-8'))
+            integer.append(in_integer_block)
+        return number
+
+    for line_number, line in enumerate(iter_lines(filename), 1):
+        tokens = line.split()
+        if not tokens or line.startswith(b'*'):
+            continue
+        try:
+            if not line[:1].isspace():
+                section = tokens[0].upper()
+                if section == b'NAME':
+                    name = b' '.join(tokens[1:]).decode('utf-8')
+                elif section == b'OBJSENSE' and len(tokens) > 1:
+                    maximize = tokens[1].upper().startswith(b'MAX')
+                elif section == b'ENDATA':
+                    break
+                elif section not in (b'OBJSENSE', b'ROWS', b'COLUMNS', b'RHS', b'RANGES',
+                                     b'BOUNDS'):
+                    raise ValueError('unknown section {}'.format(tokens[0].decode()))
+            elif section == b'COLUMNS':
+                if tokens[1] == b"'MARKER'":
+                    in_integer_block = tokens[2] == b"'INTORG'"
+                    column = None
+                    continue
+                if tokens[0] != column:
+                    column = tokens[0]
+                    number = column_number(column)
+                for position in range(1, len(tokens), 2):
+                    row = row_index[tokens[position]]
+                    value = float(tokens[position + 1])
+                    if row < 0:
+                        objective[number] = value
+                    else:
+                        entry_rows.append(row)
+                        entry_columns.append(number)
+                        entry_values.append(value)
+            elif section in (b'RHS', b'RANGES'):
+                values = right_hand_sides if section == b'RHS' else ranges
+                for position in range(len(tokens) % 2, len(tokens), 2):
+                    row = row_index[tokens[position]]
+                    if row >= 0:
+                        values[row] = float(tokens[position + 1])
+                    elif section == b'RHS':
+                        objective_offset = -float(tokens[position + 1])
+            elif section == b'BOUNDS':
+                bound_type = tokens[0].upper()
+                has_value = bound_type not in (b'FR', b'MI', b'PL', b'BV') or len(tokens) == 4
+                column_token = tokens[-2] if has_value else tokens[-1]
+                value = float(tokens[-1]) if has_value else None
+                bounds.append((column_number(column_token), bound_type, value))
+            elif section == b'ROWS':
+                row_type = tokens[0].upper()
+                if row_type == b'N' and objective_row is None:
+                    objective_row = tokens[1]
+                    row_index[tokens[1]] = -1
+                elif row_type in (b'N', b'L', b'G', b'E'):
+                    row_index[tokens[1]] = len(row_names)
+                    row_names.append(tokens[1].decode('utf-8'))
+                    row_types += row_type
+                else:
+                    raise ValueError('unknown row type {}'.format(row_type.decode()))
+            elif section == b'OBJSENSE':
+                maximize = tokens[0].upper().startswith(b'MAX')
+            else:
+                raise ValueError('data outside of a section')
+        except (KeyError, IndexError, ValueError) as error:
+            if isinstance(error, KeyError):
+                error = 'unknown row {}'.format(error.args[0].decode())
+            raise ValueError('{}:{}: {}'.format(filename, line_number, error)) from None
+
+    num_rows, num_columns = len(row_names), len(column_names)
+    types = np.frombuffer(bytes(row_types), dtype='S1')
+    rhs = np.zeros(num_rows)
+    rhs[list(right_hand_sides)] = list(right_hand_sides.values())
+    lower = np.where((types == b'L') | (types == b'N'), -np.inf, rhs)
+    upper = np.where((types == b'G') | (types == b'N'), np.inf, rhs)
+    # A range R turns the one-sided and equality rows into two-sided ones
+    for row, value in ranges.items():
+        if types[row] == b'L' or (types[row] == b'E' and value < 0):
+            lower[row] = rhs[row] - abs(value)
+        if types[row] == b'G' or (types[row] == b'E' and value > 0):
+            upper[row] = rhs[row] + abs(value)
+
+    is_integer = np.frombuffer(bytes(integer), dtype=bool).copy()
+    column_lower = np.zeros(num_columns)
+    column_upper = np.where(is_integer, 1.0, np.inf)
+    column_upper[[number for number, _, _ in bounds]] = np.inf
+    for number, bound_type, value in bounds:
+        if bound_type in (b'UP', b'UI'):
+            column_upper[number] = value
+        elif bound_type in (b'LO', b'LI'):
+            column_lower[number] = value
+        elif bound_type == b'FX':
+            column_lower[number] = column_upper[number] = value
+        elif bound_type == b'FR':
+            column_lower[number], column_upper[number] = -np.inf, np.inf
+        elif bound_type == b'MI':
+            column_lower[number] = -np.inf
+        elif bound_type == b'PL':
+            column_upper[number] = np.inf
+        elif bound_type == b'BV':
+            column_lower[number], column_upper[number] = 0.0, 1.0
+        else:
+            raise ValueError('{}: unsupported bound type {}'.format(
+                filename, bound_type.decode()))
+        if bound_type in (b'UI', b'LI', b'BV'):
+            is_integer[number] = True
+
+    objective_coefficients = np.zeros(num_columns)
+    objective_coefficients[list(objective)] = list(objective.values())
+
+    # Entries come column by column; the model is stored row by row
+    rows = np.frombuffer(entry_rows, dtype=np.int64)
+    order = np.argsort(rows, kind='stable')
+    indptr = np.zeros(num_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=num_rows), out=indptr[1:])
+    matrix = CsrMatrix((num_rows, num_columns), indptr,
+                       np.frombuffer(entry_columns, dtype=np.int64)[order],
+                       np.frombuffer(entry_values, dtype=np.float64)[order])
+    return {'constraint_matrix': matrix, 'constraint_lower_bounds': lower,
+            'constraint_upper_bounds': upper,
+            'objective_coefficients': objective_coefficients,
+            'variable_lower_bounds': column_lower, 'variable_upper_bounds': column_upper,
+            'integer': is_integer, 'maximize': maximize, 'variable_names': column_names,
+            'constraint_names': row_names, 'objective_offset': objective_offset,
+            'name': name}
+
+
+class ModelWritten(BaseException):
+    """Raised by the patched Solve to stop the example script once its model is written."""
+
+
+def export_script_model(path, filename):
+    """Runs an example script up to its first pywraplp solve and writes that model."""
+    filename = os.path.abspath(filename)
+    solve = pywraplp.Solver.Solve
+
+    def write_and_stop(solver, *args):
+        write_model(solver, filename)
+        raise ModelWritten()
+
+    pywraplp.Solver.Solve = write_and_stop
+    sys.path.insert(0, os.path.dirname(os.path.abspath(path)))
+    try:
+        runpy.run_path(path, run_name='__main__')
+    except ModelWritten:
+        return True
+    finally:
+        pywraplp.Solver.Solve = solve
+    return False
+
+
+def solve_model_file(filename, solver_id, print_values=False):
+    start_time = time.perf_counter()
+    solver = pywraplp.Solver.CreateSolver(solver_id)
+    if solver is None:
+        raise ValueError('solver {} is not available'.format(solver_id))
+    variables = read_model(solver, filename)
+    print('Model read in {:.3f} s: {} variables, {} constraints'.format(
+        time.perf_counter() - start_time, solver.NumVariables(), solver.NumConstraints()))
+    status = solver.Solve()
+    statuses = {pywraplp.Solver.OPTIMAL: 'OPTIMAL', pywraplp.Solver.FEASIBLE: 'FEASIBLE',
+                pywraplp.Solver.INFEASIBLE: 'INFEASIBLE',
+                pywraplp.Solver.UNBOUNDED: 'UNBOUNDED'}
+    print('Status:', statuses.get(status, status))
+    print('Solved in {:.3f} s'.format(solver.wall_time() / 1000))
+    if status in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+        print('Objective value =', solver.Objective().Value())
+        if print_values:
+            for variable in variables:
+                if variable.solution_value():
+                    print(variable.name(), '=', variable.solution_value())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export and solve pywraplp model files.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    export_parser = commands.add_parser('export', help="write an example script's model")
+    export_parser.add_argument('script')
+    export_parser.add_argument('output', help='.mps, .lp or .pb file, optionally .gz')
+    solve_parser = commands.add_parser('solve', help='read a .mps or .pb file and solve it')
+    solve_parser.add_argument('model')
+    solve_parser.add_argument('--solver', default='SCIP', help='pywraplp solver id')
+    solve_parser.add_argument('--values', action='store_true',
+                              help='print the nonzero variable values')
+    args = parser.parse_args(argv)
+
+    if args.command == 'export':
+        model_format(args.output)
+        if not export_script_model(args.script, args.output):
+            print('{} did not solve a pywraplp model'.format(args.script), file=sys.stderr)
+            return 1
+        print('Model written to', args.output)
+        return 0
+    solve_model_file(args.model, args.solver, args.values)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())